@@ -0,0 +1,295 @@
+import json
+import platform
+import random
+import statistics
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import timedelta
+from functools import partial
+import django
+from django.db import OperationalError, connection, transaction
+from django.db.models import F, Sum
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from bills.models import MonthlyBill
+from bills.services import flush_bill_notifications, generate_due_bills, transition_due_statuses
+from bills.signals import notify_users
+from payments.models import LedgerAccount, PaymentRecord
+from units.models import AssignedUnit, Unit
+from users.models import CustomUser
+from .metrics import QueryStats
+from .seeding import SEED_PREFIX
+
+
+# Residents compared by the user-financial-comparison benchmark
+COMPARED_RESIDENTS = 20
+
+# Threads of each role in the write-concurrency benchmark
+CONCURRENT_WRITERS = 4
+CONCURRENT_READERS = 4
+# Pause of the beat and report threads between their runs
+BATCH_PAUSE_SECONDS = 0.5
+
+
+def endpoints(resident_ids, year):
+    """(name, url, query) of the benchmarked endpoints; ``resident_ids`` have bill history."""
+    return [
+        ('bill-list', reverse('bill-list'), {}),
+        ('bill-list-overdue', reverse('bill-list'), {'due_status': 'overdue'}),
+        ('bill-list-create', reverse('bill-list-create'), {}),
+        ('bill-list-create-search', reverse('bill-list-create'), {'search': 'Tower 1'}),
+        ('bill-stats', reverse('bill-stats'), {}),
+        ('bill-summary', reverse('bill-summary'), {}),
+        ('overdues-accounts', reverse('overdues-accounts'), {}),
+        ('receivable-aging', reverse('receivable-aging'), {}),
+        ('receivable-aging-buildings', reverse('receivable-aging-buildings'), {}),
+        ('user-financial-reports', reverse('user-financial-reports', kwargs={'user_id': resident_ids[0]}),
+         {'period': 'yearly', 'year': year}),
+        ('user-financial-comparison', reverse('user-financial-comparison'),
+         {'user_ids': ','.join(map(str, resident_ids)), 'year': year}),
+        ('financial-reports-export', reverse('financial-reports-export'), {'year': year}),
+        ('export-paid-bills-excel', reverse('export-paid-bills-excel'), {'year': year}),
+        ('expense-reflection', reverse('expense-reflection'), {'show_breakdown': 'true'}),
+        ('yearly-expense', reverse('yearly-expense'), {}),
+        ('monthly-expense', reverse('monthly-expense', kwargs={'year': year}), {}),
+        ('paginated-payments', reverse('paginated-payments'), {}),
+        ('ledger-accounts', reverse('ledger-accounts'), {}),
+    ]
+
+
+def tasks(today, resident_ids):
+    """(name, setup, callable) of the benchmarked Celery task bodies; setups are not timed."""
+    return [
+        ('generate_monthly_bill', None, lambda: generate_due_bills(today)),
+        ('update_bill_status', None, lambda: transition_due_statuses(today + timedelta(days=1))),
+        ('send_bill_notifications', lambda: notify_users(resident_ids), flush_bill_notifications),
+    ]
+
+
+def measure(run, repeat, context=nullcontext):
+    """
+    Call ``run`` once to warm up, then ``repeat`` times, each inside a fresh
+    ``context()``; returns the timings in milliseconds, the queries of the last
+    call and its result.
+    """
+    with context():
+        run()
+    timings = []
+    for _ in range(repeat):
+        stats = QueryStats()
+        with context(), connection.execute_wrapper(stats):
+            start = time.perf_counter()
+            result = run()
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings, stats, result
+
+
+def summarize(timings, stats):
+    timings = sorted(timings)
+    return {
+        'min_ms': round(timings[0], 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+        'max_ms': round(timings[-1], 2),
+        'queries': stats.count,
+        'db_ms': round(stats.duration * 1000, 2),
+    }
+
+
+def run_benchmark(repeat=5, names=None, log=None):
+    """
+    Time the endpoints (through the full middleware stack, authenticated as the
+    seed admin) and the Celery task bodies against the current database.
+
+    Each task run is rolled back, so every repetition sees the same data and
+    the database is left as it was; notifications go to an in-memory channel
+    layer. Returns the results dict written by ``manage.py benchmark_api``.
+    """
+    log = log or (lambda name, result: None)
+    admin = CustomUser.objects.filter(username=f'{SEED_PREFIX}admin').first()
+    if admin is None:
+        admin = CustomUser.objects.filter(role=CustomUser.Role.ADMIN).order_by('id').first()
+    if admin is None:
+        raise ValueError('No admin user to run the benchmark as; seed the database with seed_hoa first.')
+    resident_ids = list(
+        MonthlyBill.objects.order_by('user_id').values_list('user_id', flat=True).distinct()[:COMPARED_RESIDENTS]
+    ) or [admin.pk]
+    today = timezone.now().date()
+
+    client = APIClient()
+    client.force_authenticate(admin)
+    results = {'meta': metadata(repeat), 'endpoints': {}, 'tasks': {}}
+
+    for name, url, query in endpoints(resident_ids, today.year):
+        if names and name not in names:
+            continue
+        timings, stats, (status, size) = measure(lambda: _get(client, url, query), repeat)
+        results['endpoints'][name] = {**summarize(timings, stats), 'status': status, 'bytes': size}
+        log(name, results['endpoints'][name])
+
+    in_memory = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+    with override_settings(CHANNEL_LAYERS=in_memory, BILL_NOTIFICATION_DEBOUNCE_SECONDS=0):
+        for name, setup, task in tasks(today, resident_ids):
+            if names and name not in names:
+                continue
+            timings, stats, report = measure(task, repeat, context=partial(rolled_back, setup))
+            results['tasks'][name] = {**summarize(timings, stats), 'report': report}
+            log(name, results['tasks'][name])
+    return results
+
+
+def run_write_concurrency(seconds=5, writers=CONCURRENT_WRITERS, readers=CONCURRENT_READERS):
+    """
+    Contention benchmark, run for ``seconds`` with committed transactions:
+
+    - beat: one thread rewriting the bills of the latest month (the shape of
+      the Celery beat jobs)
+    - report: one thread streaming every bill (the shape of the exports and
+      the unpaginated bill list)
+    - writer: ``writers`` threads updating one bill per transaction (API writes)
+    - reader: ``readers`` threads totalling one resident's bills (API reads)
+
+    beat and report pause ``BATCH_PAUSE_SECONDS`` between runs.
+
+    Every write sets a column to its own value, so the data is left as it
+    was. Returns ops/s, latencies and "database is locked" errors per role.
+    """
+    latest = MonthlyBill.objects.order_by('-due_date').values_list('due_date', flat=True).first()
+    if latest is None:
+        raise ValueError('No bills to write; seed the database with seed_hoa first.')
+    month = MonthlyBill.objects.filter(due_date__year=latest.year, due_date__month=latest.month)
+    bill_ids = list(MonthlyBill.objects.values_list('id', flat=True)[:10000])
+    user_ids = list(MonthlyBill.objects.values_list('user_id', flat=True).distinct()[:1000])
+
+    def beat():
+        with transaction.atomic():
+            month.update(sms_sent=F('sms_sent'))
+
+    def report():
+        for _ in MonthlyBill.objects.values_list('amount_due', flat=True).iterator(chunk_size=2000):
+            pass
+
+    def write():
+        with transaction.atomic():
+            MonthlyBill.objects.filter(pk=random.choice(bill_ids)).update(sms_sent=F('sms_sent'))
+
+    def read():
+        MonthlyBill.objects.filter(user_id=random.choice(user_ids)).aggregate(total=Sum('amount_due'))
+
+    roles = [
+        ('beat', beat, BATCH_PAUSE_SECONDS),
+        ('report', report, BATCH_PAUSE_SECONDS),
+        *[('writer', write, 0)] * writers,
+        *[('reader', read, 0)] * readers,
+    ]
+    samples = {name: {'timings': [], 'errors': 0} for name, _, _ in roles}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(name, operation, pause):
+        timings, errors = [], 0
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    operation()
+                except OperationalError:
+                    errors += 1
+                    continue
+                timings.append((time.perf_counter() - start) * 1000)
+                time.sleep(pause)
+        finally:
+            connection.close()
+        with lock:
+            samples[name]['timings'] += timings
+            samples[name]['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=role) for role in roles]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    results = {}
+    for name, sample in samples.items():
+        timings = sorted(sample['timings']) or [0.0]
+        results[name] = {
+            'threads': sum(role == name for role, _, _ in roles),
+            'ops': len(sample['timings']),
+            'ops_per_s': round(len(sample['timings']) / seconds, 1),
+            'errors': sample['errors'],
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            'max_ms': round(timings[-1], 2),
+        }
+    return results
+
+
+def _get(client, url, query):
+    response = client.get(url, query)
+    if response.streaming:
+        # Drain streamed bodies so the timing covers producing all of them
+        return response.status_code, sum(len(chunk) for chunk in response.streaming_content)
+    return response.status_code, len(response.content)
+
+
+@contextmanager
+def rolled_back(setup=None):
+    with transaction.atomic():
+        if setup:
+            setup()
+        yield
+        transaction.set_rollback(True)
+
+
+def metadata(repeat):
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'repeat': repeat,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'database_options': {
+            key: value for key, value in connection.settings_dict['OPTIONS'].items() if key != 'password'
+        },
+        'rows': {
+            'units': Unit.all_objects.count(),
+            'assigned_units': AssignedUnit.all_objects.count(),
+            'users': CustomUser.all_objects.count(),
+            'bills': MonthlyBill.objects.count(),
+            'payments': PaymentRecord.objects.count(),
+            'ledger_accounts': LedgerAccount.objects.count(),
+        },
+    }
+
+
+def compare(results, baseline):
+    """Lines comparing the median times of ``results`` with a previous run's."""
+    lines = []
+    for section in ('endpoints', 'tasks'):
+        for name, current in results[section].items():
+            previous = baseline.get(section, {}).get(name)
+            if not previous or not previous['median_ms']:
+                continue
+            ratio = current['median_ms'] / previous['median_ms']
+            lines.append(
+                f"{name}: {previous['median_ms']} -> {current['median_ms']} ms ({ratio:.2f}x), "
+                f"queries {previous['queries']} -> {current['queries']}"
+            )
+    for name, current in results.get('concurrency', {}).items():
+        previous = baseline.get('concurrency', {}).get(name)
+        if not previous:
+            continue
+        lines.append(
+            f"concurrency {name}: {previous['ops_per_s']} -> {current['ops_per_s']} ops/s, "
+            f"p95 {previous['p95_ms']} -> {current['p95_ms']} ms, errors {previous['errors']} -> {current['errors']}"
+        )
+    return lines
+
+
+def write_results(results, path):
+    with open(path, 'w') as file:
+        json.dump(results, file, indent=2, sort_keys=True, default=str)
@@ -24,4 +24,16 @@ app.conf.beat_schedule = {
         # "schedule": crontab(hour=1, minute=0),  # Every day at 1 AM
         "schedule": crontab(minute="*"),  # every minute
     },
-}
\ No newline at end of file
+    "send-bill-notifications": {
+        "task": "bills.tasks.send_bill_notifications",
+        "schedule": 10.0,  # every 10 seconds
+    },
+    "purge-expired-exports": {
+        "task": "bills.tasks.purge_expired_exports",
+        "schedule": crontab(minute=0),  # every hour
+    },
+    "purge-sync-tombstones": {
+        "task": "sync.tasks.purge_tombstones",
+        "schedule": crontab(hour=3, minute=0),  # every day at 3 AM
+    },
+}
@@ -0,0 +1,173 @@
+import threading
+import time
+from bisect import bisect_left
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+
+# Upper bounds of the histogram buckets (a +Inf bucket is always added)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# Longest SQL text kept for the slowest query of an endpoint
+SLOWEST_SQL_LENGTH = 300
+
+
+class Histogram:
+    """Cumulative-bucket histogram with Prometheus semantics, per label set."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+        # Only the first matching bucket is counted here; render() accumulates
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += 1
+        series[2] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        for labels, (counts, count, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip([*self.buckets, '+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f'{self.name}_bucket{format_labels(labels, le=bound)} {cumulative}')
+            lines.append(f'{self.name}_count{format_labels(labels)} {count}')
+            lines.append(f'{self.name}_sum{format_labels(labels)} {total:g}')
+        return lines
+
+
+class RequestMetrics:
+    """
+    In-process registry of per-endpoint request metrics.
+
+    Each worker process keeps its own counts, and a scrape reports the worker
+    that served it (run one scrape target per worker, or a single worker, for
+    exact totals). Observing a request is a few dict updates under a lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = Histogram(
+            'http_request_duration_seconds', 'Request latency by endpoint.', LATENCY_BUCKETS
+        )
+        self.queries = Histogram(
+            'db_queries_per_request', 'Database queries per request by endpoint.', QUERY_COUNT_BUCKETS
+        )
+        self.db_time = Histogram(
+            'db_time_per_request_seconds', 'Database time per request by endpoint.', LATENCY_BUCKETS
+        )
+        self.size = Histogram(
+            'http_response_size_bytes', 'Response body size by endpoint (before compression).', SIZE_BUCKETS
+        )
+        self.slowest = {}
+
+    def observe(self, view, method, status, duration, queries, size):
+        with self.lock:
+            self.latency.observe((view, method, str(status)), duration)
+            self.queries.observe((view, method), queries.count)
+            self.db_time.observe((view, method), queries.duration)
+            if size is not None:
+                self.size.observe((view, method), size)
+            if queries.slowest_sql and queries.slowest > self.slowest.get(view, (0, ''))[0]:
+                self.slowest[view] = (queries.slowest, queries.slowest_sql)
+
+    def render(self):
+        with self.lock:
+            lines = [
+                *self.latency.render(),
+                *self.queries.render(),
+                *self.db_time.render(),
+                *self.size.render(),
+                '# HELP db_slowest_query_seconds Slowest query seen per endpoint.',
+                '# TYPE db_slowest_query_seconds gauge',
+            ]
+            # The SQL would make a series per distinct statement; it's on the slow-queries page
+            for view, (duration, sql) in sorted(self.slowest.items()):
+                lines.append(f'db_slowest_query_seconds{format_labels((view,))} {duration:g}')
+        return '\n'.join(lines) + '\n'
+
+    def render_slowest(self):
+        """The slowest query of each endpoint, slowest first, as plain text."""
+        with self.lock:
+            slowest = sorted(self.slowest.items(), key=lambda item: -item[1][0])
+        return ''.join(f'{view}\t{duration:g}s\t{sql}\n' for view, (duration, sql) in slowest)
+
+
+# Label names of the label tuples used by RequestMetrics
+LABEL_NAMES = ('view', 'method', 'status')
+
+
+def format_labels(values, **extra):
+    pairs = [*zip(LABEL_NAMES, values), *extra.items()]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+registry = RequestMetrics()
+
+
+class QueryStats:
+    """``connection.execute_wrapper`` counting and timing the queries of a request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = 0.0
+        self.slowest_sql = ''
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            if elapsed > self.slowest:
+                self.slowest = elapsed
+                self.slowest_sql = sql[:SLOWEST_SQL_LENGTH]
+
+
+def check_metrics_access(request):
+    """
+    Requires ``Authorization: Bearer <METRICS_TOKEN>`` when the token is set;
+    without one the metrics pages are only served with DEBUG on. Returns the
+    401 response to send, if any.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    elif not settings.DEBUG:
+        raise Http404
+    return None
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint (see ``check_metrics_access``)."""
+    return check_metrics_access(request) or HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+
+def slow_queries_view(request):
+    """
+    Debug page with the SQL of each endpoint's slowest query, one
+    ``view<TAB>seconds<TAB>sql`` line per endpoint (see ``check_metrics_access``).
+    """
+    return check_metrics_access(request) or HttpResponse(
+        registry.render_slowest(), content_type='text/plain; charset=utf-8'
+    )
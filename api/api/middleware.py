@@ -0,0 +1,119 @@
+import re
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from .metrics import QueryStats, registry
+
+try:
+    import brotli
+except ImportError:  # optional dependency; gzip only
+    brotli = None
+
+re_accepts_brotli = re.compile(r'\bbr\b')
+re_compressible_type = re.compile(r'^(text/|application/([\w.+-]*\+)?(json|x-ndjson|xml|javascript)\b)')
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    ``GZipMiddleware`` that prefers brotli when the client accepts it (and the
+    ``brotli`` package is installed) and only compresses text and JSON
+    responses of at least ``COMPRESSION_MIN_SIZE`` bytes.
+
+    Streaming responses are compressed chunk by chunk, so NDJSON/CSV streams
+    still reach the client incrementally.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not re_compressible_type.match(response.get('Content-Type', '')):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if (
+            brotli is None
+            or not re_accepts_brotli.search(accept_encoding)
+            or (response.streaming and response.is_async)
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if response.streaming:
+            response.streaming_content = self.brotli_sequence(response.streaming_content)
+            # Delete the `Content-Length` header for streaming content, because
+            # we won't know the compressed size until we stream it.
+            del response.headers['Content-Length']
+        else:
+            # Return the compressed content only if it's actually shorter.
+            compressed_content = brotli.compress(response.content, quality=5)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        # If there is a strong ETag, make it weak to fulfill the requirements
+        # of RFC 9110 Section 8.8.1 while also allowing conditional request
+        # matches on ETags.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+    @staticmethod
+    def brotli_sequence(sequence):
+        compressor = brotli.Compressor(quality=5)
+        for item in sequence:
+            data = compressor.process(item) + compressor.flush()
+            if data:
+                yield data
+        yield compressor.finish()
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, query count, database time, response size and the slowest
+    query of every request under its URL name (see ``RequestMetrics``), served
+    in the Prometheus text format by ``metrics_view``; the SQL of the slowest
+    queries is on ``slow_queries_view``.
+
+    With ``METRICS_RESPONSE_HEADERS`` on, responses also carry
+    ``X-Query-Count`` and a ``Server-Timing`` header (shown by browser dev tools).
+    Placed after ``CompressionMiddleware`` so sizes are measured uncompressed;
+    streaming responses have no size, and queries run while they stream aren't
+    counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match is not None else '<unresolved>'
+        size = None if response.streaming else len(response.content)
+        registry.observe(view, request.method, response.status_code, duration, queries, size)
+
+        if getattr(settings, 'METRICS_RESPONSE_HEADERS', settings.DEBUG):
+            response.headers['X-Query-Count'] = str(queries.count)
+            response.headers['Server-Timing'] = (
+                f'db;dur={queries.duration * 1000:.1f};desc="{queries.count} queries", '
+                f'app;dur={duration * 1000:.1f}'
+            )
+        return response
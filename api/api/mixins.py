@@ -0,0 +1,212 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+class EagerLoadingMixin:
+    """
+    Serializer mixin that works out the relations a serializer reads, so list
+    endpoints can load them up front instead of issuing queries per row.
+
+    Relations are derived from the serializer's (possibly trimmed) fields:
+    nested serializers, dotted sources such as ``source="user.email"`` and
+    related fields that need the related object (e.g. ``StringRelatedField``).
+    ``select_related`` / ``prefetch_related`` add lookups that can't be derived.
+
+    Usage:
+        bills = MonthlyBillSerializer.eager_load(MonthlyBill.objects.all())
+    """
+    select_related = ()
+    prefetch_related = ()
+
+    @classmethod
+    def eager_load(cls, queryset):
+        """Apply the relations of a default ``cls()`` to ``queryset``."""
+        return apply_eager_loading(queryset, cls())
+
+
+def apply_eager_loading(queryset, serializer):
+    """Add the ``select_related``/``prefetch_related`` lookups ``serializer`` needs."""
+    serializer = getattr(serializer, 'child', serializer)
+    select, prefetch = serializer_relations(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+def serializer_relations(serializer):
+    """Return the ``(select_related, prefetch_related)`` lookups for a serializer instance."""
+    model = serializer.Meta.model
+    select = list(getattr(serializer, 'select_related', ()))
+    prefetch = list(getattr(serializer, 'prefetch_related', ()))
+
+    for field in serializer._readable_fields:
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        path, many = _relation_path(model, field.source_attrs, _needs_related_object(nested))
+        if not path:
+            continue
+        many = many or nested is not field
+
+        if isinstance(nested, serializers.ModelSerializer):
+            nested_select, nested_prefetch = serializer_relations(nested)
+        else:
+            nested_select, nested_prefetch = [], []
+
+        if many:
+            # Past a to-many relation everything has to be prefetched
+            prefetch.append(path)
+            prefetch += [f'{path}__{lookup}' for lookup in nested_select + nested_prefetch]
+        else:
+            select.append(path)
+            select += [f'{path}__{lookup}' for lookup in nested_select]
+            prefetch += [f'{path}__{lookup}' for lookup in nested_prefetch]
+
+    return list(dict.fromkeys(select)), list(dict.fromkeys(prefetch))
+
+
+def _needs_related_object(field):
+    """Whether reading ``field`` loads the related object, not just its key."""
+    if isinstance(field, (serializers.BaseSerializer, serializers.ManyRelatedField)):
+        return True
+    return isinstance(field, serializers.RelatedField) and not field.use_pk_only_optimization()
+
+
+def _relation_path(model, source_attrs, include_last):
+    """The model relations a source walks through, as a lookup, and whether one is to-many."""
+    path, many = [], False
+    for index, attr in enumerate(source_attrs):
+        if index == len(source_attrs) - 1 and not include_last:
+            break
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not model_field.is_relation:
+            break
+        path.append(attr)
+        many = many or model_field.many_to_many or model_field.one_to_many
+        model = model_field.related_model
+    return '__'.join(path), many
+
+
+def apply_sparse_fields(serializer, query_params):
+    """
+    Trim ``serializer`` (or a list serializer's child) to the requested fields.
+
+    - ``?fields=id,amount_due,user.first_name`` keeps only the listed fields;
+      a dotted name keeps only those fields of the nested serializer.
+    - ``?expand=user,bill.unit`` expands only the listed nested serializers;
+      the others are rendered as their primary key(s) and never run.
+      Without ``expand`` nested serializers are expanded as before.
+
+    Unknown names are ignored.
+    """
+    fields = query_params.get('fields')
+    expand = query_params.get('expand')
+    if fields is None and expand is None:
+        return serializer
+
+    _trim(
+        getattr(serializer, 'child', serializer),
+        _field_tree(fields) if fields is not None else None,
+        _field_tree(expand) if expand is not None else None,
+    )
+    return serializer
+
+
+def _field_tree(value):
+    """"id,user.first_name,user.email" -> {"id": {}, "user": {"first_name": {}, "email": {}}}"""
+    tree = {}
+    for name in value.split(','):
+        node = tree
+        for part in name.strip().split('.'):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+def _trim(serializer, fields, expand):
+    for name in list(serializer.fields):
+        field = serializer.fields[name]
+        if fields is not None and name not in fields:
+            serializer.fields.pop(name)
+            continue
+
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        if not isinstance(nested, serializers.Serializer):
+            continue
+
+        nested_fields = (fields or {}).get(name) or None
+        if expand is not None and name not in expand and nested_fields is None:
+            serializer.fields[name] = _primary_key_field(field, name)
+        else:
+            _trim(nested, nested_fields, (expand or {}).get(name) if expand is not None else None)
+
+
+def _primary_key_field(field, name):
+    kwargs = {'read_only': True, 'many': isinstance(field, serializers.ListSerializer)}
+    if field.source != name:
+        kwargs['source'] = field.source
+    return serializers.PrimaryKeyRelatedField(**kwargs)
+
+
+class UniqueConflictMixin:
+    """
+    Serializer mixin for models whose uniqueness is enforced by a database
+    constraint instead of an ``exists()`` check in ``validate()``.
+
+    ``save()`` runs in a savepoint and a unique violation is raised as a
+    ``ValidationError`` with ``unique_conflict_detail()``, so duplicates are
+    still a 400 while a valid write is a single statement that concurrent
+    requests can't race. Set ``Meta.validators = []`` as well, or DRF adds
+    its own query-based validator for multi-field constraints.
+    """
+    unique_conflict_message = 'This record already exists.'
+
+    def unique_conflict_detail(self):
+        return {api_settings.NON_FIELD_ERRORS_KEY: [self.unique_conflict_message]}
+
+    def save(self, **kwargs):
+        try:
+            with transaction.atomic():
+                return super().save(**kwargs)
+        except IntegrityError as error:
+            if not is_unique_violation(error):
+                raise
+            raise serializers.ValidationError(self.unique_conflict_detail()) from error
+
+
+def is_unique_violation(error):
+    """Whether an ``IntegrityError`` is a unique constraint violation (SQLite or PostgreSQL)."""
+    # psycopg2 exposes the SQLSTATE as pgcode, psycopg 3 as sqlstate
+    code = getattr(error.__cause__, 'pgcode', None) or getattr(error.__cause__, 'sqlstate', None)
+    if code:
+        return code == '23505'
+    return str(error).startswith('UNIQUE constraint failed')
+
+
+class EagerLoadingViewMixin:
+    """
+    Generic view mixin that eager-loads ``get_queryset()`` with the relations
+    the view's serializer reads (see ``EagerLoadingMixin``).
+    """
+
+    def get_queryset(self):
+        return apply_eager_loading(super().get_queryset(), self.get_serializer())
+
+
+class SparseFieldsViewMixin:
+    """
+    Generic view mixin for ``?fields=`` / ``?expand=`` on read requests
+    (see ``apply_sparse_fields``). Combined with ``EagerLoadingViewMixin``
+    only the relations of the requested fields are loaded.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self.request is not None and self.request.method == 'GET':
+            apply_sparse_fields(serializer, self.request.query_params)
+        return serializer
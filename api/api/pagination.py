@@ -0,0 +1,145 @@
+import base64
+import json
+from datetime import date, datetime
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over a fixed ordering such as ('-due_date', '-id').
+
+    A page is addressed by an opaque cursor holding the ordering values of the
+    row it starts after, and is read with
+        WHERE (due_date, id) < (cursor values) ORDER BY due_date DESC, id DESC LIMIT n + 1
+    so there is no COUNT(*) and no OFFSET scan: every page costs the same.
+
+    All ordering fields must share one direction and the last one must be unique
+    (normally the primary key).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, ordering):
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip('-') for field in self.ordering)
+        self.descending = self.ordering[0].startswith('-')
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, page_size))
+        except (TypeError, ValueError):
+            pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        # Walking backwards reads the rows before the cursor in flipped order
+        descending = self.descending != reverse
+        queryset = queryset.order_by(*(('-' if descending else '') + field for field in self.fields))
+        if position is not None:
+            queryset = queryset.filter(self._after(position, descending))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+
+        self.page = results
+        return results
+
+    def _after(self, position, descending):
+        """Rows strictly past ``position`` in the given direction."""
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f'{field}__{lookup}': position[index]})
+            for equal_field, value in zip(self.fields[:index], position):
+                step &= Q(**{equal_field: value})
+            condition |= step
+        return condition
+
+    def decode_cursor(self, request):
+        """Return ``(position, reverse)``; no cursor means the first page."""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = cursor['p'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, obj, reverse):
+        position = []
+        for field in self.fields:
+            value = getattr(obj, field)
+            if isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            elif not isinstance(value, (int, str, type(None))):
+                value = str(value)
+            position.append(value)
+        cursor = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(cursor.encode()).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+
+class PageNumberOrKeysetPagination(PageNumberPagination):
+    """
+    Page-number pagination by default (``?page=``, with a total ``count``).
+
+    Views that declare ``keyset_ordering`` also serve keyset pages when the
+    request has ``?pagination=keyset`` or a ``?cursor=``; those responses carry
+    only ``next``/``previous`` cursors and ``results``. Keyset pages always use
+    ``keyset_ordering``, so ``?ordering=`` is ignored in that mode.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        ordering = getattr(view, 'keyset_ordering', None)
+        if ordering and (
+            request.query_params.get('pagination') == 'keyset'
+            or KeysetPagination.cursor_query_param in request.query_params
+        ):
+            self.keyset = KeysetPagination(ordering)
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
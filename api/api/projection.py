@@ -0,0 +1,226 @@
+from datetime import date
+from decimal import Decimal
+from operator import itemgetter
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import ISO_8601
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+# DRF fields whose representation of a database value is the value itself
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+# Returned by a getter whose key DRF would leave out of the representation
+SKIP = object()
+
+
+class RowProjector:
+    """
+    Fast read-only path for a serializer: rows are read with ``values_list()``
+    and turned into dicts of the same JSON shape, without instantiating models
+    or serializers per row.
+
+    The serializer is compiled once per projector into one getter per output
+    key. Model fields (also across forward relations and nested serializers)
+    are projected automatically; anything else, e.g. a method source or a
+    ``StringRelatedField``, has to be declared on the serializer:
+
+        class MonthlyBillSerializer(serializers.ModelSerializer):
+            row_projections = {
+                # output key: (values() lookups, function of their values)
+                "user_fullname": (("user__first_name", "user__last_name"), full_name),
+            }
+
+    Usage:
+        data = RowProjector(MonthlyBillSerializer).project(MonthlyBill.objects.all())
+
+    A serializer instance (e.g. one trimmed by ``apply_sparse_fields``) can be
+    passed instead of the class; its context is used.
+    """
+
+    def __init__(self, serializer, context=None):
+        if isinstance(serializer, serializers.BaseSerializer):
+            serializer = getattr(serializer, 'child', serializer)
+            context = serializer.context
+        else:
+            serializer = serializer(context=context or {})
+        self.context = context or {}
+        self.lookups = []
+        self.getters = self._compile(serializer, prefix='')
+
+    def project(self, queryset):
+        rows = queryset.values_list(*self.lookups)
+        getters = self.getters
+        return [
+            {key: value for key, getter in getters if (value := getter(row)) is not SKIP}
+            for row in rows
+        ]
+
+    def iterate(self, queryset, chunk_size=2000):
+        """Like ``project()``, but lazily, reading ``chunk_size`` rows at a time."""
+        getters = self.getters
+        for row in queryset.values_list(*self.lookups).iterator(chunk_size=chunk_size):
+            yield {key: value for key, getter in getters if (value := getter(row)) is not SKIP}
+
+    def _column(self, lookup):
+        """Index of ``lookup`` in the selected row, adding it if needed."""
+        if lookup not in self.lookups:
+            self.lookups.append(lookup)
+        return self.lookups.index(lookup)
+
+    def _compile(self, serializer, prefix):
+        model = serializer.Meta.model
+        projections = getattr(serializer, 'row_projections', {})
+        getters = []
+
+        for field in serializer._readable_fields:
+            key = field.field_name
+            if key in projections:
+                lookups, function = projections[key]
+                getters.append((key, self._computed([prefix + lookup for lookup in lookups], function)))
+                continue
+
+            lookup = '__'.join(field.source_attrs)
+            model_field = self._model_field(model, field.source_attrs, serializer, key)
+
+            if isinstance(field, serializers.ManyRelatedField):
+                raise ImproperlyConfigured(
+                    f"{type(serializer).__name__}.{key}: to-many relations can't be projected"
+                )
+            if isinstance(field, serializers.BaseSerializer):
+                if isinstance(field, serializers.ListSerializer):
+                    raise ImproperlyConfigured(
+                        f"{type(serializer).__name__}.{key}: to-many nested serializers can't be projected"
+                    )
+                getters.append((key, self._nested(
+                    self._column(prefix + lookup),
+                    self._compile(field, prefix + lookup + '__')
+                )))
+            else:
+                guards = [
+                    self._column(prefix + '__'.join(field.source_attrs[:depth]))
+                    for depth in range(1, len(field.source_attrs))
+                    if self._model_field(model, field.source_attrs[:depth], serializer, key).null
+                ]
+                getters.append((key, self._value(self._column(prefix + lookup), field, model_field, guards)))
+
+        return getters
+
+    def _model_field(self, model, source_attrs, serializer, key):
+        """Resolve a source through forward relations to a concrete model field."""
+        try:
+            for attr in source_attrs[:-1]:
+                model = model._meta.get_field(attr).related_model
+            model_field = model._meta.get_field(source_attrs[-1])
+        except (AttributeError, IndexError, FieldDoesNotExist):
+            model_field = None
+        if model_field is None or not model_field.concrete:
+            raise ImproperlyConfigured(
+                f"{type(serializer).__name__}.{key} is not a model field; "
+                f"declare it in row_projections to project it"
+            )
+        return model_field
+
+    def _value(self, index, field, model_field, guards=()):
+        if isinstance(field, serializers.FileField):
+            convert = self._file_url(field, model_field.storage)
+        elif isinstance(field, PASSTHROUGH_FIELDS):
+            convert = None
+        else:
+            convert = self._converter(field)
+
+        if convert is None and not guards:
+            return itemgetter(index)
+
+        def getter(row):
+            # DRF leaves out a dotted source (e.g. "unit.unit_name") whose relation is null
+            for guard in guards:
+                if row[guard] is None:
+                    return SKIP
+            value = row[index]
+            if convert is None:
+                return value
+            # Like DRF, empty values are not passed to to_representation
+            return convert(value) if value is not None else None
+        return getter
+
+    def _converter(self, field):
+        """A fast equivalent of ``field.to_representation`` for database values."""
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if isinstance(output_format, str) and output_format.lower() == ISO_8601 and field_timezone is not None:
+                def datetime_to_iso(value):
+                    if timezone.is_naive(value):
+                        return field.to_representation(value)
+                    value = value.astimezone(field_timezone).isoformat()
+                    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+                return datetime_to_iso
+
+        elif isinstance(field, serializers.DateField):
+            output_format = getattr(field, 'format', api_settings.DATE_FORMAT)
+            if isinstance(output_format, str) and output_format.lower() == ISO_8601:
+                return date.isoformat
+
+        elif isinstance(field, serializers.DecimalField):
+            coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+            if coerce_to_string and field.decimal_places is not None and not field.normalize_output:
+                exponent = Decimal(1).scaleb(-field.decimal_places)
+
+                def decimal_to_string(value):
+                    return '{:f}'.format(value.quantize(exponent, rounding=field.rounding))
+                return decimal_to_string
+
+        return field.to_representation
+
+    def _file_url(self, field, storage):
+        request = self.context.get('request')
+        if not getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL):
+            return lambda name: name or None
+        urls = {'': None}
+
+        def file_url(name):
+            # Many rows share a file (e.g. a resident's profile); build each URL once
+            if name not in urls:
+                url = storage.url(name)
+                urls[name] = request.build_absolute_uri(url) if request is not None else url
+            return urls[name]
+        return file_url
+
+    def _nested(self, index, getters):
+        def getter(row):
+            # A null foreign key serializes the whole nested object as None
+            if row[index] is None:
+                return None
+            return {key: value for key, nested_getter in getters if (value := nested_getter(row)) is not SKIP}
+        return getter
+
+    def _computed(self, lookups, function):
+        indexes = [self._column(lookup) for lookup in lookups]
+
+        def getter(row):
+            return function(*(row[index] for index in indexes))
+        return getter
+
+
+class RowProjectionMixin:
+    """
+    List view mixin that serializes unpaginated lists through a ``RowProjector``
+    when ``row_projection = True`` (same JSON, much cheaper per row).
+    """
+    row_projection = False
+
+    def list(self, request, *args, **kwargs):
+        if not self.row_projection or self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(RowProjector(self.get_serializer()).project(queryset))
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+from rest_framework import serializers
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency; fall back to DRF's stdlib-json renderer
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` that encodes with orjson when it is installed.
+
+    The output matches what DRF produces with the default settings (compact,
+    UTF-8, ``\\u2028``/``\\u2029`` escaped): values orjson doesn't encode the
+    same way (Decimal, datetime/date/time, lazy strings, ...) go through DRF's
+    ``JSONEncoder``. Indented output, non-default JSON settings and anything
+    orjson rejects (e.g. integers over 64 bits) are rendered by the stdlib
+    renderer.
+
+    One difference remains: NaN and +/-Infinity, which DRF's strict JSON
+    rejects with a ValueError, are rendered as ``null`` (telling them apart
+    from None would take another pass over the data).
+    """
+    options = (
+        orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            or not (self.compact and self.ensure_ascii is False and self.strict)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except TypeError:  # orjson.JSONEncodeError
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Like DRF, keep the output a strict JavaScript subset
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class StreamingRenderer(BaseRenderer):
+    """
+    Renderer for one-row-per-line formats. ``stream()`` encodes an iterable
+    of rows lazily, ``rows_per_chunk`` rows at a time, for a
+    ``StreamingHttpResponse`` (see ``api.streaming.StreamingListMixin``);
+    ``render()`` covers ordinary responses such as errors.
+    """
+    rows_per_chunk = 500
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return b''.join(self.stream(data if isinstance(data, list) else [data]))
+
+    def stream(self, rows, serializer=None):
+        raise NotImplementedError('Streaming renderers must define .stream()')
+
+    def chunks(self, rows):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == self.rows_per_chunk:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+class NDJSONRenderer(StreamingRenderer):
+    """Newline-delimited JSON: one JSON object per row."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = None
+
+    def stream(self, rows, serializer=None):
+        render = FastJSONRenderer().render
+        for chunk in self.chunks(rows):
+            yield b''.join(render(row) + b'\n' for row in chunk)
+
+
+class CSVRenderer(StreamingRenderer):
+    """
+    CSV with a header row. Nested objects are flattened into dotted columns
+    (``user.first_name``) and lists are written as JSON. The header comes from
+    the serializer's fields when it is given, else from the first rows.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def stream(self, rows, serializer=None):
+        header = csv_header(getattr(serializer, 'child', serializer)) if serializer is not None else None
+        output = io.StringIO()
+        writer = csv.writer(output)
+
+        header_written = False
+        for chunk in self.chunks(rows):
+            chunk = [flatten_row(row) for row in chunk]
+            if header is None:
+                header = list(dict.fromkeys(key for row in chunk for key in row))
+            if not header_written:
+                writer.writerow(header)
+                header_written = True
+            writer.writerows([row.get(column, '') for column in header] for row in chunk)
+            yield output.getvalue().encode(self.charset)
+            output.seek(0)
+            output.truncate()
+
+        if not header_written and header:
+            writer.writerow(header)
+            yield output.getvalue().encode(self.charset)
+
+
+def csv_header(serializer):
+    """Column names of ``serializer``, nested serializers as dotted columns."""
+    header = []
+    for field in serializer._readable_fields:
+        if isinstance(field, serializers.Serializer):
+            header += [f'{field.field_name}.{column}' for column in csv_header(field)]
+        else:
+            header.append(field.field_name)
+    return header
+
+
+def flatten_row(row, prefix=''):
+    flat = {}
+    for key, value in row.items():
+        if isinstance(value, dict):
+            flat.update(flatten_row(value, f'{prefix}{key}.'))
+        elif isinstance(value, (list, tuple)):
+            flat[prefix + key] = json.dumps(value, cls=FastJSONRenderer.encoder_class)
+        else:
+            flat[prefix + key] = value
+    return flat
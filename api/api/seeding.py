@@ -0,0 +1,302 @@
+import random
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from bills.aging import refresh_receivable_aging
+from bills.models import MonthlyBill
+from bills.rollup import refresh_billing_rollup
+from bills.services import monthly_amount_for, monthly_due_dates
+from inquiries.models import Inquiry, InquiryType
+from notices.models import Notice, NoticeType
+from payments.ledger import record_bills_created
+from payments.models import PaymentMethod, PaymentRecord
+from units.models import AssignedUnit, Unit
+from users.models import CustomUser
+
+# Size presets of ``manage.py seed_hoa --scale`` (units, buildings)
+SCALES = {
+    '1k': (1000, 10),
+    '10k': (10000, 40),
+    '100k': (100000, 200),
+}
+
+# Every seeded username starts with this; the admin is SEED_PREFIX + 'admin'
+SEED_PREFIX = 'seed_'
+SEED_PASSWORD = 'seed-password'
+
+# Default last day of the seeded history, fixed so that runs are reproducible
+SEED_TODAY = date(2026, 3, 15)
+
+# Units (with their residents, bills and payments) inserted per batch
+SEED_BATCH_UNITS = 500
+
+# Share of the units with a resident assigned
+OCCUPANCY = 0.9
+
+# Chance that a bill is paid by now, by how many days it is past due
+PAID_RATES = [(90, 0.97), (30, 0.9), (0, 0.7)]
+
+# Chance that an unpaid past bill has a payment awaiting verification
+PENDING_PAYMENT_RATE = 0.15
+
+RENTS = [Decimal(rent) for rent in ('8000', '10000', '12000', '15000', '18000', '25000')]
+PAYMENT_METHODS = ['GCash', 'Maya', 'Bank Transfer', 'Cash']
+NOTICE_TYPES = ['General', 'Maintenance', 'Billing', 'Emergency']
+INQUIRY_TYPES = ['Plumbing', 'Electrical', 'Security', 'Billing', 'Amenities']
+FIRST_NAMES = ['Ana', 'Ben', 'Carla', 'Dan', 'Ella', 'Felix', 'Gia', 'Hugo', 'Ines', 'Jon', 'Kara', 'Leo']
+LAST_NAMES = ['Santos', 'Reyes', 'Cruz', 'Garcia', 'Mendoza', 'Torres', 'Flores', 'Ramos', 'Lim', 'Tan']
+
+
+class SeedError(Exception):
+    """The database already holds seeded data (and ``reset`` was not asked)."""
+
+
+def seed_hoa(units, buildings, years=2, seed=0, notices=None, inquiries=None, today=SEED_TODAY, log=None):
+    """
+    Fill the database with a synthetic HOA, reproducibly: the same arguments
+    always produce the same rows (apart from ids and creation timestamps).
+    ``today`` defaults to the fixed ``SEED_TODAY``, not the current date.
+
+    ``units`` units are spread over ``buildings`` buildings; about
+    ``OCCUPANCY`` of them get a resident and an ``AssignedUnit``. Each resident
+    has a monthly bill from their move-in day for up to ``years`` years through
+    ``today`` (with the current date, the next ``generate_due_bills`` run has
+    bills to create), paid ones with their completed ``PaymentRecord``. Notices target random
+    assignments and inquiries are filed by random residents.
+
+    Rows are inserted with ``bulk_create`` in batches of ``SEED_BATCH_UNITS``
+    units; the ledger is posted per batch, then the billing rollup and
+    receivables aging are rebuilt. Returns the number of rows created per model.
+    """
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    notices = 100 if notices is None else notices
+    inquiries = units // 5 if inquiries is None else inquiries
+    if CustomUser.all_objects.filter(username=f'{SEED_PREFIX}admin').exists():
+        raise SeedError('The database already holds seeded data; reset it first.')
+
+    password = make_password(SEED_PASSWORD)
+    admin = CustomUser.objects.create(
+        username=f'{SEED_PREFIX}admin', email=f'{SEED_PREFIX}admin@example.com', password=password,
+        first_name='Seed', last_name='Admin', address='Admin Office', phone_number='09000000000',
+        role=CustomUser.Role.ADMIN, is_staff=True,
+    )
+    methods = [PaymentMethod.objects.get_or_create(name=name)[0] for name in PAYMENT_METHODS]
+    counts = {'users': 1, 'units': 0, 'assigned_units': 0, 'bills': 0, 'payments': 0}
+
+    building_names = [f'Tower {index + 1}' for index in range(buildings)]
+    history_start = today - relativedelta(years=years)
+
+    for start in range(0, units, SEED_BATCH_UNITS):
+        with transaction.atomic():
+            batch = _seed_units(
+                rng, admin, password, methods, building_names,
+                range(start, min(start + SEED_BATCH_UNITS, units)), history_start, today,
+            )
+        for key, value in batch.items():
+            counts[key] += value
+        log(f"{min(start + SEED_BATCH_UNITS, units)}/{units} units, {counts['bills']} bills")
+
+    assignments = list(AssignedUnit.objects.filter(created_by=admin).order_by('id').values_list('id', 'unit_id', 'assigned_by'))
+    counts['notices'] = _seed_notices(rng, assignments, notices)
+    counts['inquiries'] = _seed_inquiries(rng, assignments, inquiries)
+
+    log('Rebuilding the billing rollup and receivables aging')
+    refresh_billing_rollup()
+    refresh_receivable_aging(today=today)
+    return counts
+
+
+def _seed_units(rng, admin, password, methods, building_names, numbers, history_start, today):
+    units, occupied = [], []
+    for number in numbers:
+        building = building_names[number % len(building_names)]
+        floor = number // len(building_names) // 20 + 1
+        units.append(Unit(
+            unit_name=f'{floor}{number // len(building_names) % 20 + 1:02d}',
+            building=building,
+            bedrooms=rng.randint(0, 3),
+            floor_area=Decimal(rng.randint(2400, 12000)) / 100,
+            rent_amount=rng.choice(RENTS),
+            isAvailable=True,
+            created_by=admin,
+        ))
+        if rng.random() < OCCUPANCY:
+            units[-1].isAvailable = False
+            occupied.append((number, units[-1]))
+    Unit.objects.bulk_create(units)
+
+    residents, move_ins = [], []
+    for number, unit in occupied:
+        # Most residents were there before the history starts, the rest moved in since
+        if rng.random() < 0.7:
+            move_in = history_start - timedelta(days=rng.randint(1, 1500))
+        else:
+            move_in = history_start + timedelta(days=rng.randint(0, max((today - history_start).days - 1, 0)))
+        move_ins.append(move_in)
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        residents.append(CustomUser(
+            username=f'{SEED_PREFIX}resident_{number + 1}',
+            email=f'{SEED_PREFIX}resident_{number + 1}@example.com',
+            password=password,
+            first_name=first,
+            last_name=last,
+            address=f'{unit.unit_name} {unit.building}',
+            phone_number=f'09{rng.randint(0, 999999999):09d}',
+            move_in_date=_aware(move_in),
+            role=CustomUser.Role.RESIDENT,
+            unit=unit,
+            created_by=admin,
+        ))
+    CustomUser.objects.bulk_create(residents)
+
+    assignments = []
+    for unit, resident, move_in in zip((unit for _, unit in occupied), residents, move_ins):
+        assignments.append(AssignedUnit(
+            unit_id=unit,
+            assigned_by=resident,
+            move_in_date=_aware(move_in),
+            building=unit.building,
+            maintenance=rng.random() < 0.8,
+            security=rng.random() < 0.8,
+            amenities=rng.random() < 0.5,
+            unit_status=rng.choice(AssignedUnit.UnitStatus.values),
+            created_by=admin,
+        ))
+    AssignedUnit.objects.bulk_create(assignments)
+
+    bills = []
+    for assigned, move_in in zip(assignments, move_ins):
+        amount = monthly_amount_for(assigned)
+        for due_date in monthly_due_dates(move_in + relativedelta(months=1), today):
+            if due_date < history_start:
+                continue
+            bills.append(_bill(rng, assigned, amount, due_date, today))
+    MonthlyBill.objects.bulk_create(bills, batch_size=1000)
+
+    payments, paid_by = [], {}
+    for bill in bills:
+        if bill.payment_status == MonthlyBill.PaymentStatus.PAID:
+            status = PaymentRecord.PaymentStatus.COMPLETED
+        elif bill.due_date <= today and rng.random() < PENDING_PAYMENT_RATE:
+            status = PaymentRecord.PaymentStatus.PENDING
+        else:
+            continue
+        paid_on = min(bill.due_date + timedelta(days=rng.randint(-7, 10)), today)
+        payments.append(PaymentRecord(
+            user_id=bill.user_id,
+            unit_id=bill.unit_id,
+            bill=bill,
+            amount=bill.amount_due,
+            status=status,
+            payment_type=PaymentRecord.PaymentType.REGULAR,
+            payment_date=_aware(paid_on),
+            reference_number=f'{rng.getrandbits(48):012X}',
+            payment_method=rng.choice(methods),
+        ))
+    PaymentRecord.objects.bulk_create(payments, batch_size=1000)
+    for payment in payments:
+        if payment.status == PaymentRecord.PaymentStatus.COMPLETED:
+            paid_by[payment.bill_id] = payment.pk
+
+    # bulk_create() skips the bill signals
+    record_bills_created(bills, paid_by)
+
+    return {
+        'users': len(residents),
+        'units': len(units),
+        'assigned_units': len(assignments),
+        'bills': len(bills),
+        'payments': len(payments),
+    }
+
+
+def _bill(rng, assigned, amount, due_date, today):
+    days_past_due = (today - due_date).days
+    paid_rate = next((rate for days, rate in PAID_RATES if days_past_due >= days), 0.05)
+    bill = MonthlyBill(
+        user=assigned.assigned_by,
+        unit=assigned.unit_id,
+        amount_due=amount,
+        due_date=due_date,
+        payment_status=MonthlyBill.PaymentStatus.PAID if rng.random() < paid_rate else MonthlyBill.PaymentStatus.PENDING,
+        sms_sent=days_past_due >= 0,
+    )
+    if bill.payment_status == MonthlyBill.PaymentStatus.PAID:
+        bill.due_status = MonthlyBill.DueStatus.DONE
+    elif due_date < today:
+        bill.due_status = MonthlyBill.DueStatus.OVERDUE
+    elif due_date == today:
+        bill.due_status = MonthlyBill.DueStatus.DUE_TODAY
+    else:
+        bill.due_status = MonthlyBill.DueStatus.UPCOMING
+    return bill
+
+
+def _seed_notices(rng, assignments, count):
+    types = [NoticeType.objects.get_or_create(name=name)[0] for name in NOTICE_TYPES]
+    notices = Notice.objects.bulk_create([
+        Notice(
+            title=f'Notice {number + 1}',
+            content=f'Announcement {number + 1} for the residents.',
+            notice_type=rng.choice(types),
+        )
+        for number in range(count)
+    ])
+    Audience = Notice.target_audience.through
+    audience = []
+    for notice in notices:
+        # Building-wide notices reach up to a few hundred assignments
+        for assigned_id, _, _ in rng.sample(assignments, min(len(assignments), rng.randint(1, 300))):
+            audience.append(Audience(notice_id=notice.pk, assignedunit_id=assigned_id))
+    Audience.objects.bulk_create(audience, batch_size=1000)
+    return len(notices)
+
+
+def _seed_inquiries(rng, assignments, count):
+    if not assignments:
+        return 0
+    types = [InquiryType.objects.get_or_create(name=name)[0] for name in INQUIRY_TYPES]
+    rows = []
+    for number in range(count):
+        _, unit_id, resident_id = rng.choice(assignments)
+        rows.append(Inquiry(
+            unit_id=unit_id,
+            resident_id=resident_id,
+            title=f'Inquiry {number + 1}',
+            description='Details of the inquiry.',
+            status=rng.choice(Inquiry.Status.values),
+            type=rng.choice(Inquiry.Category.values),
+            inquiry_type=rng.choice(types),
+        ))
+    Inquiry.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def reset_seed():
+    """
+    Delete the seeded rows (everything owned by the seed admin), then rebuild
+    the billing rollup and receivables aging. Returns the number of rows deleted.
+    """
+    admin = CustomUser.all_objects.filter(username=f'{SEED_PREFIX}admin').first()
+    if admin is None:
+        return 0
+    residents = CustomUser.all_objects.filter(created_by=admin)
+    deleted = 0
+    with transaction.atomic():
+        # Payments protect their user and unit, so they go first
+        deleted += PaymentRecord.objects.filter(user__in=residents).delete()[0]
+        deleted += Notice.objects.filter(target_audience__created_by=admin).distinct().delete()[0]
+        deleted += Unit.all_objects.filter(created_by=admin).delete()[0]
+        deleted += residents.delete()[0]
+        deleted += CustomUser.all_objects.filter(pk=admin.pk).delete()[0]
+    refresh_billing_rollup()
+    refresh_receivable_aging()
+    return deleted
+
+
+def _aware(day):
+    return timezone.make_aware(datetime.combine(day, time(9)))
@@ -104,11 +104,14 @@ INSTALLED_APPS = [
     'inquiries',
     'units',
     "bills",
-    "hoa_info"
+    "hoa_info",
+    "sync",
 ]
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.CompressionMiddleware',
+    'api.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -139,7 +142,11 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',  # orjson when installed, same output as JSONRenderer
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.PageNumberOrKeysetPagination",
     "PAGE_SIZE": 7,  # default page size
     'DEFAULT_FILTER_BACKENDS': 'django_filters.rest_framework.DjangoFilterBackend'
 }
@@ -159,7 +166,15 @@ STORAGES = {
     },
     "staticfiles": {
         "BACKEND": "cloudinary_storage.storage.StaticHashedCloudinaryStorage",
-    }
+    },
+    # Report export artifacts (bills.ExportJob). Must be reachable by both the web
+    # and the Celery workers; use RawMediaCloudinaryStorage when they run on separate hosts.
+    "exports": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+        "OPTIONS": {
+            "location": os.environ.get('EXPORT_STORAGE_ROOT', BASE_DIR / 'exports'),
+        },
+    },
 }
 
 CLOUDINARY_STORAGE = {
@@ -196,13 +211,65 @@ FRONTEND_URL = 'https://dwellahome2.netlify.app'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
-
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# DB_ENGINE=postgresql selects PostgreSQL (DB_NAME, DB_USER, DB_PASSWORD,
+# DB_HOST, DB_PORT); otherwise SQLite is used, at DB_NAME if set.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite').lower()
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'dwella'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Seconds a connection is reused across requests (0 closes it after each one)
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            # Check a reused connection before its first query of a request
+            'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'true').lower() in ('1', 'true', 'yes'),
+            'OPTIONS': {},
+        }
+    }
+    # DB_POOL=psycopg: in-process psycopg connection pool (needs psycopg-pool;
+    #   replaces persistent connections, so CONN_MAX_AGE is 0)
+    # DB_POOL=pgbouncer: server-side pooler in transaction mode, which can't
+    #   keep the server-side cursors of QuerySet.iterator() open across statements
+    DB_POOL = os.environ.get('DB_POOL', '').lower()
+    if DB_POOL == 'psycopg':
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+    elif DB_POOL == 'pgbouncer':
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Per-connection pragmas. WAL itself (requests read while a Celery
+                # job writes) is persistent and set once by bills migration 0014;
+                # NORMAL syncs at checkpoints only, which is durable enough with
+                # WAL; reads go through a 256 MB memory map
+                'init_command': (
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA mmap_size=268435456;'
+                ),
+                # Busy timeout: seconds a writer waits for the lock before
+                # "database is locked"
+                'timeout': int(os.environ.get('DB_SQLITE_TIMEOUT', 20)),
+                # Take the write lock at BEGIN, so transactions queue on the busy
+                # timeout instead of failing when a read lock can't be upgraded
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
     }
-}
 
 
 # Password validation
@@ -250,6 +317,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
+# Bill websocket notifications are queued and sent once a user's changes
+# have been quiet for the debounce window (or waited for the max delay)
+BILL_NOTIFICATION_DEBOUNCE_SECONDS = 5
+BILL_NOTIFICATION_MAX_DELAY_SECONDS = 60
+
+# Finished report exports can be downloaded for this long before they are purged
+EXPORT_JOB_TTL_SECONDS = int(os.environ.get('EXPORT_JOB_TTL_SECONDS', 24 * 60 * 60))
+
+# Deleted rows are reported to delta sync clients (sync app) for this long;
+# clients that last synced earlier get a full reset
+SYNC_TOMBSTONE_TTL_DAYS = int(os.environ.get('SYNC_TOMBSTONE_TTL_DAYS', 30))
+# Each delta sync re-reads this far back before the client's watermark, so rows
+# saved before a watermark but committed after it are still delivered
+SYNC_OVERLAP_SECONDS = int(os.environ.get('SYNC_OVERLAP_SECONDS', 60))
+
+# Text/JSON responses from this size on are gzip/brotli compressed (api.middleware)
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+
+# /metrics and /metrics/slow-queries (api.metrics) require this bearer token;
+# without one they are only served with DEBUG on
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Add X-Query-Count / Server-Timing headers to every response (api.middleware)
+METRICS_RESPONSE_HEADERS = os.environ.get('METRICS_RESPONSE_HEADERS', str(DEBUG)).lower() in ('1', 'true', 'yes')
+
 # CELERY_BEAT_SCHEDULE = {
 #     'generate-bills-every-minute': {
 #         'task': 'payments.tasks.generate_bills_task',
@@ -0,0 +1,39 @@
+from django.http import StreamingHttpResponse
+from .projection import RowProjector
+from .renderers import CSVRenderer, NDJSONRenderer, StreamingRenderer
+
+
+class StreamingListMixin:
+    """
+    Unpaginated list view mixin adding ``?format=ndjson`` / ``?format=csv``
+    (or ``Accept: application/x-ndjson`` / ``text/csv``).
+
+    Rows are read with a chunked database iterator and encoded and sent in
+    chunks as they are serialized, so memory stays flat however long the list
+    and the first bytes go out after the first chunk. Views with
+    ``row_projection = True`` stream projected rows (see ``api.projection``).
+    """
+    stream_chunk_size = 2000
+
+    def get_renderers(self):
+        return super().get_renderers() + [NDJSONRenderer(), CSVRenderer()]
+
+    def list(self, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, StreamingRenderer):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        serializer = self.get_serializer()
+        if getattr(self, 'row_projection', False):
+            rows = RowProjector(serializer).iterate(queryset, chunk_size=self.stream_chunk_size)
+        else:
+            rows = (
+                serializer.to_representation(instance)
+                for instance in queryset.iterator(chunk_size=self.stream_chunk_size)
+            )
+
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type += f'; charset={renderer.charset}'
+        return StreamingHttpResponse(renderer.stream(rows, serializer), content_type=content_type)
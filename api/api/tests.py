@@ -0,0 +1,402 @@
+import base64
+import difflib
+import gzip
+import re
+import tempfile
+import uuid
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from bills.models import ExportJob, MonthlyBill
+from hoa_info.models import HoaInformation
+from inquiries.models import Inquiry, InquiryType
+from notices.models import Notice, NoticeType
+from payments.ledger import rebuild_ledger
+from payments.models import LedgerAccount, PaymentMethod, PaymentRecord
+from units.models import AssignedUnit, Unit
+from users.models import CustomUser
+from .middleware import CompressionMiddleware, brotli
+from .renderers import FastJSONRenderer
+from .seeding import SeedError, reset_seed, seed_hoa
+
+
+class RequestMetricsTests(APITestCase):
+    """Per-endpoint request metrics and the /metrics scrape endpoint."""
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.create(username="admin", role="admin"))
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_metrics_are_recorded_per_endpoint(self):
+        self.client.get(reverse("bill-list"))
+
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        metrics = response.content.decode()
+        self.assertIn('http_request_duration_seconds_count{view="bill-list",method="GET",status="200"}', metrics)
+        self.assertIn('db_queries_per_request_bucket{view="bill-list",method="GET",le="+Inf"}', metrics)
+        self.assertIn('db_slowest_query_seconds{view="bill-list"}', metrics)
+        self.assertNotIn("SELECT", metrics)
+
+        self.assertEqual(self.client.get(reverse("slow-queries")).status_code, 401)
+        response = self.client.get(reverse("slow-queries"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertRegex(response.content.decode(), r"(?m)^bill-list\t[\d.e-]+s\tSELECT ")
+
+    @override_settings(METRICS_TOKEN="", DEBUG=False)
+    def test_metrics_hidden_without_token_in_production(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+
+    @override_settings(METRICS_RESPONSE_HEADERS=True)
+    def test_query_count_header(self):
+        response = self.client.get(reverse("bill-list"))
+        self.assertEqual(response["X-Query-Count"], "1")
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+
+class KeysetPaginationTests(APITestCase):
+    """?pagination=keyset walks a listing by cursor, ties on the ordering broken by id."""
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.create(username="admin", role="admin"))
+        resident = CustomUser.objects.create(username="resident", role="resident")
+        # Several bills per due date, so pages split rows that tie on due_date
+        for index in range(11):
+            unit = Unit.objects.create(unit_name=f"Unit {index}", building="A", rent_amount=1000)
+            for month in (1, 2, 3):
+                MonthlyBill.objects.create(user=resident, unit=unit, amount_due=1000, due_date=date(2025, month, 5))
+        self.expected = list(MonthlyBill.objects.order_by("-due_date", "-id").values_list("id", flat=True))
+
+    def page(self, url, **query):
+        response = self.client.get(url, query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def walk(self):
+        pages = [self.page(reverse("bill-list-create"), pagination="keyset", page_size=4)]
+        while pages[-1]["next"]:
+            pages.append(self.page(pages[-1]["next"]))
+        return pages
+
+    def test_full_walk_has_every_row_once(self):
+        pages = self.walk()
+        ids = [row["id"] for page in pages for row in page["results"]]
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(len(pages), 9)
+        self.assertIsNone(pages[0]["previous"])
+        self.assertNotIn("count", pages[0])
+
+    def test_next_and_previous_round_trip(self):
+        pages = self.walk()
+        for page, following in zip(pages, pages[1:]):
+            self.assertEqual(self.page(following["previous"])["results"], page["results"])
+
+        # Walking back from the last page visits the same pages
+        back = [pages[-1]]
+        while back[-1]["previous"]:
+            back.append(self.page(back[-1]["previous"]))
+        self.assertEqual([page["results"] for page in reversed(back)], [page["results"] for page in pages])
+        self.assertIsNotNone(back[-1]["next"])
+
+    def test_invalid_cursor_is_not_found(self):
+        wrong_shape = base64.urlsafe_b64encode(b'{"p":["2025-01-05"]}').decode()
+        for cursor in ["not-a-cursor", base64.urlsafe_b64encode(b"[1,2]").decode(), wrong_shape]:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(reverse("bill-list-create"), {"cursor": cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class SeedingTests(APITestCase):
+    """The synthetic HOA of manage.py seed_hoa."""
+
+    def bills(self):
+        return list(
+            MonthlyBill.objects.order_by("user__username", "due_date")
+            .values_list("user__username", "unit__unit_name", "amount_due", "due_date", "payment_status", "due_status")
+        )
+
+    def test_seed_is_reproducible_and_books_are_consistent(self):
+        today = date(2026, 3, 15)
+        counts = seed_hoa(40, 3, years=1, seed=7, notices=5, inquiries=10, today=today)
+        self.assertEqual(counts["units"], 40)
+        self.assertEqual(MonthlyBill.objects.count(), counts["bills"])
+        self.assertFalse(MonthlyBill.objects.filter(due_date__gt=today).exists())
+        first = self.bills()
+
+        # The live ledger equals the one rebuilt from the bill and payment history
+        balances = sorted(LedgerAccount.objects.values_list("user_id", "unit_id", "balance", "total_paid"))
+        rebuild_ledger()
+        self.assertEqual(sorted(LedgerAccount.objects.values_list("user_id", "unit_id", "balance", "total_paid")), balances)
+
+        with self.assertRaises(SeedError):
+            seed_hoa(40, 3, years=1, seed=7, today=today)
+        reset_seed()
+        self.assertFalse(MonthlyBill.objects.exists())
+        seed_hoa(40, 3, years=1, seed=7, notices=5, inquiries=10, today=today)
+        self.assertEqual(self.bills(), first)
+
+
+def url_patterns(patterns=None, prefix=""):
+    """(route, pattern) of every URL pattern of the project, depth first."""
+    for pattern in get_resolver().url_patterns if patterns is None else patterns:
+        if isinstance(pattern, URLResolver):
+            yield from url_patterns(pattern.url_patterns, prefix + str(pattern.pattern))
+        else:
+            yield prefix + str(pattern.pattern), pattern
+
+
+def normalize_sql(sql):
+    """SQL with its literal values masked, so runs over different rows compare equal."""
+    return re_sql_literal.sub("?", sql)
+
+
+re_sql_literal = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+class QueryCountTests(APITestCase):
+    """
+    Every endpoint runs the same number of SQL queries whatever the amount of
+    data: each URL pattern is requested (GET) against a small and a larger
+    seeded HOA, and a count that grows fails with the diff of the captured SQL.
+    Every GET succeeds, so the counts measure the real work of the endpoint
+    rather than an error path.
+    """
+
+    # (units, buildings, years) of the two seeded data sizes
+    SMALL = (6, 2, 1)
+    LARGE = (24, 3, 2)
+    TODAY = date(2026, 3, 15)
+
+    # Route prefix -> the object an <int:pk> of the route refers to
+    DETAIL_OBJECTS = {
+        "api/user/": lambda: CustomUser.objects.filter(role="resident").order_by("id").first(),
+        "api/payment-method/": lambda: PaymentMethod.objects.order_by("id").first(),
+        "api/payment/": lambda: PaymentRecord.objects.order_by("id").first(),
+        "api/ledger/accounts/": lambda: LedgerAccount.objects.order_by("id").first(),
+        "api/notice-type/": lambda: NoticeType.objects.order_by("id").first(),
+        "api/notice/": lambda: Notice.objects.order_by("id").first(),
+        "api/inquiry-type/": lambda: InquiryType.objects.order_by("id").first(),
+        "api/inquiry/": lambda: Inquiry.objects.order_by("id").first(),
+        "api/unit/": lambda: Unit.objects.order_by("id").first(),
+        "api/assigned_unit/": lambda: AssignedUnit.objects.order_by("id").first(),
+        "api/bills/exports/": lambda: ExportJob.objects.order_by("id").first(),
+        "api/bills/": lambda: MonthlyBill.objects.order_by("id").first(),
+        "api/^hoa-information/": lambda: HoaInformation.objects.order_by("id").first(),
+    }
+
+    # Routes whose <int:pk> is not the object of their prefix
+    ROUTE_OBJECTS = {
+        "api/assigned_unit/<int:pk>/": lambda: AssignedUnit.objects.order_by("id").first().assigned_by,
+    }
+
+    # Write-only routes, which answer a GET with 405
+    WRITE_ONLY = {
+        "api/register/", "api/token/", "api/token/refresh/",
+        "api/password-reset/", "api/password-reset/confirm/", "api/change-password/",
+        "api/user/update/<int:pk>/", "api/user/delete/<int:pk>/", "api/user/restore/<int:pk>/",
+        "api/payment-method/", "api/payment-method/<int:pk>/update/", "api/payment-method/<int:pk>/delete/",
+        "api/payment/", "api/payment/<int:pk>/update/", "api/payment/<int:pk>/delete/",
+        "api/payments/reconcile", "api/calculate-advance/",
+        "api/notice-type/", "api/notice-type/<int:pk>/update/", "api/notice-type/<int:pk>/delete/",
+        "api/notice/", "api/notice/<int:pk>/update/", "api/notice/<int:pk>/delete/",
+        "api/inquiry-type/", "api/inquiry-type/<int:pk>/update/", "api/inquiry-type/<int:pk>/delete/",
+        "api/inquiry/", "api/inquiry/<int:pk>/update/", "api/inquiry/<int:pk>/delete/",
+        "api/unit/", "api/unit/<int:pk>/update/", "api/unit/<int:pk>/delete/",
+        "api/unit/<int:pk>/delete-permanently/", "api/unit/<int:pk>/restore/",
+        "api/assigned_unit/", "api/assigned_unit/<int:pk>/update/", "api/assigned_unit/<int:pk>/delete/",
+        "api/assigned_unit/<int:pk>/restore/", "api/assigned_unit/<int:pk>/permanently-delete/",
+        "api/bills/exports/",
+    }
+
+    # Request headers an endpoint needs
+    HEADERS = {
+        "metrics": {"HTTP_AUTHORIZATION": "Bearer secret"},
+        "metrics/slow-queries": {"HTTP_AUTHORIZATION": "Bearer secret"},
+    }
+
+    # Query parameters an endpoint needs to do its work
+    QUERY = {
+        "api/bills/financial-reports/user/<int:user_id>/": lambda resident: {"period": "yearly", "year": 2025},
+        "api/bills/financial-reports/user-comparison/": lambda resident: {"user_ids": resident.pk, "year": 2025},
+    }
+
+    def setUp(self):
+        # The export file field resolves its storage once at import, so swap it directly
+        storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_dir.cleanup)
+        field = ExportJob._meta.get_field("file")
+        self.addCleanup(setattr, field, "storage", field.storage)
+        field.storage = FileSystemStorage(location=storage_dir.name)
+
+    def seed(self, units, buildings, years):
+        reset_seed()
+        seed_hoa(units, buildings, years=years, seed=1, notices=units, inquiries=units, today=self.TODAY)
+        admin = CustomUser.objects.get(username="seed_admin")
+        ExportJob.objects.create(
+            created_by=admin, kind=ExportJob.Kind.PAID_BILLS, params_hash="0" * 64, status=ExportJob.Status.DONE,
+            progress=100, file=ContentFile(b"Unit,Amount\r\n", name="paid_bills.csv"),
+        )
+        if not HoaInformation.objects.exists():
+            HoaInformation.objects.create(primary_payment_method=PaymentMethod.objects.order_by("id").first())
+        self.client.force_authenticate(admin)
+
+    def url_for(self, route, pattern, resident):
+        values = {"user_id": resident.pk, "year": 2025}
+        if route in self.ROUTE_OBJECTS:
+            values["pk"] = self.ROUTE_OBJECTS[route]().pk
+        elif "pk" in pattern.pattern.converters or "(?P<pk>" in route:
+            prefix = max((p for p in self.DETAIL_OBJECTS if route.startswith(p)), key=len)
+            values["pk"] = self.DETAIL_OBJECTS[prefix]().pk
+        path = route.replace("^", "").replace("$", "").replace("\\", "")
+        path = re.sub(r"<(?:\w+:)?(\w+)>|\(\?P<(\w+)>[^)]*\)", lambda m: str(values[m.group(1) or m.group(2)]), path)
+        return "/" + path
+
+    def capture(self):
+        captured = {}
+        resident = CustomUser.objects.filter(role="resident", monthly_bills__isnull=False).order_by("id").first()
+        for route, pattern in url_patterns():
+            # The admin site, and the format-suffix twins of the router routes
+            if route.startswith("admin/") or "format>" in route or "format_suffix" in route:
+                continue
+            url = self.url_for(route, pattern, resident)
+            query = self.QUERY[route](resident) if route in self.QUERY else {}
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, query, **self.HEADERS.get(route, {}))
+                if response.streaming:
+                    b"".join(response.streaming_content)
+            captured[route] = (url, response.status_code, [normalize_sql(q["sql"]) for q in queries.captured_queries])
+        return captured
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_query_counts_do_not_grow_with_data(self):
+        self.seed(*self.SMALL)
+        small = self.capture()
+        self.seed(*self.LARGE)
+        large = self.capture()
+
+        for route, (url, status, queries) in large.items():
+            small_url, small_status, small_queries = small[route]
+            with self.subTest(route=route, url=url):
+                expected = 405 if route in self.WRITE_ONLY else None
+                for size_status in (small_status, status):
+                    if expected:
+                        self.assertEqual(size_status, expected)
+                    else:
+                        self.assertLess(size_status, 400)
+                if len(queries) > len(small_queries):
+                    diff = "\n".join(difflib.unified_diff(small_queries, queries, "small", "large", lineterm=""))
+                    self.fail(f"{url} ran {len(small_queries)} -> {len(queries)} queries:\n{diff}")
+
+
+class FastJSONRendererTests(APITestCase):
+    """FastJSONRenderer renders the same bytes as DRF's JSONRenderer."""
+
+    PAYLOADS = {
+        "decimal": {"amount": Decimal("1234.50"), "zero": Decimal("-0.00"), "total": [Decimal("1E+2")]},
+        "datetime": {
+            "aware": datetime(2025, 3, 5, 8, 30, 15, 123456, tzinfo=dt_timezone.utc),
+            "naive": datetime(2025, 3, 5, 8, 30),
+            "date": date(2025, 3, 5),
+            "time": time(8, 30, 15, 500),
+            "timedelta": timedelta(days=1, seconds=5),
+        },
+        "text": {"name": "Ñiño ₱1,000", "separators": "a\u2028b\u2029c", "lazy": gettext_lazy("Paid")},
+        "mixed": [None, True, 1.5, 2 ** 63 - 1, {1: "int key"}, ("tuple",), {"set"}, uuid.UUID(int=1)],
+        "big integer": {"id": 2 ** 70},
+    }
+
+    def test_output_matches_the_drf_renderer(self):
+        for name, payload in self.PAYLOADS.items():
+            with self.subTest(name):
+                self.assertEqual(FastJSONRenderer().render(payload), JSONRenderer().render(payload))
+
+        indented = "application/json; indent=2"
+        self.assertEqual(
+            FastJSONRenderer().render(self.PAYLOADS["decimal"], indented),
+            JSONRenderer().render(self.PAYLOADS["decimal"], indented),
+        )
+
+    def test_non_finite_floats(self):
+        for value in (float("nan"), float("inf"), float("-inf")):
+            with self.subTest(value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render({"ratio": value})
+                self.assertEqual(FastJSONRenderer().render({"ratio": value}), b'{"ratio":null}')
+
+                # Without strict JSON DRF writes the JavaScript literals
+                with mock.patch.object(FastJSONRenderer, "strict", False), \
+                        mock.patch.object(JSONRenderer, "strict", False):
+                    self.assertEqual(FastJSONRenderer().render({"ratio": value}), JSONRenderer().render({"ratio": value}))
+
+
+class CompressionMiddlewareTests(APITestCase):
+    """Compression of large text responses, negotiated by Accept-Encoding."""
+
+    BODY = b'{"rows":[' + b",".join(b'{"id":%d,"status":"paid"}' % i for i in range(200)) + b"]}"
+
+    def respond(self, response, accept_encoding="gzip, deflate, br"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json_response(self, body=BODY):
+        return HttpResponse(body, content_type="application/json")
+
+    def test_gzip_when_brotli_is_not_accepted(self):
+        response = self.respond(self.json_response(), "gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(gzip.decompress(response.content), self.BODY)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_brotli_when_accepted(self):
+        response = self.respond(self.json_response())
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(brotli.decompress(response.content), self.BODY)
+
+    def test_identity_without_accept_encoding(self):
+        response = self.respond(self.json_response(), "")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(response.content, self.BODY)
+
+    def test_skipped_responses(self):
+        encoded = self.json_response()
+        encoded["Content-Encoding"] = "identity"
+        image = HttpResponse(self.BODY, content_type="image/png")
+
+        with override_settings(COMPRESSION_MIN_SIZE=len(self.BODY) + 1):
+            small = self.respond(self.json_response())
+        for name, response in (("small", small), ("encoded", self.respond(encoded)), ("image", self.respond(image))):
+            with self.subTest(name):
+                self.assertNotIn(response.get("Content-Encoding"), ("gzip", "br"))
+                self.assertFalse(response.has_header("Vary"))
+                self.assertEqual(response.content, self.BODY)
+
+    def test_streaming_responses_are_compressed_per_chunk(self):
+        chunks = [b'{"id":%d}\n' % i for i in range(500)]
+        encodings = ["gzip, deflate"] + (["br"] if brotli is not None else [])
+        for accept_encoding in encodings:
+            with self.subTest(accept_encoding):
+                response = self.respond(
+                    StreamingHttpResponse(iter(chunks), content_type="application/x-ndjson"), accept_encoding
+                )
+                self.assertFalse(response.has_header("Content-Length"))
+                self.assertIn("Accept-Encoding", response["Vary"])
+                content = b"".join(response.streaming_content)
+                if response["Content-Encoding"] == "br":
+                    self.assertEqual(brotli.decompress(content), b"".join(chunks))
+                else:
+                    self.assertEqual(gzip.decompress(content), b"".join(chunks))
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from .metrics import metrics_view, slow_queries_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -26,4 +27,7 @@ urlpatterns = [
     path('api/', include('units.urls')),
     path('api/', include('bills.urls')),
     path('api/', include('hoa_info.urls')),
+    path('api/', include('sync.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('metrics/slow-queries', slow_queries_view, name='slow-queries'),
 ]
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.utils.timezone import now
+from .models import MonthlyBill, ReceivableAging
+
+# Aging bucket fields and the days past due they cover (None: no upper bound)
+AGING_BUCKETS = {
+    'days_0_30': (0, 30),
+    'days_31_60': (31, 60),
+    'days_61_90': (61, 90),
+    'days_over_90': (91, None),
+}
+
+
+def _bucket_filter(today, low, high):
+    bucket = Q(due_date__lte=today - timedelta(days=low))
+    if high is not None:
+        bucket &= Q(due_date__gte=today - timedelta(days=high))
+    return bucket
+
+
+def refresh_receivable_aging(user_ids=None, today=None):
+    """
+    Recompute the aging rows of the given residents from their unpaid bills due
+    by ``today``, or the whole table when ``user_ids`` is None.
+
+    The buckets are summed by the database in one grouped query. Returns the
+    number of aging rows written.
+    """
+    today = today or now().date()
+    bills = MonthlyBill.objects.filter(payment_status=MonthlyBill.PaymentStatus.PENDING, due_date__lte=today)
+    rows = ReceivableAging.objects.all()
+    if user_ids is not None:
+        user_ids = {user_id for user_id in user_ids if user_id}
+        if not user_ids:
+            return 0
+        bills = bills.filter(user_id__in=user_ids)
+        rows = rows.filter(user_id__in=user_ids)
+
+    totals = (
+        bills
+        .values('user_id', 'unit__building')
+        .annotate(
+            **{
+                field: Sum('amount_due', filter=_bucket_filter(today, low, high), default=0)
+                for field, (low, high) in AGING_BUCKETS.items()
+            },
+            total=Sum('amount_due'),
+            bill_count=Count('id'),
+            oldest_due_date=Min('due_date'),
+        )
+        .order_by()
+    )
+
+    # Bills without a unit and units without a building share the '' building
+    aging = {}
+    for row in totals.iterator():
+        key = (row['user_id'], row['unit__building'] or '')
+        if key in aging:
+            current = aging[key]
+            for field in [*AGING_BUCKETS, 'total', 'bill_count']:
+                setattr(current, field, getattr(current, field) + row[field])
+            current.oldest_due_date = min(current.oldest_due_date, row['oldest_due_date'])
+            continue
+        aging[key] = ReceivableAging(
+            user_id=key[0],
+            building=key[1],
+            **{field: row[field] for field in [*AGING_BUCKETS, 'total', 'bill_count', 'oldest_due_date']},
+            as_of=today,
+        )
+
+    with transaction.atomic():
+        rows.delete()
+        created = ReceivableAging.objects.bulk_create(aging.values(), batch_size=500)
+    return len(created)
+
+
+def refresh_aging_for_day(user_ids, today=None):
+    """
+    Keep the aging current as of ``today``: everything when rows are left from
+    an earlier day (their buckets have shifted), else only ``user_ids``.
+    """
+    today = today or now().date()
+    if ReceivableAging.objects.filter(as_of__lt=today).exists():
+        return refresh_receivable_aging(today=today)
+    return refresh_receivable_aging(user_ids, today=today)
@@ -0,0 +1,577 @@
+import calendar
+import csv
+import hashlib
+import io
+import json
+import tempfile
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import chain, islice
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Q, Sum
+from django.utils.timezone import now
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+from .models import MonthlyBill, ExportJob
+from .reports import user_monthly_report, user_yearly_report
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CSV_CONTENT_TYPE = 'text/csv'
+
+# Bills fetched per database round trip while streaming rows
+PAID_BILLS_CHUNK_SIZE = 2000
+
+PAID_BILLS_HEADERS = [
+    'Bill ID', 'User', 'User Email', 'Unit', 'Building',
+    'Amount Due', 'Due Date', 'Payment Status', 'Due Status',
+    'SMS Sent', 'Created Date'
+]
+PAID_BILLS_CENTERED_COLUMNS = {6, 7, 8}  # Amount and date columns
+
+
+class NothingToExport(Exception):
+    """The export parameters matched no data."""
+
+
+def paid_bills_queryset(year, month='all', status='all'):
+    """
+    Paid/done bills for ``year`` (and ``month`` unless 'all'), ordered by due date.
+    ``status`` narrows to 'paid' (payment status) or 'done' (due status).
+    """
+    bills = MonthlyBill.objects.filter(
+        Q(payment_status=MonthlyBill.PaymentStatus.PAID) |
+        Q(due_status=MonthlyBill.DueStatus.DONE),
+        due_date__year=year,
+    )
+    if month != 'all':
+        bills = bills.filter(due_date__month=int(month))
+
+    if status == 'paid':
+        bills = bills.filter(payment_status=MonthlyBill.PaymentStatus.PAID)
+    elif status == 'done':
+        bills = bills.filter(due_status=MonthlyBill.DueStatus.DONE)
+
+    return bills.select_related('user', 'unit').order_by('due_date', 'id')
+
+
+def paid_bills_filename(year, month='all', extension='xlsx'):
+    if month == 'all':
+        return f"paid_bills_report_{year}_all_months.{extension}"
+    return f"paid_bills_report_{year}_{calendar.month_name[int(month)]}.{extension}"
+
+
+def paid_bill_row(bill):
+    # Get unit info safely
+    unit_name = bill.unit.unit_name if bill.unit else "N/A"
+    building_name = bill.unit.building if bill.unit and bill.unit.building else "N/A"
+
+    return [
+        bill.id,
+        bill.user.get_full_name() or bill.user.username,
+        bill.user.email,
+        unit_name,
+        building_name,
+        float(bill.amount_due),  # Convert Decimal to float for Excel
+        bill.due_date.strftime('%Y-%m-%d'),
+        bill.get_payment_status_display(),
+        bill.get_due_status_display(),
+        'Yes' if bill.sms_sent else 'No',
+        bill.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    ]
+
+
+def write_paid_bills_xlsx(bills, output, chunk_size=PAID_BILLS_CHUNK_SIZE, progress=None):
+    """
+    Write ``bills`` as the paid bills workbook into the binary file ``output``.
+
+    The workbook is written in write-only mode from a single chunked iterator,
+    so memory stays bounded for large exports. ``progress(rows_written)`` is
+    called after every chunk. Returns the number of bills written; nothing is
+    written when there are none.
+    """
+    bills = bills.iterator(chunk_size=chunk_size)
+
+    # The first chunk doubles as the empty check and the column width sample
+    first_rows = [(bill, paid_bill_row(bill)) for bill in islice(bills, chunk_size)]
+    if not first_rows:
+        return 0
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Paid Bills Report")
+
+    # Define styles
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_fill = PatternFill(start_color="344CB7", end_color="344CB7", fill_type="solid")
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center_align = Alignment(horizontal='center', vertical='center')
+
+    # Column widths must be set before the first row in write-only mode,
+    # so they are sized from the headers and the first chunk of rows
+    widths = [len(header) for header in PAID_BILLS_HEADERS]
+    for _, data in first_rows:
+        for col, value in enumerate(data):
+            widths[col] = max(widths[col], len(str(value)))
+    for col, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(col)].width = width + 2
+
+    # Write headers
+    header_cells = []
+    for header in PAID_BILLS_HEADERS:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = center_align
+        cell.border = border
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    # Write data, accumulating the summary totals in the same pass
+    bill_count = 0
+    total_amount = Decimal('0.00')
+    first_due_date = last_due_date = None
+
+    remaining_rows = ((bill, paid_bill_row(bill)) for bill in bills)
+    for bill, data in chain(first_rows, remaining_rows):
+        row_cells = []
+        for col, value in enumerate(data, 1):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.border = border
+            if col in PAID_BILLS_CENTERED_COLUMNS:
+                cell.alignment = center_align
+            row_cells.append(cell)
+        ws.append(row_cells)
+
+        bill_count += 1
+        total_amount += bill.amount_due
+        first_due_date = first_due_date or bill.due_date
+        last_due_date = bill.due_date
+        if progress and bill_count % chunk_size == 0:
+            progress(bill_count)
+
+    # Add summary section (after one blank row)
+    ws.append([])
+    summary_title = WriteOnlyCell(ws, value="SUMMARY")
+    summary_title.font = Font(bold=True, size=14)
+    ws.append([summary_title])
+
+    summary_data = [
+        ("Total Paid Bills", bill_count),
+        ("Total Amount", f"₱{total_amount:,.2f}"),
+        ("Average Amount", f"₱{total_amount / bill_count:,.2f}"),
+        ("Date Range", f"{first_due_date} to {last_due_date}"),
+        ("Generated On", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+    ]
+
+    for label, value in summary_data:
+        label_cell = WriteOnlyCell(ws, value=label)
+        label_cell.font = Font(bold=True)
+        ws.append([label_cell, value])
+
+    wb.save(output)
+    if progress:
+        progress(bill_count)
+    return bill_count
+
+
+def write_paid_bills_csv(bills, output, chunk_size=PAID_BILLS_CHUNK_SIZE, progress=None):
+    """CSV variant of ``write_paid_bills_xlsx`` (same columns, no summary)."""
+    bill_count = 0
+    with _text_writer(output) as stream:
+        writer = csv.writer(stream)
+        for bill in bills.iterator(chunk_size=chunk_size):
+            if not bill_count:
+                writer.writerow(PAID_BILLS_HEADERS)
+            writer.writerow(paid_bill_row(bill))
+            bill_count += 1
+            if progress and bill_count % chunk_size == 0:
+                progress(bill_count)
+    if progress:
+        progress(bill_count)
+    return bill_count
+
+
+def financial_report_filename(period, year, month):
+    if period == 'monthly':
+        return f"financial_report_{year}_{month:02d}.csv"
+    return f"financial_report_{year}.csv"
+
+
+def financial_report_data(period, year, month):
+    """
+    Paid bills collected across all residents for a month or a year,
+    with a per-user breakdown (one grouped query plus one user lookup).
+    """
+    bills = MonthlyBill.objects.filter(
+        payment_status=MonthlyBill.PaymentStatus.PAID,
+        due_date__year=year,
+    )
+    if period == 'monthly':
+        bills = bills.filter(due_date__month=month)
+
+    by_user = list(
+        bills.values('user_id')
+        .annotate(total_paid=Sum('amount_due'), bill_count=Count('id'))
+        .order_by('-total_paid', 'user_id')
+    )
+    users = get_user_model().objects.in_bulk([row['user_id'] for row in by_user])
+
+    total_collected = sum((row['total_paid'] for row in by_user), Decimal('0.00'))
+    total_bills = sum(row['bill_count'] for row in by_user)
+
+    report_data = {
+        'year': year,
+        'summary': {
+            'total_collected': total_collected,
+            'total_bills': total_bills,
+            'average_payment': total_collected / total_bills if total_bills else Decimal('0.00'),
+        },
+        'breakdowns': {
+            'by_user': [
+                {
+                    'user_id': row['user_id'],
+                    'user_name': users[row['user_id']].get_full_name() or users[row['user_id']].username,
+                    'total_paid': row['total_paid'],
+                    'bill_count': row['bill_count'],
+                    'percentage_of_total': round(row['total_paid'] / total_collected * 100, 2) if total_collected else 0,
+                }
+                for row in by_user
+            ],
+        },
+    }
+    if period == 'monthly':
+        report_data['month'] = calendar.month_name[month]
+    return report_data
+
+
+def write_financial_report_csv(report_data, period, output):
+    """Write the all-residents financial report into the text stream ``output``."""
+    writer = csv.writer(output)
+
+    # Write header
+    writer.writerow(['Financial Report - Paid Bills Only'])
+    if period == 'monthly':
+        writer.writerow([f'Period: {report_data["month"]} {report_data["year"]}'])
+    else:
+        writer.writerow([f'Period: Year {report_data["year"]}'])
+    writer.writerow([])
+
+    # Write summary
+    writer.writerow(['SUMMARY'])
+    writer.writerow(['Total Collected', f"₱{report_data['summary']['total_collected']:,.2f}"])
+    writer.writerow(['Total Bills', report_data['summary']['total_bills']])
+    writer.writerow(['Average Payment', f"₱{report_data['summary']['average_payment']:,.2f}"])
+    writer.writerow([])
+
+    # Write user breakdown
+    writer.writerow(['USER BREAKDOWN'])
+    writer.writerow(['User', 'Total Paid', 'Bill Count', 'Percentage'])
+    for user in report_data['breakdowns']['by_user']:
+        writer.writerow([
+            user['user_name'],
+            f"₱{user['total_paid']:,.2f}",
+            user['bill_count'],
+            f"{user['percentage_of_total']}%"
+        ])
+    writer.writerow([])
+
+
+def user_financial_report_filename(user_id, period, year, month):
+    if period == 'monthly':
+        return f"user_financial_report_{user_id}_{year}_{month:02d}.csv"
+    return f"user_financial_report_{user_id}_{year}.csv"
+
+
+def user_financial_report_data(user_id, period, year, month):
+    """The detailed financial report for one resident (see ``bills.reports``)."""
+    try:
+        if period == 'monthly':
+            return user_monthly_report(user_id, year, month)
+        return user_yearly_report(user_id, year)
+    except get_user_model().DoesNotExist:
+        raise NothingToExport("User not found")
+
+
+def write_user_financial_report_csv(report_data, period, output):
+    """Write one resident's financial report into the text stream ``output``."""
+    writer = csv.writer(output)
+
+    # Write header
+    writer.writerow(['User Financial Report - Paid Bills Only'])
+    writer.writerow([f'User: {report_data["user_name"]}'])
+    writer.writerow([f'User ID: {report_data["user_id"]}'])
+    if period == 'monthly':
+        writer.writerow([f'Period: {report_data["month"]} {report_data["year"]}'])
+    else:
+        writer.writerow([f'Period: Year {report_data["year"]}'])
+    writer.writerow([])
+
+    # Write summary - handle potential None values
+    writer.writerow(['SUMMARY'])
+    total_paid = report_data['summary']['total_paid'] or 0
+    total_bills = report_data['summary']['total_bills'] or 0
+    avg_payment = report_data['summary']['average_payment'] or 0
+
+    writer.writerow(['Total Paid', f"₱{total_paid:,.2f}"])
+    writer.writerow(['Total Bills', total_bills])
+    writer.writerow(['Average Payment', f"₱{avg_payment:,.2f}"])
+    writer.writerow([])
+
+    # Write unit breakdown if available
+    if 'detailed_breakdown' in report_data and 'by_unit' in report_data['detailed_breakdown']:
+        writer.writerow(['UNIT BREAKDOWN'])
+        writer.writerow(['Unit Name', 'Building', 'Total Paid', 'Bill Count', 'Percentage'])
+        for unit in report_data['detailed_breakdown']['by_unit']:
+            unit_paid = unit['total_paid'] or 0
+            unit_bill_count = unit['bill_count'] or 0
+            unit_percentage = unit['percentage_of_total'] or 0
+
+            writer.writerow([
+                unit['unit_name'],
+                unit['building'],
+                f"₱{unit_paid:,.2f}",
+                unit_bill_count,
+                f"{unit_percentage}%"
+            ])
+        writer.writerow([])
+
+
+def _period_params(params):
+    today = date.today()
+    period = params.get('period', 'monthly')
+    if period not in ('monthly', 'yearly'):
+        raise ValueError("Invalid period. Use 'monthly' or 'yearly'.")
+    month = int(params.get('month', today.month))
+    if not 1 <= month <= 12:
+        raise ValueError("Invalid month. Use 1-12.")
+    return {
+        'period': period,
+        'year': int(params.get('year', today.year)),
+        'month': month,
+    }
+
+
+def _paid_bills_params(params):
+    month = str(params.get('month', 'all'))
+    if month != 'all' and not (month.isdigit() and 1 <= int(month) <= 12):
+        raise ValueError("Invalid month. Use 1-12 or 'all'.")
+    status = params.get('status', 'all')
+    if status not in ('all', 'paid', 'done'):
+        raise ValueError("Invalid status. Use 'paid', 'done' or 'all'.")
+    export_format = params.get('format', 'xlsx')
+    if export_format not in ('xlsx', 'csv'):
+        raise ValueError("Invalid format. Use 'xlsx' or 'csv'.")
+    return {
+        'year': int(params.get('year', date.today().year)),
+        'month': str(int(month)) if month != 'all' else month,
+        'status': status,
+        'format': export_format,
+    }
+
+
+def _user_financial_params(params):
+    if not params.get('user_id'):
+        raise ValueError("User ID is required")
+    normalized = _period_params({'period': 'yearly', **params})
+    normalized['user_id'] = int(params['user_id'])
+    return normalized
+
+
+def _export_paid_bills(params, output, progress):
+    bills = paid_bills_queryset(params['year'], params['month'], params['status'])
+    total = bills.count()
+    if not total:
+        raise NothingToExport("No paid bills found for the selected criteria")
+
+    write = write_paid_bills_xlsx if params['format'] == 'xlsx' else write_paid_bills_csv
+    write(bills, output, progress=lambda done: progress(done, total))
+    return paid_bills_filename(params['year'], params['month'], params['format'])
+
+
+def _export_financial_report(params, output, progress):
+    report_data = financial_report_data(params['period'], params['year'], params['month'])
+    with _text_writer(output) as stream:
+        write_financial_report_csv(report_data, params['period'], stream)
+    return financial_report_filename(params['period'], params['year'], params['month'])
+
+
+def _export_user_financial_report(params, output, progress):
+    report_data = user_financial_report_data(
+        params['user_id'], params['period'], params['year'], params['month']
+    )
+    with _text_writer(output) as stream:
+        write_user_financial_report_csv(report_data, params['period'], stream)
+    return user_financial_report_filename(
+        params['user_id'], params['period'], params['year'], params['month']
+    )
+
+
+# kind -> (normalize params, write artifact)
+EXPORTERS = {
+    'paid_bills': (_paid_bills_params, _export_paid_bills),
+    'financial_report': (_period_params, _export_financial_report),
+    'user_financial_report': (_user_financial_params, _export_user_financial_report),
+}
+
+
+def normalize_export_params(kind, params):
+    """
+    Validate ``params`` for an export ``kind`` and fill in the defaults, so
+    requests that mean the same export hash the same. Raises ValueError.
+    """
+    if kind not in EXPORTERS:
+        raise ValueError(f"Unknown export kind '{kind}'. Use one of: {', '.join(EXPORTERS)}.")
+    try:
+        return EXPORTERS[kind][0](params or {})
+    except (TypeError, ValueError) as exc:
+        raise ValueError(str(exc) or "Invalid export parameters")
+
+
+def write_export(kind, params, output, progress=lambda done, total: None):
+    """
+    Write the artifact of an export into the binary file ``output``.
+    Returns the download filename; raises NothingToExport when no data matched.
+    """
+    return EXPORTERS[kind][1](params, output, progress)
+
+
+def export_scope(user):
+    """
+    Who shares the deduplicated jobs of ``user``: admins and employees see every
+    export (``ExportJobMixin``), so they share one scope; anyone else only sees
+    their own jobs.
+    """
+    if user is None or not user.is_authenticated or user.role in ("admin", "employee"):
+        return "staff"
+    return f"user:{user.pk}"
+
+
+def create_export_job(kind, params, user=None):
+    """
+    Return ``(job, created)`` for the export described by ``kind`` and ``params``.
+
+    While an identical export of the requester's scope (see ``export_scope``)
+    is queued or running that job is returned instead of a new one; the
+    partial unique constraint on ``(scope, params_hash)`` settles concurrent
+    requests. The caller enqueues ``run_export_job`` for new jobs.
+    """
+    params = normalize_export_params(kind, params)
+    scope = export_scope(user)
+    params_hash = hashlib.sha256(
+        json.dumps({'kind': kind, 'params': params, 'scope': scope}, sort_keys=True).encode()
+    ).hexdigest()
+
+    jobs = ExportJob.objects.filter(scope=scope, params_hash=params_hash)
+    active = jobs.filter(status__in=ExportJob.ACTIVE_STATUSES)
+    for _attempt in range(2):
+        job = active.order_by('-created_at', '-pk').first()
+        if job is not None:
+            return job, False
+
+        try:
+            with transaction.atomic():
+                job = ExportJob.objects.create(
+                    kind=kind,
+                    params=params,
+                    params_hash=params_hash,
+                    scope=scope,
+                    created_by=user if user is not None and user.is_authenticated else None,
+                )
+        except IntegrityError:
+            # Another request created the same export in the meantime; it may
+            # also have finished already, in which case this retries the create
+            continue
+        return job, True
+
+    # Competing requests kept winning the race; hand back the latest of them
+    return jobs.order_by('-created_at', '-pk').first(), False
+
+
+def run_export_job(job_id):
+    """
+    Render a queued export into the exports storage.
+
+    The job is claimed with a conditional update, so a redelivered task does
+    not render it twice. Progress is saved as a percentage while rows are
+    written; finished and failed jobs expire after ``EXPORT_JOB_TTL_SECONDS``.
+    """
+    claimed = ExportJob.objects.filter(pk=job_id, status=ExportJob.Status.QUEUED).update(
+        status=ExportJob.Status.RUNNING
+    )
+    if not claimed:
+        return None
+    job = ExportJob.objects.get(pk=job_id)
+
+    def progress(done, total):
+        percent = min(99, done * 100 // total) if total else 0
+        ExportJob.objects.filter(pk=job.pk).update(progress=percent)
+
+    try:
+        with tempfile.TemporaryFile() as output:
+            filename = write_export(job.kind, job.params, output, progress)
+            output.seek(0)
+            job.file.save(filename, File(output), save=False)
+        job.filename = filename
+        job.status = ExportJob.Status.DONE
+        job.progress = 100
+    except Exception as exc:
+        if not isinstance(exc, NothingToExport):
+            print(f"Error running export job {job.pk}: {exc}")
+        job.status = ExportJob.Status.FAILED
+        job.error = str(exc)
+
+    job.finished_at = now()
+    job.expires_at = job.finished_at + timedelta(seconds=settings.EXPORT_JOB_TTL_SECONDS)
+    job.save(update_fields=['file', 'filename', 'status', 'progress', 'error', 'finished_at', 'expires_at'])
+    return job.status
+
+
+def purge_expired_exports():
+    """
+    Delete export jobs past ``expires_at`` together with their files.
+
+    Jobs still queued/running after a whole TTL (e.g. their worker died) are
+    marked failed so they stop deduplicating new requests.
+    """
+    current = now()
+    ttl = timedelta(seconds=settings.EXPORT_JOB_TTL_SECONDS)
+    stale = ExportJob.objects.filter(
+        status__in=ExportJob.ACTIVE_STATUSES,
+        created_at__lte=current - ttl,
+    ).update(
+        status=ExportJob.Status.FAILED,
+        error="Export timed out",
+        finished_at=current,
+        expires_at=current + ttl,
+    )
+
+    purged = 0
+    for job in ExportJob.objects.filter(expires_at__lte=current).only('id', 'file'):
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
+        purged += 1
+
+    return {"purged": purged, "timed_out": stale}
+
+
+@contextmanager
+def _text_writer(output):
+    """Text (UTF-8) view over the binary file ``output`` that leaves it open on exit."""
+    stream = io.TextIOWrapper(output, encoding='utf-8', newline='')
+    try:
+        yield stream
+    finally:
+        stream.flush()
+        stream.detach()
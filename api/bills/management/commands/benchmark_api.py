@@ -0,0 +1,50 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from api.benchmark import compare, run_benchmark, run_write_concurrency, write_results
+
+
+class Command(BaseCommand):
+    help = "Time the key API endpoints and Celery tasks against the current database (see seed_hoa)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per endpoint / task")
+        parser.add_argument("--only", nargs="+", metavar="NAME", help="Benchmark only these endpoints / tasks")
+        parser.add_argument("--output", default="benchmark.json", help="Results file (JSON)")
+        parser.add_argument("--baseline", help="Results file of a previous run to compare with")
+        parser.add_argument(
+            "--concurrency", type=float, default=5, metavar="SECONDS",
+            help="Duration of the write-concurrency benchmark (0 skips it)",
+        )
+
+    def handle(self, *args, **options):
+        if options["repeat"] < 1:
+            raise CommandError("--repeat must be at least 1")
+
+        def log(name, result):
+            self.stdout.write(
+                f"{name:<28} median {result['median_ms']:>9} ms  p95 {result['p95_ms']:>9} ms  "
+                f"{result['queries']:>4} queries"
+            )
+
+        only = options["only"]
+        try:
+            results = run_benchmark(options["repeat"], only, log=log)
+            if options["concurrency"] > 0 and (not only or "write-concurrency" in only):
+                results["concurrency"] = run_write_concurrency(options["concurrency"])
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        for name, result in results.get("concurrency", {}).items():
+            self.stdout.write(
+                f"write-concurrency {name:<10} {result['ops_per_s']:>8} ops/s  median {result['median_ms']:>8} ms  "
+                f"p95 {result['p95_ms']:>8} ms  {result['errors']:>4} locked"
+            )
+
+        write_results(results, options["output"])
+        self.stdout.write(self.style.SUCCESS(f"✅ Wrote {options['output']}"))
+
+        if options["baseline"]:
+            with open(options["baseline"]) as file:
+                baseline = json.load(file)
+            for line in compare(results, baseline):
+                self.stdout.write(line)
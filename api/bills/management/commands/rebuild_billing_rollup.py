@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from bills.rollup import refresh_billing_rollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the BillingRollup table from MonthlyBill (all months, or one year/month)"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, help="Only rebuild this year")
+        parser.add_argument("--month", type=int, help="Only rebuild this month (requires --year)")
+
+    def handle(self, *args, **options):
+        year, month = options["year"], options["month"]
+
+        if month and not year:
+            self.stderr.write(self.style.ERROR("--month requires --year"))
+            return
+
+        if year:
+            months = [month] if month else range(1, 13)
+            rows = refresh_billing_rollup({(year, m) for m in months})
+            scope = f"{year}-{month:02d}" if month else str(year)
+        else:
+            rows = refresh_billing_rollup()
+            scope = "all months"
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt billing rollup for {scope}: {rows} rows"))
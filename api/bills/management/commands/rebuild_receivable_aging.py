@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from bills.aging import refresh_receivable_aging
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ReceivableAging table from the unpaid bills, as of today"
+
+    def handle(self, *args, **options):
+        rows = refresh_receivable_aging()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt receivable aging: {rows} rows"))
@@ -0,0 +1,47 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from api.seeding import SCALES, SEED_PASSWORD, SEED_PREFIX, SEED_TODAY, SeedError, reset_seed, seed_hoa
+
+
+class Command(BaseCommand):
+    help = "Seed a synthetic HOA (units, residents, bill and payment history, notices, inquiries) from a fixed seed"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=SCALES, default="1k", help="Size preset (units and buildings)")
+        parser.add_argument("--units", type=int, help="Number of units (overrides --scale)")
+        parser.add_argument("--buildings", type=int, help="Number of buildings (overrides --scale)")
+        parser.add_argument("--years", type=int, default=2, help="Years of bill history")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed")
+        parser.add_argument("--notices", type=int, help="Number of notices (default 100)")
+        parser.add_argument("--inquiries", type=int, help="Number of inquiries (default units / 5)")
+        parser.add_argument(
+            "--today", type=date.fromisoformat, default=SEED_TODAY,
+            help=f"Date the history ends on (YYYY-MM-DD, default {SEED_TODAY}); pass the current date for live-looking data",
+        )
+        parser.add_argument("--reset", action="store_true", help="Delete previously seeded data first")
+
+    def handle(self, *args, **options):
+        units, buildings = SCALES[options["scale"]]
+        units = options["units"] or units
+        buildings = max(1, min(options["buildings"] or buildings, units))
+
+        if options["reset"]:
+            deleted = reset_seed()
+            self.stdout.write(f"🗑️ Deleted {deleted} seeded rows")
+
+        try:
+            counts = seed_hoa(
+                units, buildings,
+                years=options["years"],
+                seed=options["seed"],
+                notices=options["notices"],
+                inquiries=options["inquiries"],
+                today=options["today"],
+                log=self.stdout.write,
+            )
+        except SeedError as exc:
+            raise CommandError(f"{exc} (use --reset)")
+
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"✅ Seeded {summary}"))
+        self.stdout.write(f"Log in as {SEED_PREFIX}admin / {SEED_PASSWORD}")
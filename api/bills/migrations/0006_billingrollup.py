@@ -0,0 +1,69 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:50
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def build_billing_rollup(apps, schema_editor):
+    MonthlyBill = apps.get_model('bills', 'MonthlyBill')
+    BillingRollup = apps.get_model('bills', 'BillingRollup')
+    totals = (
+        MonthlyBill.objects
+        .annotate(year=ExtractYear('due_date'), month=ExtractMonth('due_date'))
+        .values('year', 'month', 'unit_id', 'unit__building', 'payment_status')
+        .annotate(
+            amount_total=Sum('amount_due'),
+            bill_count=Count('id'),
+            overdue_count=Count('id', filter=Q(due_status='overdue')),
+        )
+        .order_by()
+    )
+    BillingRollup.objects.bulk_create(
+        [
+            BillingRollup(
+                year=row['year'],
+                month=row['month'],
+                building=row['unit__building'] or '',
+                unit_id=row['unit_id'],
+                payment_status=row['payment_status'],
+                amount_total=row['amount_total'],
+                bill_count=row['bill_count'],
+                overdue_count=row['overdue_count'],
+            )
+            for row in totals.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0005_billnotification'),
+        ('units', '0016_assignedunit_billing_day_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BillingRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('building', models.CharField(blank=True, default='', max_length=100)),
+                ('payment_status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid')], max_length=20)),
+                ('amount_total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('bill_count', models.IntegerField(default=0)),
+                ('overdue_count', models.IntegerField(default=0)),
+                ('unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='billing_rollups', to='units.unit')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', 'month'], name='billing_rollup_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('year', 'month', 'building', 'unit', 'payment_status'), name='unique_billing_rollup_key')],
+            },
+        ),
+        migrations.RunPython(build_billing_rollup, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0007_exportjob'),
+        ('units', '0016_assignedunit_billing_day_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monthlybill',
+            index=models.Index(fields=['due_date', 'id'], name='monthlybill_due_date_id_idx'),
+        ),
+    ]
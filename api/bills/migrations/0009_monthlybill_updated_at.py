@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:22
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing bills were last written no earlier than they were created
+    MonthlyBill = apps.get_model('bills', 'MonthlyBill')
+    MonthlyBill.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0008_keyset_pagination_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlybill',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
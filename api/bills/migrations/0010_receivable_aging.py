@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:30
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0009_monthlybill_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReceivableAging',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('building', models.CharField(blank=True, default='', max_length=100)),
+                ('days_0_30', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('days_31_60', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('days_61_90', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('days_over_90', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('bill_count', models.IntegerField(default=0)),
+                ('oldest_due_date', models.DateField()),
+                ('as_of', models.DateField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='receivable_aging', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['building', '-total', '-id'], name='aging_building_total_idx'), models.Index(fields=['-total', '-id'], name='aging_total_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'building'), name='unique_receivable_aging_key')],
+            },
+        ),
+    ]
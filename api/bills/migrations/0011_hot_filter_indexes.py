@@ -0,0 +1,32 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0010_receivable_aging'),
+        ('units', '0018_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='monthlybill',
+            index=models.Index(fields=['payment_status', 'due_status', 'due_date'], name='monthlybill_status_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlybill',
+            index=models.Index(fields=['due_status', 'due_date', 'id'], name='monthlybill_due_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlybill',
+            index=models.Index(fields=['user', 'due_date'], name='monthlybill_user_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlybill',
+            index=models.Index(fields=['unit', 'due_date'], name='monthlybill_unit_due_idx'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:16
+
+from django.conf import settings
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_bills(apps, schema_editor):
+    """
+    Bills billed twice for the same resident, unit and due date may already be
+    paid or posted to the ledger, so they are reported rather than deleted.
+    """
+    MonthlyBill = apps.get_model('bills', 'MonthlyBill')
+    bills = MonthlyBill.objects.filter(user__isnull=False, unit__isnull=False)
+    duplicated = list(
+        bills.values('user_id', 'unit_id', 'due_date')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by('due_date', 'user_id', 'unit_id')
+    )
+    if not duplicated:
+        return
+    examples = [
+        f"user {row['user_id']}, unit {row['unit_id']}, due {row['due_date']} (bills "
+        + ", ".join(str(pk) for pk in bills.filter(
+            user_id=row['user_id'], unit_id=row['unit_id'], due_date=row['due_date'],
+        ).order_by('id').values_list('id', flat=True))
+        + ")"
+        for row in duplicated[:10]
+    ]
+    raise IntegrityError(
+        f"Cannot add monthlybill_unique_user_unit_due: {len(duplicated)} resident/unit/due date "
+        f"combinations have several bills: {'; '.join(examples)}. Merge or delete the extra bills "
+        "and run migrate again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0011_hot_filter_indexes'),
+        ('units', '0019_unique_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_bills, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='monthlybill',
+            constraint=models.UniqueConstraint(fields=('user', 'unit', 'due_date'), name='monthlybill_unique_user_unit_due'),
+        ),
+    ]
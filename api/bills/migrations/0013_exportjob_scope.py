@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0012_unique_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='exportjob',
+            name='unique_active_export_job',
+        ),
+        migrations.AddField(
+            model_name='exportjob',
+            name='scope',
+            field=models.CharField(blank=True, max_length=30),
+        ),
+        migrations.AddConstraint(
+            model_name='exportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('scope', 'params_hash'), name='unique_active_export_job'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:45
+
+from django.db import migrations
+
+
+def enable_wal(apps, schema_editor):
+    # The journal mode is stored in the database file, so it is set once here
+    # rather than on every connection; PostgreSQL has nothing to do
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=WAL')
+
+
+def disable_wal(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode=DELETE')
+
+
+class Migration(migrations.Migration):
+
+    # SQLite can't change the journal mode inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('bills', '0013_exportjob_scope'),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_wal, disable_wal),
+    ]
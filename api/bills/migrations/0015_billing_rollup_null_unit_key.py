@@ -0,0 +1,75 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:51
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+def rebuild_duplicated_months(apps, schema_editor):
+    # Racing first saves of unit-less bills could insert the same key twice, and
+    # later signal updates then moved both rows; recompute those months from the bills
+    MonthlyBill = apps.get_model('bills', 'MonthlyBill')
+    BillingRollup = apps.get_model('bills', 'BillingRollup')
+    periods = set(
+        BillingRollup.objects
+        .values('year', 'month', 'unit_id', 'payment_status')
+        .annotate(rows=Count('id'))
+        .filter(rows__gt=1)
+        .values_list('year', 'month')
+    )
+    if not periods:
+        return
+    bills_q, rollups_q = Q(), Q()
+    for year, month in periods:
+        bills_q |= Q(due_date__year=year, due_date__month=month)
+        rollups_q |= Q(year=year, month=month)
+
+    totals = (
+        MonthlyBill.objects.filter(bills_q)
+        .annotate(year=ExtractYear('due_date'), month=ExtractMonth('due_date'))
+        .values('year', 'month', 'unit_id', 'unit__building', 'payment_status')
+        .annotate(
+            amount_total=Sum('amount_due'),
+            bill_count=Count('id'),
+            overdue_count=Count('id', filter=Q(due_status='overdue')),
+        )
+        .order_by()
+    )
+    BillingRollup.objects.filter(rollups_q).delete()
+    BillingRollup.objects.bulk_create(
+        [
+            BillingRollup(
+                year=row['year'],
+                month=row['month'],
+                building=row['unit__building'] or '',
+                unit_id=row['unit_id'],
+                payment_status=row['payment_status'],
+                amount_total=row['amount_total'],
+                bill_count=row['bill_count'],
+                overdue_count=row['overdue_count'],
+            )
+            for row in totals.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0014_sqlite_wal'),
+        ('units', '0019_unique_constraints'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='billingrollup',
+            name='unique_billing_rollup_key',
+        ),
+        migrations.RunPython(rebuild_duplicated_months, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='billingrollup',
+            constraint=models.UniqueConstraint(models.F('year'), models.F('month'), django.db.models.functions.comparison.Coalesce('unit', 0, output_field=models.BigIntegerField()), models.F('payment_status'), name='unique_billing_rollup_key'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils.timezone import now
 from units.models import Unit, AssignedUnit
@@ -43,6 +44,26 @@ class MonthlyBill(models.Model):
     sms_sent = models.BooleanField(default=False)
     unit = models.ForeignKey(Unit, blank=True, null=True, on_delete=models.CASCADE, related_name='bill_unit')
     created_at = models.DateTimeField(auto_now_add=True)
+    # Delta sync watermark (sync app); set it explicitly in queryset.update() calls
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of bill listings (api.pagination)
+            models.Index(fields=['due_date', 'id'], name='monthlybill_due_date_id_idx'),
+            # Pending/paid bills by due date: due status transitions, receivables
+            # aging, statement reconciliation, paid-bill reports
+            models.Index(fields=['payment_status', 'due_status', 'due_date'], name='monthlybill_status_due_idx'),
+            # Bills of a due status (overdue lists and counts), in list order
+            models.Index(fields=['due_status', 'due_date', 'id'], name='monthlybill_due_status_idx'),
+            # A resident's or unit's bills by due date (duplicate checks, reports)
+            models.Index(fields=['user', 'due_date'], name='monthlybill_user_due_idx'),
+            models.Index(fields=['unit', 'due_date'], name='monthlybill_unit_due_idx'),
+        ]
+        constraints = [
+            # One bill per resident, unit and due date (see bills.services.insert_bills)
+            models.UniqueConstraint(fields=['user', 'unit', 'due_date'], name='monthlybill_unique_user_unit_due'),
+        ]
 
     def update_due_status(self):
         """Update due status based on due_date and payment status"""
@@ -58,6 +79,32 @@ class MonthlyBill(models.Model):
             else:
                 self.due_status = self.DueStatus.UPCOMING
 
+    def rollup_state(self):
+        """The values of this bill that the BillingRollup aggregates."""
+        if self.due_date is None:
+            return None
+        return (
+            self.due_date.year,
+            self.due_date.month,
+            self.unit_id,
+            self.payment_status,
+            Decimal(self.amount_due or 0),
+            self.due_status == self.DueStatus.OVERDUE,
+        )
+
+    def aging_state(self):
+        """The values of this bill that the receivables aging buckets depend on."""
+        return (self.user_id, self.unit_id, self.due_date, self.amount_due, self.payment_status)
+
+    def ledger_state(self):
+        """The values of this bill that the payments ledger follows."""
+        return (
+            self.user_id,
+            self.unit_id,
+            Decimal(self.amount_due or 0),
+            self.payment_status == self.PaymentStatus.PAID,
+        )
+
     def save(self, *args, **kwargs):
         if not self.amount_due or self.amount_due == 0:
             self.amount_due = self.calculate_total_amount_due()
@@ -70,3 +117,162 @@ class MonthlyBill(models.Model):
 
     def __str__(self):
         return f"Bill(user={self.user.username}, due={self.due_date}, status={self.payment_status}/{self.due_status})"
+
+
+class BillNotification(models.Model):
+    """
+    Outbox of residents whose bills changed and still need a websocket update.
+
+    One row per user: repeated changes only bump ``changed_at``, and the
+    ``bills.tasks.send_bill_notifications`` task sends a single message per
+    user once their changes have settled.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='bill_notification'
+    )
+    queued_at = models.DateTimeField(default=now)
+    changed_at = models.DateTimeField(default=now, db_index=True)
+
+    def __str__(self):
+        return f"BillNotification(user={self.user_id}, changed={self.changed_at})"
+
+
+class BillingRollup(models.Model):
+    """
+    Monthly bill totals per (year, month, building, unit, payment status).
+
+    Kept current incrementally by the MonthlyBill signals and refreshed per month
+    by the set-based bill jobs; rebuild it with ``manage.py rebuild_billing_rollup``.
+    ``building`` is copied from the unit so dashboards can group by building without
+    joining units, and follows the unit when it moves building (see
+    ``bills.signals``). A unit has one building, so rows are unique on
+    (year, month, unit, payment status), bills without a unit counting as unit 0.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    building = models.CharField(max_length=100, blank=True, default='')
+    unit = models.ForeignKey(Unit, blank=True, null=True, on_delete=models.CASCADE, related_name='billing_rollups')
+    payment_status = models.CharField(max_length=20, choices=MonthlyBill.PaymentStatus.choices)
+    amount_total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    bill_count = models.IntegerField(default=0)
+    overdue_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            # NULLs never conflict in a plain unique constraint, so the
+            # concurrent first saves of unit-less bills would both insert
+            models.UniqueConstraint(
+                'year', 'month', Coalesce('unit', 0, output_field=models.BigIntegerField()), 'payment_status',
+                name='unique_billing_rollup_key'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['year', 'month'], name='billing_rollup_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"BillingRollup({self.year}-{self.month:02d}, unit={self.unit_id}, {self.payment_status}: {self.bill_count})"
+
+
+class ReceivableAging(models.Model):
+    """
+    Unpaid bills of a resident in one building, bucketed by days past due
+    (bills due today count as 0 days) as of ``as_of``.
+
+    Refreshed per resident by the MonthlyBill signals and in full once a day by
+    ``transition_due_statuses`` (buckets shift as bills age); rebuild it with
+    ``manage.py rebuild_receivable_aging``.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='receivable_aging')
+    building = models.CharField(max_length=100, blank=True, default='')
+    days_0_30 = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    days_31_60 = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    days_61_90 = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    days_over_90 = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    bill_count = models.IntegerField(default=0)
+    oldest_due_date = models.DateField()
+    as_of = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'building'], name='unique_receivable_aging_key'),
+        ]
+        indexes = [
+            # Aging report: ?building= and ?min_amount=, largest first
+            models.Index(fields=['building', '-total', '-id'], name='aging_building_total_idx'),
+            models.Index(fields=['-total', '-id'], name='aging_total_idx'),
+        ]
+
+    def __str__(self):
+        return f"ReceivableAging(user={self.user_id}, building={self.building!r}, total={self.total})"
+
+
+def export_storage():
+    from django.core.files.storage import storages
+    return storages["exports"]
+
+
+class ExportJob(models.Model):
+    """
+    A report export rendered in the background by ``bills.tasks.run_export_job``.
+
+    ``params_hash`` identifies the export (kind, normalized parameters and
+    ``scope``); while a job is queued or running, identical requests from the
+    same scope reuse it instead of enqueueing another. The scope is who may
+    see the job (see ``bills.exports.export_scope``), so a resident is never
+    handed someone else's job. Finished artifacts are removed after ``expires_at``
+    by ``bills.tasks.purge_expired_exports``.
+    """
+    class Kind(models.TextChoices):
+        PAID_BILLS = "paid_bills", "Paid Bills"
+        FINANCIAL_REPORT = "financial_report", "Financial Report"
+        USER_FINANCIAL_REPORT = "user_financial_report", "User Financial Report"
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    ACTIVE_STATUSES = [Status.QUEUED, Status.RUNNING]
+
+    kind = models.CharField(max_length=30, choices=Kind.choices)
+    params = models.JSONField(default=dict, blank=True)
+    params_hash = models.CharField(max_length=64, db_index=True)
+    scope = models.CharField(max_length=30, blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.QUEUED)
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    file = models.FileField(upload_to="%Y/%m/%d/", storage=export_storage, blank=True)
+    filename = models.CharField(max_length=255, blank=True)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name="export_jobs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            # At most one queued/running job per export and scope; concurrent
+            # duplicates collide here
+            models.UniqueConstraint(
+                fields=['scope', 'params_hash'],
+                condition=models.Q(status__in=["queued", "running"]),
+                name='unique_active_export_job'
+            ),
+        ]
+
+    @property
+    def is_expired(self):
+        return self.expires_at is not None and self.expires_at <= now()
+
+    def __str__(self):
+        return f"ExportJob({self.kind}, {self.status}, {self.progress}%)"
@@ -0,0 +1,439 @@
+import calendar
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from .models import MonthlyBill
+
+
+QUARTERS = {
+    1: [1, 2, 3],
+    2: [4, 5, 6],
+    3: [7, 8, 9],
+    4: [10, 11, 12],
+}
+
+
+class BillReport:
+    """
+    Grouped bill totals that report views slice in memory.
+
+    The bills are aggregated once by (user, year, month, unit, payment status)
+    into ``rows``; every monthly, quarterly and per-unit figure a report needs
+    is then computed from those rows without going back to the database.
+
+    Usage:
+        report = BillReport.for_user(user_id, year)
+        report.total(payment_status='paid', month=3)
+        report.count(unit_id=5)
+    """
+
+    GROUP_FIELDS = (
+        'user_id', 'year', 'month', 'unit_id',
+        'unit__unit_name', 'unit__building', 'unit__rent_amount',
+        'payment_status',
+    )
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    @classmethod
+    def from_queryset(cls, bills):
+        """Run the single grouped query for ``bills``."""
+        return cls(
+            bills.annotate(
+                year=ExtractYear('due_date'),
+                month=ExtractMonth('due_date'),
+            ).values(*cls.GROUP_FIELDS).annotate(
+                amount=Sum('amount_due'),
+                bill_count=Count('id'),
+                overdue_count=Count('id', filter=Q(due_status=MonthlyBill.DueStatus.OVERDUE)),
+            ).order_by(F('unit_id').asc(nulls_last=True), 'year', 'month', 'payment_status')
+        )
+
+    @classmethod
+    def for_user(cls, user_id, year, month=None):
+        return cls.for_users([user_id], year, month)
+
+    @classmethod
+    def for_users(cls, user_ids, year, month=None):
+        bills = MonthlyBill.objects.filter(user_id__in=user_ids, due_date__year=year)
+        if month:
+            bills = bills.filter(due_date__month=month)
+        return cls.from_queryset(bills)
+
+    def filter(self, **criteria):
+        """
+        Return a report over the matching rows.
+        A list/tuple/set value matches any of its items (e.g. ``month=[1, 2, 3]``).
+        """
+        rows = self.rows
+        for field, value in criteria.items():
+            if isinstance(value, (list, tuple, set)):
+                rows = [row for row in rows if row[field] in value]
+            else:
+                rows = [row for row in rows if row[field] == value]
+        return BillReport(rows)
+
+    def total(self, **criteria):
+        """
+        Sum of ``amount_due`` over the matching rows.
+        Returns None when nothing matches, like ``aggregate(Sum(...))``.
+        """
+        rows = self.filter(**criteria).rows if criteria else self.rows
+        if not rows:
+            return None
+        return sum((row['amount'] for row in rows), Decimal('0.00'))
+
+    def count(self, **criteria):
+        rows = self.filter(**criteria).rows if criteria else self.rows
+        return sum(row['bill_count'] for row in rows)
+
+    def overdue_count(self, **criteria):
+        rows = self.filter(**criteria).rows if criteria else self.rows
+        return sum(row['overdue_count'] for row in rows)
+
+    def exists(self):
+        return bool(self.rows)
+
+    def months(self):
+        """Months that have bills, in calendar order."""
+        return sorted({row['month'] for row in self.rows})
+
+    def group_by(self, *fields):
+        """
+        Split the rows by ``fields``; returns {key tuple: BillReport}
+        in first-seen order (rows are ordered by unit, then period).
+        """
+        groups = {}
+        for row in self.rows:
+            key = tuple(row[field] for field in fields)
+            groups.setdefault(key, []).append(row)
+        return {key: BillReport(rows) for key, rows in groups.items()}
+
+    def units(self):
+        """Distinct units with bills, as ``values('unit_id', 'unit__unit_name', 'unit__building')`` dicts."""
+        return [
+            {'unit_id': unit_id, 'unit__unit_name': unit_name, 'unit__building': building}
+            for unit_id, unit_name, building in self.group_by('unit_id', 'unit__unit_name', 'unit__building')
+        ]
+
+
+def user_monthly_report(user_id, year, month, breakdown='detailed'):
+    """
+    Monthly financial report of one resident (ALL bills, not just paid).
+
+    Raises the user model's ``DoesNotExist`` for an unknown ``user_id``.
+    """
+    # Get ALL bills for the specified user, month and year (not just paid)
+    all_bills = MonthlyBill.objects.filter(
+        user_id=user_id,
+        due_date__year=year,
+        due_date__month=month
+    ).select_related('user', 'unit')
+
+    # Get user info
+    user = all_bills.first().user if all_bills.exists() else None
+    if not user:
+        user = get_user_model().objects.get(id=user_id)
+
+    user_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username
+
+    if not all_bills.exists():
+        return {
+            "report_type": "user_monthly",
+            "user_id": user_id,
+            "user_name": user_name,
+            "year": year,
+            "month": calendar.month_name[month],
+            "message": "No bills found for this period",
+            "summary": {
+                "total_paid": 0,
+                "total_unpaid": 0,
+                "total_bills": 0,
+                "average_payment": 0,
+                "payment_completion": "0%"
+            }
+        }
+
+    # Calculate totals - ALL bills, not just paid
+    total_paid = all_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or 0
+    total_unpaid = all_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or 0
+    total_expected = all_bills.aggregate(total=Sum('amount_due'))['total'] or 0
+    total_bills = all_bills.count()
+
+    paid_bills_count = all_bills.filter(payment_status='paid').count()
+    unpaid_bills_count = all_bills.filter(payment_status='pending').count()
+
+    average_payment = total_paid / paid_bills_count if paid_bills_count > 0 else 0
+
+    # Calculate ACTUAL payment completion
+    if total_expected > 0:
+        payment_completion_percentage = round((total_paid / total_expected) * 100, 2)
+    else:
+        payment_completion_percentage = 0
+
+    # Basic response structure
+    response_data = {
+        "report_type": "user_monthly",
+        "user_id": user_id,
+        "user_name": user_name,
+        "user_email": user.email,
+        "year": year,
+        "month": calendar.month_name[month],
+        "summary": {
+            "total_paid": round((total_paid), 2),
+            "total_unpaid": round((total_unpaid), 2),
+            "total_expected": round((total_expected), 2),
+            "total_bills": total_bills,
+            "paid_bills_count": paid_bills_count,
+            "unpaid_bills_count": unpaid_bills_count,
+            "average_payment": round((average_payment), 2),
+            "payment_completion": f"{payment_completion_percentage}%",  # ACTUAL completion rate
+        }
+    }
+
+    # Add detailed breakdown if requested
+    if breakdown == 'detailed':
+        # Breakdown by unit (ALL bills)
+        unit_breakdown = all_bills.values(
+            'unit__unit_name', 
+            'unit__building',
+            'unit__rent_amount'
+        ).annotate(
+            total_paid=Sum('amount_due', filter=Q(payment_status='paid')),
+            total_unpaid=Sum('amount_due', filter=Q(payment_status='pending')),
+            total_expected=Sum('amount_due'),
+            bill_count=Count('id'),
+            paid_count=Count('id', filter=Q(payment_status='paid')),
+            unpaid_count=Count('id', filter=Q(payment_status='pending'))
+        ).order_by('-total_expected')
+
+        unit_breakdown_data = []
+        for unit_data in unit_breakdown:
+            unit_completion = round((unit_data['total_paid'] / unit_data['total_expected']) * 100, 2) if unit_data['total_expected'] > 0 else 0
+
+            unit_breakdown_data.append({
+                "unit_name": unit_data['unit__unit_name'],
+                "building": unit_data['unit__building'],
+                "rent_amount": (unit_data['unit__rent_amount']) if unit_data['unit__rent_amount'] else 0,
+                "total_paid": round((unit_data['total_paid']), 2),
+                "total_unpaid": round((unit_data['total_unpaid']), 2),
+                "total_expected": round((unit_data['total_expected']), 2),
+                "bill_count": unit_data['bill_count'],
+                "paid_bills": unit_data['paid_count'],
+                "unpaid_bills": unit_data['unpaid_count'],
+                "unit_completion": f"{unit_completion}%",
+                "percentage_of_total": round((unit_data['total_expected'] / total_expected) * 100, 2) if total_expected > 0 else 0
+            })
+
+        # Daily payment trend (ALL bills)
+        daily_trend = all_bills.values('due_date').annotate(
+            daily_total=Sum('amount_due'),
+            daily_paid=Sum('amount_due', filter=Q(payment_status='paid')),
+            daily_unpaid=Sum('amount_due', filter=Q(payment_status='pending')),
+            daily_count=Count('id')
+        ).order_by('due_date')
+
+        daily_trend_data = []
+        for day_data in daily_trend:
+            day_completion = round((day_data['daily_paid'] / day_data['daily_total']) * 100, 2) if day_data['daily_total'] > 0 else 0
+
+            daily_trend_data.append({
+                "date": day_data['due_date'].strftime('%Y-%m-%d'),
+                "amount_paid": round((day_data['daily_paid']), 2),
+                "amount_unpaid": round((day_data['daily_unpaid']), 2),
+                "amount_expected": round((day_data['daily_total']), 2),
+                "bill_count": day_data['daily_count'],
+                "daily_completion": f"{day_completion}%"
+            })
+
+        # Bill details (ALL bills)
+        bill_details = []
+        for bill in all_bills:
+            bill_details.append({
+                "bill_id": bill.id,
+                "due_date": bill.due_date.strftime('%Y-%m-%d'),
+                "amount_due": (bill.amount_due),
+                "amount_paid": (bill.amount_due) if bill.payment_status == 'paid' else 0,
+                "unit_name": bill.unit.unit_name if bill.unit else "N/A",
+                "building": bill.unit.building if bill.unit else "N/A",
+                "payment_status": bill.payment_status,
+                "created_at": bill.created_at.strftime('%Y-%m-%d %H:%M:%S')
+            })
+
+        response_data["detailed_breakdown"] = {
+            "by_unit": unit_breakdown_data,
+            "daily_payments": daily_trend_data,
+            "bill_details": bill_details
+        }
+
+    return response_data
+
+
+def user_yearly_report(user_id, year, breakdown='detailed'):
+    """
+    Yearly financial report of one resident (ALL bills), with monthly,
+    per-unit and quarterly breakdowns.
+
+    Raises the user model's ``DoesNotExist`` for an unknown ``user_id``.
+    """
+    # Get ALL bills for the specified user and year (not just paid),
+    # grouped in a single query
+    all_bills = BillReport.for_user(user_id, year)
+
+    # Get user info
+    user = get_user_model().objects.get(id=user_id)
+
+    user_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username
+
+    if not all_bills.exists():
+        return {
+            "report_type": "user_yearly",
+            "user_id": user_id,
+            "user_name": user_name,
+            "year": year,
+            "message": "No bills found for this year",
+            "summary": {
+                "total_paid": 0,
+                "total_unpaid": 0,
+                "total_bills": 0,
+                "average_payment": 0,
+                "payment_completion": "0%"
+            }
+        }
+
+    # Calculate totals - ALL bills
+    total_paid = all_bills.total(payment_status='paid') or 0
+    total_unpaid = all_bills.total(payment_status='pending') or 0
+    total_expected = all_bills.total() or 0
+    total_bills = all_bills.count()
+
+    paid_bills_count = all_bills.count(payment_status='paid')
+    unpaid_bills_count = all_bills.count(payment_status='pending')
+
+    average_payment = total_paid / paid_bills_count if paid_bills_count > 0 else 0
+
+    # Calculate ACTUAL payment completion
+    if total_expected > 0:
+        payment_completion_percentage = round((total_paid / total_expected) * 100, 2)
+    else:
+        payment_completion_percentage = 0
+
+    # Monthly breakdown (ALL bills)
+    monthly_breakdown_data = []
+    for month in all_bills.months():
+        month_bills = all_bills.filter(month=month)
+        monthly_paid = month_bills.total(payment_status='paid') or 0
+        monthly_unpaid = month_bills.total(payment_status='pending') or 0
+        monthly_total = month_bills.total()
+        month_completion = round((monthly_paid / monthly_total) * 100, 2) if monthly_total > 0 else 0
+
+        monthly_breakdown_data.append({
+            "month": calendar.month_name[month],
+            "month_number": month,
+            "amount_paid": round((monthly_paid), 2),
+            "amount_unpaid": round((monthly_unpaid), 2),
+            "amount_expected": round((monthly_total), 2),
+            "bill_count": month_bills.count(),
+            "monthly_completion": f"{month_completion}%",
+            "percentage_of_year": round((monthly_total / total_expected) * 100, 2) if total_expected > 0 else 0
+        })
+
+    # Basic response structure
+    response_data = {
+        "report_type": "user_yearly",
+        "user_id": user_id,
+        "user_name": user_name,
+        "user_email": user.email,
+        "year": year,
+        "summary": {
+            "total_paid": round((total_paid), 2),
+            "total_unpaid": round((total_unpaid), 2),
+            "total_expected": round((total_expected), 2),
+            "total_bills": total_bills,
+            "paid_bills_count": paid_bills_count,
+            "unpaid_bills_count": unpaid_bills_count,
+            "average_payment": round((average_payment), 2),
+            "payment_completion": f"{payment_completion_percentage}%",  # ACTUAL completion rate
+            "average_monthly_payment": round((total_paid / 12), 2) if total_paid > 0 else 0,
+        },
+        "monthly_breakdown": monthly_breakdown_data
+    }
+
+    # Add detailed breakdown if requested
+    if breakdown == 'detailed':
+        # Breakdown by unit (ALL bills)
+        unit_breakdown = sorted(
+            all_bills.group_by('unit__unit_name', 'unit__building', 'unit__rent_amount').items(),
+            key=lambda item: item[1].total(),
+            reverse=True
+        )
+
+        unit_breakdown_data = []
+        for (unit_name, building, rent_amount), unit_bills in unit_breakdown:
+            unit_paid = unit_bills.total(payment_status='paid') or 0
+            unit_unpaid = unit_bills.total(payment_status='pending') or 0
+            unit_expected = unit_bills.total()
+            paid_count = unit_bills.count(payment_status='paid')
+            avg_payment = unit_paid / paid_count if paid_count > 0 else 0
+
+            unit_completion = round((unit_paid / unit_expected) * 100, 2) if unit_expected > 0 else 0
+            unit_monthly_bills = len(all_bills.filter(unit__unit_name=unit_name).months())
+
+            unit_breakdown_data.append({
+                "unit_name": unit_name,
+                "building": building,
+                "rent_amount": (rent_amount) if rent_amount else 0,
+                "total_paid": round((unit_paid), 2),
+                "total_unpaid": round((unit_unpaid), 2),
+                "total_expected": round((unit_expected), 2),
+                "bill_count": unit_bills.count(),
+                "paid_bills": paid_count,
+                "unpaid_bills": unit_bills.count(payment_status='pending'),
+                "average_payment": round((avg_payment), 2),
+                "unit_completion": f"{unit_completion}%",
+                "months_with_payments": unit_monthly_bills,
+                "percentage_of_total": round((unit_expected / total_expected) * 100, 2) if total_expected > 0 else 0
+            })
+
+        # Quarterly breakdown (ALL bills)
+        quarterly_breakdown = []
+        for quarter, months in QUARTERS.items():
+            quarter_bills = all_bills.filter(month=months)
+            quarter_paid = quarter_bills.total(payment_status='paid') or 0
+            quarter_unpaid = quarter_bills.total(payment_status='pending') or 0
+            quarter_total = quarter_paid + quarter_unpaid
+            quarter_count = quarter_bills.count()
+
+            quarter_completion = round((quarter_paid / quarter_total) * 100, 2) if quarter_total > 0 else 0
+
+            quarterly_breakdown.append({
+                "quarter": f"Q{quarter}",
+                "months": [calendar.month_name[m] for m in months],
+                "amount_paid": round((quarter_paid), 2),
+                "amount_unpaid": round((quarter_unpaid), 2),
+                "amount_expected": round((quarter_total), 2),
+                "bill_count": quarter_count,
+                "quarter_completion": f"{quarter_completion}%",
+                "percentage_of_year": round((quarter_total / total_expected) * 100, 2) if total_expected > 0 else 0
+            })
+
+        # Payment consistency analysis
+        months_with_payments = len([m for m in monthly_breakdown_data if m['amount_expected'] > 0])
+        payment_consistency = {
+            "months_with_payments": months_with_payments,
+            "payment_consistency_rate": round((months_with_payments / 12) * 100, 2),
+            "most_active_month": max(monthly_breakdown_data, key=lambda x: x['amount_paid']) if monthly_breakdown_data else None,
+            "least_active_month": min(monthly_breakdown_data, key=lambda x: x['amount_paid']) if monthly_breakdown_data else None,
+            "best_completion_month": max(monthly_breakdown_data, key=lambda x: (x['monthly_completion'].rstrip('%'))) if monthly_breakdown_data else None,
+            "worst_completion_month": min(monthly_breakdown_data, key=lambda x: (x['monthly_completion'].rstrip('%'))) if monthly_breakdown_data else None
+        }
+
+        response_data["detailed_breakdown"] = {
+            "by_unit": unit_breakdown_data,
+            "quarterly": quarterly_breakdown,
+            "payment_analysis": payment_consistency
+        }
+
+    return response_data
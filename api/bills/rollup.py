@@ -0,0 +1,120 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+from units.models import Unit
+from .models import MonthlyBill, BillingRollup
+
+
+def _period_filter(periods, year_field, month_field):
+    periods_q = Q()
+    for year, month in periods:
+        periods_q |= Q(**{year_field: year, month_field: month})
+    return periods_q
+
+
+def refresh_billing_rollup(periods=None):
+    """
+    Recompute the rollup rows of the given (year, month) periods from MonthlyBill,
+    or the whole table when ``periods`` is None.
+
+    Used by the rebuild command and by the set-based bill jobs (``bulk_create`` and
+    ``update()`` skip the per-bill signals). Returns the number of rollup rows written.
+    """
+    bills = MonthlyBill.objects.all()
+    rollups = BillingRollup.objects.all()
+    if periods is not None:
+        periods = set(periods)
+        if not periods:
+            return 0
+        bills = bills.filter(_period_filter(periods, 'due_date__year', 'due_date__month'))
+        rollups = rollups.filter(_period_filter(periods, 'year', 'month'))
+
+    totals = (
+        bills
+        .annotate(year=ExtractYear('due_date'), month=ExtractMonth('due_date'))
+        .values('year', 'month', 'unit_id', 'unit__building', 'payment_status')
+        .annotate(
+            amount_total=Sum('amount_due'),
+            bill_count=Count('id'),
+            overdue_count=Count('id', filter=Q(due_status=MonthlyBill.DueStatus.OVERDUE)),
+        )
+        .order_by()
+    )
+
+    with transaction.atomic():
+        rollups.delete()
+        created = BillingRollup.objects.bulk_create(
+            [
+                BillingRollup(
+                    year=row['year'],
+                    month=row['month'],
+                    building=row['unit__building'] or '',
+                    unit_id=row['unit_id'],
+                    payment_status=row['payment_status'],
+                    amount_total=row['amount_total'],
+                    bill_count=row['bill_count'],
+                    overdue_count=row['overdue_count'],
+                )
+                for row in totals.iterator()
+            ],
+            batch_size=500,
+        )
+    return len(created)
+
+
+def _apply(state, sign):
+    year, month, unit_id, payment_status, amount, overdue = state
+    key = {'year': year, 'month': month, 'unit_id': unit_id, 'payment_status': payment_status}
+    changes = {
+        'amount_total': F('amount_total') + sign * amount,
+        'bill_count': F('bill_count') + sign,
+        'overdue_count': F('overdue_count') + sign * int(overdue),
+    }
+
+    if sign < 0:
+        BillingRollup.objects.filter(**key).update(**changes)
+        BillingRollup.objects.filter(**key, bill_count__lte=0).delete()
+        return
+
+    if BillingRollup.objects.filter(**key).update(**changes):
+        return
+
+    building = ''
+    if unit_id is not None:
+        building = Unit.all_objects.filter(pk=unit_id).values_list('building', flat=True).first() or ''
+    try:
+        with transaction.atomic():
+            BillingRollup.objects.create(
+                **key,
+                building=building,
+                amount_total=amount,
+                bill_count=1,
+                overdue_count=int(overdue),
+            )
+    except IntegrityError:
+        # Created concurrently since the update above
+        BillingRollup.objects.filter(**key).update(**changes)
+
+
+def apply_bill_change(old_state, new_state):
+    """
+    Move one bill's contribution in the rollup from ``old_state`` to ``new_state``
+    (see ``MonthlyBill.rollup_state``); either side may be None for create/delete.
+    """
+    if old_state == new_state:
+        return
+    if old_state is not None:
+        _apply(old_state, -1)
+    if new_state is not None:
+        _apply(new_state, 1)
+
+
+def periods_of(bills):
+    """Distinct (year, month) due periods of a MonthlyBill queryset."""
+    return set(
+        bills
+        .annotate(year=ExtractYear('due_date'), month=ExtractMonth('due_date'))
+        .values_list('year', 'month')
+        .distinct()
+        .order_by()
+    )
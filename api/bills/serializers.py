@@ -1,16 +1,29 @@
 from rest_framework import serializers
-from .models import MonthlyBill
+from django.urls import reverse
+from .models import MonthlyBill, ExportJob, ReceivableAging
+from .exports import normalize_export_params
 from users.serializers import UserSerializer
 from units.serializers import UnitSerializer
 from users.models import CustomUser
 from units.models import Unit
+from api.mixins import EagerLoadingMixin, UniqueConflictMixin
 
-class MonthlyBillSerializer(serializers.ModelSerializer):
-    user_fullname = serializers.CharField(source="user.fullname", read_only=True)
+
+def full_name(first_name, last_name):
+    """``AbstractUser.get_full_name()`` from the column values (for row projections)."""
+    return f"{first_name} {last_name}".strip()
+
+
+class MonthlyBillSerializer(UniqueConflictMixin, EagerLoadingMixin, serializers.ModelSerializer):
+    user_fullname = serializers.CharField(source="user.get_full_name", read_only=True)
     user_email = serializers.EmailField(source="user.email", read_only=True)
     user = UserSerializer(read_only=True)
     unit = UnitSerializer(read_only=True)
 
+    # Fields api.projection.RowProjector can't derive from the model
+    row_projections = {
+        "user_fullname": (("user__first_name", "user__last_name"), full_name),
+    }
 
      # ✅ Optional user_id for admin/employee to assign bills manually
     user_id = serializers.PrimaryKeyRelatedField(
@@ -43,9 +56,15 @@ class MonthlyBillSerializer(serializers.ModelSerializer):
             "payment_status",
             "due_status",
             "sms_sent",
-            "created_at"
+            "created_at",
+            "updated_at",
         ]
-        read_only_fields = ["due_status", "created_at"]
+        read_only_fields = ["due_status", "created_at", "updated_at"]
+        # A second bill for the same resident, unit and due date is rejected
+        # by the monthlybill_unique_user_unit_due constraint on save
+        validators = []
+
+    unique_conflict_message = "A bill for this resident, unit and due date already exists."
 
 
 class ExpenseReflectionSerializer(serializers.Serializer):
@@ -63,3 +82,63 @@ class ExpenseReflectionSerializer(serializers.Serializer):
     chart_data = serializers.DictField(required=False, allow_null=True)
     detailed_breakdown = serializers.DictField(required=False, allow_null=True)
     calculation_note = serializers.CharField(required=False, allow_null=True)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id",
+            "kind",
+            "params",
+            "status",
+            "progress",
+            "filename",
+            "error",
+            "download_url",
+            "created_at",
+            "finished_at",
+            "expires_at",
+        ]
+        read_only_fields = [
+            "status", "progress", "filename", "error",
+            "created_at", "finished_at", "expires_at",
+        ]
+
+    def validate(self, attrs):
+        try:
+            attrs["params"] = normalize_export_params(attrs["kind"], attrs.get("params"))
+        except ValueError as exc:
+            raise serializers.ValidationError({"params": str(exc)})
+        return attrs
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.Status.DONE or obj.is_expired:
+            return None
+        url = reverse("export-job-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
+
+
+class ReceivableAgingSerializer(EagerLoadingMixin, serializers.ModelSerializer):
+    user_fullname = serializers.CharField(source="user.get_full_name", read_only=True)
+
+    class Meta:
+        model = ReceivableAging
+        fields = [
+            "id",
+            "user",
+            "user_fullname",
+            "building",
+            "days_0_30",
+            "days_31_60",
+            "days_61_90",
+            "days_over_90",
+            "total",
+            "bill_count",
+            "oldest_due_date",
+            "as_of",
+        ]
+        read_only_fields = fields
@@ -0,0 +1,281 @@
+from datetime import timedelta
+from decimal import Decimal
+from calendar import monthrange
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.db.models.functions import ExtractDay
+from django.conf import settings
+from dateutil.relativedelta import relativedelta
+from django.utils.timezone import now
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from payments.ledger import record_bills_created
+from units.models import AssignedUnit
+from .models import MonthlyBill, BillNotification
+from .signals import notify_users
+from .rollup import periods_of, refresh_billing_rollup
+from .aging import refresh_aging_for_day
+
+
+# Bills are generated this many days before their due date
+BILL_LEAD_DAYS = 7
+
+# Monthly add-on charges per enabled service on an assigned unit
+ADDITIONAL_CHARGES = {
+    "amenities": Decimal("2500.00"),
+    "security": Decimal("2000.00"),
+    "maintenance": Decimal("1500.00"),
+}
+
+
+def billing_days_for(due_date):
+    """
+    Return the move-in days that fall due on ``due_date``.
+
+    Move-in days past the end of a short month are billed on its last day
+    (e.g. a resident who moved in on the 31st is billed on Feb 28/29).
+    """
+    last_day = monthrange(due_date.year, due_date.month)[1]
+    if due_date.day == last_day:
+        return list(range(due_date.day, 32))
+    return [due_date.day]
+
+
+def monthly_due_dates(start, end):
+    """
+    Due dates from ``start`` through ``end``, one per month on the day of ``start``.
+
+    Each date is counted from ``start`` rather than from the previous month, so
+    a 31st start is due on the last day of short months and on the 31st again
+    after them.
+    """
+    due_dates = []
+    due_date = start
+    while due_date <= end:
+        due_dates.append(due_date)
+        due_date = start + relativedelta(months=len(due_dates))
+    return due_dates
+
+
+def monthly_amount_for(assigned):
+    """Base rent plus the add-on charges enabled on the assignment."""
+    total = Decimal(assigned.unit_id.rent_amount)
+    for service, charge in ADDITIONAL_CHARGES.items():
+        if getattr(assigned, service):
+            total += charge
+    return total
+
+
+def insert_bills(bills):
+    """
+    Insert new ``MonthlyBill`` objects and return the ones inserted.
+
+    The monthlybill_unique_user_unit_due constraint is the duplicate check: the
+    batch is a single ``bulk_create``, and only if it conflicts with bills
+    created meanwhile (e.g. by a concurrent worker) are the bills inserted one
+    by one, skipping the duplicates. Runs in savepoints, so the caller's
+    transaction survives a conflict. ``ignore_conflicts`` is not used because
+    it leaves the primary keys unset, and the ledger needs them.
+    """
+    bills = list(bills)
+    if not bills:
+        return []
+    try:
+        with transaction.atomic():
+            return MonthlyBill.objects.bulk_create(bills)
+    except IntegrityError:
+        inserted = []
+        for bill in bills:
+            try:
+                with transaction.atomic():
+                    inserted += MonthlyBill.objects.bulk_create([bill])
+            except IntegrityError:
+                continue
+        return inserted
+
+
+def generate_due_bills(today=None):
+    """
+    Create the bills that fall due ``BILL_LEAD_DAYS`` from ``today``.
+
+    Due assignments are selected with a single query keyed on the billing day
+    of the computed due date, so the cost tracks the number of bills due rather
+    than the size of the portfolio. Missing bills are inserted with one
+    ``bulk_create`` inside a transaction, and their charges are posted to the
+    residents' ledger accounts.
+
+    Bills created since the selection are left to the unique constraint (see
+    ``insert_bills``), so there is no re-check before the insert.
+
+    Returns a report dict:
+        {"due_date": ..., "created": n, "skipped": n, "conflicted": n}
+
+    - skipped: a bill for the same resident, unit and due date already existed
+    - conflicted: the bill appeared between selection and insert (e.g. a
+      concurrent worker created it), so it was not inserted again
+    """
+    today = today or now().date()
+    due_date = today + timedelta(days=BILL_LEAD_DAYS)
+
+    existing_bill = MonthlyBill.objects.filter(
+        user=OuterRef("assigned_by"),
+        due_date=due_date,
+    ).filter(Q(unit=OuterRef("unit_id")) | Q(unit__isnull=True))
+
+    # ✅ Active assignments whose billing day matches the due date
+    due_assignments = (
+        AssignedUnit.objects
+        .annotate(billing_day=ExtractDay("move_in_date"))
+        .filter(
+            billing_day__in=billing_days_for(due_date),
+            unit_id__isnull=False,
+            unit_id__rent_amount__gt=0,
+            assigned_by__isnull=False,
+            assigned_by__is_active=True,
+            assigned_by__account_status="active",
+        )
+        .annotate(has_bill=Exists(existing_bill))
+        .select_related("unit_id")
+        .only(
+            "id", "assigned_by_id", "amenities", "security", "maintenance",
+            "unit_id__id", "unit_id__rent_amount",
+        )
+    )
+
+    skipped = 0
+    candidates = {}
+    for assigned in due_assignments:
+        key = (assigned.assigned_by_id, assigned.unit_id_id)
+        if assigned.has_bill or key in candidates:
+            skipped += 1
+            continue
+        candidates[key] = MonthlyBill(
+            user_id=assigned.assigned_by_id,
+            unit_id=assigned.unit_id_id,
+            amount_due=monthly_amount_for(assigned),
+            due_date=due_date,
+            payment_status=MonthlyBill.PaymentStatus.PENDING,
+            due_status=MonthlyBill.DueStatus.UPCOMING,
+        )
+
+    created = []
+    if candidates:
+        with transaction.atomic():
+            created = insert_bills(candidates.values())
+            if created:
+                # bulk_create skips the ledger signals; post the new charges in one batch
+                record_bills_created(created)
+                refresh_billing_rollup({(due_date.year, due_date.month)})
+                notify_users({bill.user_id for bill in created})
+    conflicted = len(candidates) - len(created)
+
+    report = {
+        "due_date": due_date.isoformat(),
+        "created": len(created),
+        "skipped": skipped,
+        "conflicted": conflicted,
+    }
+    print(f"✅ Generated {report['created']} bills due {report['due_date']} "
+          f"(skipped {skipped}, conflicted {conflicted})")
+    return report
+
+
+def transition_due_statuses(today=None):
+    """
+    Move bills whose due status changes as of ``today``.
+
+    Only bills that actually transition are touched, using one set-based
+    ``UPDATE`` per transition instead of re-saving the whole bill history:
+        - pending,  due today            -> due_today
+        - pending,  due before today     -> overdue (also catches up missed runs)
+        - paid,     not yet marked done  -> done
+
+    ``update()`` bypasses ``save()`` and ``post_save``, so affected residents
+    are queued for notification once, in a single batch, and the billing rollup
+    of the touched months is refreshed. The receivables aging of the affected
+    residents is refreshed too, or all of it on the first run of a day.
+
+    Returns a dict with the number of bills moved into each status.
+    """
+    today = today or now().date()
+    pending = MonthlyBill.objects.filter(payment_status=MonthlyBill.PaymentStatus.PENDING)
+
+    transitions = {
+        MonthlyBill.DueStatus.DUE_TODAY: pending.filter(due_date=today),
+        MonthlyBill.DueStatus.OVERDUE: pending.filter(due_date__lt=today),
+        MonthlyBill.DueStatus.DONE: MonthlyBill.objects.filter(
+            payment_status=MonthlyBill.PaymentStatus.PAID
+        ),
+    }
+
+    report = {}
+    user_ids = set()
+    periods = set()
+    with transaction.atomic():
+        for status, bills in transitions.items():
+            # Listing the other statuses (rather than excluding this one) lets
+            # monthlybill_status_due_idx seek straight to the bills to move
+            bills = bills.filter(due_status__in=[s for s in MonthlyBill.DueStatus.values if s != status])
+            user_ids.update(bills.values_list("user_id", flat=True))
+            periods.update(periods_of(bills))
+            report[status.value] = bills.update(due_status=status, updated_at=now())
+
+        # update() skips the rollup signals; refresh the overdue counts of the touched months
+        refresh_billing_rollup(periods)
+        refresh_aging_for_day(user_ids, today=today)
+        notify_users(user_ids)
+
+    print(f"🔄 Transitioned {sum(report.values())} bills {report}")
+    return report
+
+
+def flush_bill_notifications():
+    """
+    Send the queued bill notifications whose changes have settled.
+
+    A user is flushed once no change has been queued for
+    ``BILL_NOTIFICATION_DEBOUNCE_SECONDS``, or once their first queued change
+    is older than ``BILL_NOTIFICATION_MAX_DELAY_SECONDS``. The overdue count of
+    every flushed user comes from one grouped query, and each user receives a
+    single group message per flush.
+
+    Rows are only removed after the messages were sent; rows that changed again
+    during the flush are kept for the next run.
+    """
+    current = now()
+    debounce_cutoff = current - timedelta(seconds=settings.BILL_NOTIFICATION_DEBOUNCE_SECONDS)
+    max_delay_cutoff = current - timedelta(seconds=settings.BILL_NOTIFICATION_MAX_DELAY_SECONDS)
+
+    ready = list(
+        BillNotification.objects
+        .filter(Q(changed_at__lte=debounce_cutoff) | Q(queued_at__lte=max_delay_cutoff))
+        .values_list("user_id", flat=True)
+    )
+    if not ready:
+        return {"sent": 0}
+
+    overdue_counts = dict(
+        MonthlyBill.objects
+        .filter(user_id__in=ready, due_status=MonthlyBill.DueStatus.OVERDUE)
+        .values("user_id")
+        .annotate(count=Count("id"))
+        .values_list("user_id", "count")
+    )
+
+    channel_layer = get_channel_layer()
+    sent = []
+    try:
+        for user_id in ready:
+            async_to_sync(channel_layer.group_send)(
+                f"user_{user_id}",
+                {"type": "send_request_notification", "count": overdue_counts.get(user_id, 0)}
+            )
+            sent.append(user_id)
+    except Exception as exc:
+        # Keep the unsent rows queued and retry on the next flush
+        print(f"⚠️ Channel layer not available, {len(ready) - len(sent)} notifications deferred: {exc}")
+
+    # Rows touched again while sending have a newer changed_at and are kept
+    BillNotification.objects.filter(user_id__in=sent, changed_at__lte=current).delete()
+
+    return {"sent": len(sent)}
@@ -1,8 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from .models import MonthlyBill
+from django.utils.timezone import now
+from units.models import Unit
+from .models import MonthlyBill, BillingRollup, BillNotification
+from .rollup import apply_bill_change
+from .aging import refresh_receivable_aging
 
 # @receiver(post_save, sender=MonthlyBill)
 # def notify_overdue_bills(sender, instance, created, **kwargs):
@@ -20,17 +22,104 @@ from .models import MonthlyBill
 #         )
 
 
+def notify_users(user_ids):
+    """
+    Queue a bill notification for each user.
+
+    Only records the change in the ``BillNotification`` outbox (one upsert for
+    the whole batch); the websocket messages are sent by the
+    ``bills.tasks.send_bill_notifications`` task, so callers never block on Redis.
+    """
+    user_ids = {user_id for user_id in user_ids if user_id}
+    if not user_ids:
+        return
+
+    changed_at = now()
+    BillNotification.objects.bulk_create(
+        [BillNotification(user_id=user_id, queued_at=changed_at, changed_at=changed_at) for user_id in user_ids],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=["changed_at"],
+    )
+
+
 @receiver(post_save, sender=MonthlyBill)
 def notify_overdue_bills(sender, instance, **kwargs):
-    user = instance.user
-    unseen_count = 5  # or your actual logic
-    channel_layer = get_channel_layer()
-
-    try:
-        async_to_sync(channel_layer.group_send)(
-            f"user_{user.id}",
-            {"type": "send_request_notification", "count": unseen_count}
-        )
-    except ConnectionError:
-        # Just log the error and skip notifications
-        print("⚠️ Redis not available, skipping notifications")
\ No newline at end of file
+    notify_users([instance.user_id])
+
+
+@receiver(post_delete, sender=MonthlyBill)
+def notify_deleted_bills(sender, instance, **kwargs):
+    notify_users([instance.user_id])
+
+
+@receiver(pre_save, sender=MonthlyBill)
+def remember_persisted_state(sender, instance, raw=False, **kwargs):
+    # Read the persisted values so the rollup, the aging and the payments ledger move
+    # exactly what the database held, even when the instance in hand is stale or was never loaded
+    instance._rollup_state = instance._ledger_state = instance._aging_state = None
+    if raw or instance.pk is None:
+        return
+    persisted = MonthlyBill.objects.filter(pk=instance.pk).only(
+        "user_id", "due_date", "unit_id", "payment_status", "amount_due", "due_status"
+    ).first()
+    if persisted is not None:
+        instance._rollup_state = persisted.rollup_state()
+        instance._ledger_state = persisted.ledger_state()
+        instance._aging_state = persisted.aging_state()
+
+
+@receiver(post_save, sender=MonthlyBill)
+def update_billing_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    apply_bill_change(getattr(instance, '_rollup_state', None), instance.rollup_state())
+
+
+@receiver(pre_delete, sender=MonthlyBill)
+def remember_deleted_state(sender, instance, origin=None, **kwargs):
+    # A bill deleted through its own instance may be stale; the ones a cascade or
+    # queryset delete collects were just read from the database
+    instance._deleted_rollup_state = None
+    if origin is instance:
+        persisted = MonthlyBill.objects.filter(pk=instance.pk).only(
+            "due_date", "unit_id", "payment_status", "amount_due", "due_status"
+        ).first()
+        instance._deleted_rollup_state = persisted.rollup_state() if persisted is not None else None
+
+
+@receiver(post_delete, sender=MonthlyBill)
+def remove_from_billing_rollup(sender, instance, **kwargs):
+    apply_bill_change(getattr(instance, '_deleted_rollup_state', None) or instance.rollup_state(), None)
+
+
+@receiver(pre_save, sender=Unit)
+def remember_unit_building(sender, instance, raw=False, **kwargs):
+    instance._persisted_building = None
+    if not raw and instance.pk is not None:
+        instance._persisted_building = Unit.all_objects.filter(pk=instance.pk).values_list('building', flat=True).first()
+
+
+@receiver(post_save, sender=Unit)
+def move_rollup_building(sender, instance, raw=False, **kwargs):
+    # The rollup copies the building of its unit; a unit moved with update()
+    # is picked up by the next rebuild_billing_rollup
+    old_building = getattr(instance, '_persisted_building', None)
+    if raw or old_building is None or old_building == instance.building:
+        return
+    BillingRollup.objects.filter(unit_id=instance.pk).update(building=instance.building or '')
+
+
+@receiver(post_save, sender=MonthlyBill)
+def update_receivable_aging(sender, instance, raw=False, **kwargs):
+    old_state = getattr(instance, '_aging_state', None)
+    if raw or old_state == instance.aging_state():
+        return
+    refresh_receivable_aging({instance.user_id, old_state[0] if old_state else None})
+
+
+@receiver(post_delete, sender=MonthlyBill)
+def remove_from_receivable_aging(sender, instance, origin=None, **kwargs):
+    # When the resident is deleted, their aging rows go with them
+    if isinstance(origin, MonthlyBill) or getattr(origin, 'model', None) is MonthlyBill:
+        refresh_receivable_aging({instance.user_id})
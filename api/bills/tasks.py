@@ -5,7 +5,8 @@ from django.utils.timezone import now
 from dateutil.relativedelta import relativedelta
 from users.models import CustomUser
 from bills.models import MonthlyBill
-from units.models import AssignedUnit
+from bills.services import generate_due_bills, transition_due_statuses, flush_bill_notifications
+from bills import exports
 
 # @shared_task
 # def generate_monthly_bill():
@@ -84,86 +85,41 @@ def generate_monthly_bill():
         - Units without rent amount
         - Soft-deleted assigned units
         - Duplicate bills for the same due date
+    Returns the generation report (created / skipped / conflicted counts).
     """
-    today = now().date()
-    print(f"[{today}] Running generate_monthly_bill task")
-
-    # ✅ Fetch active assigned units (not soft deleted)
-    assigned_units = AssignedUnit.objects.filter(
-        deleted_at__isnull=True,
-        unit_id__isnull=False,
-        assigned_by__isnull=False,
-    ).select_related("unit_id", "assigned_by")
-
-    count = 0
-    for assigned in assigned_units:
-        user = assigned.assigned_by
-        unit = assigned.unit_id
-
-        # ✅ Skip if user is inactive or account_status != 'active'
-        if not user.is_active or getattr(user, "account_status", None) != "active":
-            continue
-
-        if not unit or not unit.rent_amount:
-            continue
-
-        # 💰 Base rent
-        total_amount_due = float(unit.rent_amount)
-
-        # ➕ Additional charges
-        if assigned.amenities:
-            total_amount_due += 2500
-        if assigned.security:
-            total_amount_due += 2000
-        if assigned.maintenance:
-            total_amount_due += 1500
-
-        # Assume bill is due monthly on the same day as assignment date
-        move_in_date = assigned.move_in_date.date()
-        due_day = move_in_date.day
-
-        # Step 1: Compute next due date (this or next month)
-        if today.day <= due_day:
-            target_month = today.month
-            target_year = today.year
-        else:
-            next_month = today + relativedelta(months=1)
-            target_month = next_month.month
-            target_year = next_month.year
-
-        # Step 2: Handle months shorter than move-in day (e.g., Feb 30 → Feb 28/29)
-        last_day = monthrange(target_year, target_month)[1]
-        due_day = min(due_day, last_day)
-        next_due_date = date(target_year, target_month, due_day)
-
-        # Step 3: Generate bill 7 days before due date
-        generate_date = next_due_date - timedelta(days=7)
-
-        if today == generate_date:
-            if not MonthlyBill.objects.filter(user=user, due_date=next_due_date).exists():
-                MonthlyBill.objects.create(
-                    user=user,
-                    unit=unit,
-                    amount_due=total_amount_due,
-                    due_date=next_due_date,
-                )
-                count += 1
-
-    print(f"✅ Generated {count} bills (7 days before due date)")
-    return f"✅ Generated {count} bills (7 days before due date)"
+    print(f"[{now().date()}] Running generate_monthly_bill task")
+    return generate_due_bills()
 
 
 @shared_task
 def update_bill_status():
     """
-    Refresh all bill statuses (e.g., upcoming, overdue, done).
+    Move bills whose due status changes today (upcoming -> due_today,
+    due_today -> overdue, paid -> done) with set-based updates.
     """
-    bills = MonthlyBill.objects.all()
-    count = 0
-    for bill in bills:
-        bill.save()  # triggers update_due_status()
-        count += 1
+    return transition_due_statuses()
 
-    print(f"🔄 Updated {count} bills")
-    return f"🔄 Updated {count} bills"
 
+@shared_task
+def send_bill_notifications():
+    """
+    Flush the bill notification outbox: one websocket message per user
+    with their current overdue count.
+    """
+    return flush_bill_notifications()
+
+
+@shared_task
+def run_export_job(job_id):
+    """
+    Render a queued report export (see bills.exports) into the exports storage.
+    """
+    return exports.run_export_job(job_id)
+
+
+@shared_task
+def purge_expired_exports():
+    """
+    Delete report exports whose download window (EXPORT_JOB_TTL_SECONDS) has passed.
+    """
+    return exports.purge_expired_exports()
@@ -1,3 +1,680 @@
-from django.test import TestCase
+import json
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.db import IntegrityError, connection, transaction
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F, Sum
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from users.models import CustomUser
+from units.models import AssignedUnit, Unit
+from . import exports, services
+from .models import BillingRollup, BillNotification, ExportJob, MonthlyBill, ReceivableAging
+from .reports import QUARTERS, BillReport
+from .rollup import refresh_billing_rollup
+from .services import flush_bill_notifications, insert_bills, transition_due_statuses
+from .serializers import MonthlyBillSerializer
 
-# Create your tests here.
+
+class MonthlyBillListTests(APITestCase):
+    """Bill list endpoints: no per-row queries, and projected rows match the serializer."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create(username="admin", role="admin")
+        self.client.force_authenticate(self.admin)
+
+    def add_bills(self, count):
+        for _ in range(count):
+            index = CustomUser.objects.count()
+            unit = Unit.objects.create(unit_name=f"Unit {index}", building="A", rent_amount=1000)
+            resident = CustomUser.objects.create(username=f"resident{index}", first_name="Res", unit=unit)
+            MonthlyBill.objects.create(
+                user=resident, unit=unit, amount_due=Decimal("1000.00"), due_date=date(2025, 1, 5)
+            )
+
+    def query_count(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for url in [reverse("bill-list"), reverse("bill-list-create") + "?page_size=50&pagination=keyset"]:
+            with self.subTest(url=url):
+                MonthlyBill.objects.all().delete()
+                self.add_bills(2)
+                few, _ = self.query_count(url)
+                self.add_bills(8)
+                many, response = self.query_count(url)
+                self.assertEqual(few, many)
+
+    def test_user_fullname_is_serialized(self):
+        self.add_bills(1)
+        _, response = self.query_count(reverse("bill-list"))
+        self.assertEqual(response.data[0]["user_fullname"], "Res")
+
+    def test_row_projection_matches_serializer(self):
+        self.add_bills(3)
+        MonthlyBill.objects.create(user=self.admin, amount_due=Decimal("12.50"), due_date=date(2025, 2, 1))
+        _, response = self.query_count(reverse("bill-list"))
+        bills = MonthlyBillSerializer.eager_load(MonthlyBill.objects.order_by("-due_date"))
+        expected = MonthlyBillSerializer(bills, many=True, context={"request": response.wsgi_request}).data
+        self.assertEqual(response.json(), json.loads(JSONRenderer().render(expected)))
+
+    def test_sparse_fieldset(self):
+        self.add_bills(2)
+        for url in [reverse("bill-list"), reverse("bill-list-create")]:
+            with self.subTest(url=url):
+                _, response = self.query_count(url + "?fields=id,user_fullname,unknown")
+                rows = response.json()
+                rows = rows["results"] if isinstance(rows, dict) else rows
+                self.assertEqual([set(row) for row in rows], [{"id", "user_fullname"}] * 2)
+
+    def test_ndjson_stream_matches_json_list(self):
+        self.add_bills(3)
+        _, response = self.query_count(reverse("bill-list"))
+        stream = self.client.get(reverse("bill-list") + "?format=ndjson")
+        self.assertEqual(stream["Content-Type"], "application/x-ndjson")
+        lines = b"".join(stream.streaming_content).splitlines()
+        self.assertEqual([json.loads(line) for line in lines], response.json())
+
+
+class OverdueUserSummaryTests(APITestCase):
+    """The overdue summary is a plain list unless a page or page size is asked for."""
+
+    def setUp(self):
+        self.client.force_authenticate(CustomUser.objects.create(username="admin", role="admin"))
+        for index in range(3):
+            resident = CustomUser.objects.create(username=f"resident{index}", role="resident")
+            MonthlyBill.objects.create(user=resident, amount_due=Decimal(1000 + index), due_date=date(2025, 1, 5))
+
+    def test_pagination_is_opt_in(self):
+        url = reverse("overdues-accounts")
+        self.assertEqual([row["user"] for row in self.client.get(url).json()], ["resident2", "resident1", "resident0"])
+        for query in [{"page": 1}, {"page_size": 2}, {"page": 2, "page_size": 2}]:
+            with self.subTest(query=query):
+                response = self.client.get(url, query).json()
+                self.assertEqual(response["count"], 3)
+        self.assertEqual(len(self.client.get(url, {"page_size": 2}).json()["results"]), 2)
+
+
+class ReceivableAgingTests(APITestCase):
+    """Aging buckets follow bill changes and the daily transition, and the report filters them."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create(username="admin", role="admin")
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.unit = Unit.objects.create(unit_name="Unit 1", building="A", rent_amount=1000)
+        self.today = date.today()
+        self.client.force_authenticate(self.admin)
+
+    def add_bill(self, days_overdue, amount="1000.00", user=None, unit=None):
+        return MonthlyBill.objects.create(
+            user=user or self.resident, unit=unit or self.unit,
+            amount_due=Decimal(amount), due_date=self.today - timedelta(days=days_overdue),
+        )
+
+    def aging(self):
+        return ReceivableAging.objects.get(user=self.resident, building="A")
+
+    def test_buckets_follow_bills(self):
+        self.add_bill(5)
+        self.add_bill(45, "200.00")
+        bill = self.add_bill(120, "300.00")
+        self.add_bill(-3)  # not due yet
+
+        aging = self.aging()
+        self.assertEqual(
+            [aging.days_0_30, aging.days_31_60, aging.days_61_90, aging.days_over_90, aging.total],
+            [Decimal("1000.00"), Decimal("200.00"), Decimal("0.00"), Decimal("300.00"), Decimal("1500.00")],
+        )
+
+        bill.payment_status = MonthlyBill.PaymentStatus.PAID
+        bill.save()
+        self.assertEqual(self.aging().days_over_90, Decimal("0.00"))
+
+        # The next day's transition ages everything by a day
+        ReceivableAging.objects.update(as_of=self.today - timedelta(days=1))
+        transition_due_statuses(today=self.today + timedelta(days=16))
+        aging = self.aging()
+        self.assertEqual([aging.days_0_30, aging.days_61_90], [Decimal("2000.00"), Decimal("200.00")])
+
+    def test_report_filters_by_building_and_min_amount(self):
+        other = Unit.objects.create(unit_name="Unit 2", building="B", rent_amount=1000)
+        self.add_bill(5, "500.00")
+        self.add_bill(5, "2000.00", user=self.admin, unit=other)
+
+        response = self.client.get(reverse("receivable-aging"), {"building": "A"})
+        self.assertEqual([row["total"] for row in response.json()["results"]], ["500.00"])
+
+        response = self.client.get(reverse("receivable-aging"), {"min_amount": "1000"})
+        self.assertEqual([row["building"] for row in response.json()["results"]], ["B"])
+
+        response = self.client.get(reverse("receivable-aging-buildings"))
+        self.assertEqual([(row["building"], row["total"]) for row in response.json()], [("B", 2000), ("A", 500)])
+
+        self.client.force_authenticate(self.resident)
+        self.assertEqual(self.client.get(reverse("receivable-aging")).status_code, 403)
+
+
+class BillReportTests(APITestCase):
+    """BillReport slices agree with the per-view MonthlyBill aggregates they replaced."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.neighbour = CustomUser.objects.create(username="neighbour", role="resident")
+        unit_a = Unit.objects.create(unit_name="Unit A", building="A", rent_amount=1000)
+        unit_b = Unit.objects.create(unit_name="Unit B", building="B", rent_amount=1500)
+        bills = [
+            (self.resident, unit_a, date(2025, 1, 5), "1000.00", "paid", "done"),
+            (self.resident, unit_a, date(2025, 2, 5), "1000.00", "pending", "overdue"),
+            (self.resident, unit_a, date(2025, 5, 5), "1000.00", "pending", "upcoming"),
+            (self.resident, unit_b, date(2025, 2, 20), "1500.00", "paid", "done"),
+            (self.resident, unit_b, date(2025, 11, 20), "1500.00", "pending", "overdue"),
+            (self.resident, None, date(2025, 2, 1), "250.50", "pending", "overdue"),
+            (self.resident, unit_a, date(2024, 12, 5), "1000.00", "pending", "overdue"),
+            (self.neighbour, unit_b, date(2025, 2, 25), "1500.00", "paid", "done"),
+        ]
+        for user, unit, due_date, amount, payment_status, due_status in bills:
+            MonthlyBill.objects.create(
+                user=user, unit=unit, due_date=due_date, amount_due=Decimal(amount),
+                payment_status=payment_status, due_status=due_status,
+            )
+
+    def assertMatches(self, report, bills):
+        """total/count/overdue_count of ``report`` against the same aggregates of ``bills``."""
+        for payment_status in (None, "paid", "pending"):
+            with self.subTest(payment_status=payment_status):
+                expected = bills.filter(payment_status=payment_status) if payment_status else bills
+                criteria = {"payment_status": payment_status} if payment_status else {}
+                self.assertEqual(report.total(**criteria), expected.aggregate(total=Sum("amount_due"))["total"])
+                self.assertEqual(report.count(**criteria), expected.count())
+                self.assertEqual(report.overdue_count(**criteria), expected.filter(due_status="overdue").count())
+
+    def test_slices_match_the_queryset_aggregates(self):
+        bills = MonthlyBill.objects.filter(user=self.resident, due_date__year=2025)
+        with self.assertNumQueries(1):
+            report = BillReport.for_user(self.resident.pk, 2025)
+        self.assertMatches(report, bills)
+
+        with self.assertNumQueries(0):
+            months = report.months()
+        self.assertEqual(months, sorted({bill.due_date.month for bill in bills}))
+        for month in range(1, 13):
+            with self.subTest(month=month):
+                self.assertMatches(report.filter(month=month), bills.filter(due_date__month=month))
+        for quarter, months in QUARTERS.items():
+            with self.subTest(quarter=quarter):
+                self.assertMatches(report.filter(month=months), bills.filter(due_date__month__in=months))
+
+        # Units in id order, bills without a unit last
+        by_unit = report.group_by("unit_id")
+        unit_ids = [*Unit.objects.order_by("id").values_list("id", flat=True), None]
+        self.assertEqual(list(by_unit), [(unit_id,) for unit_id in unit_ids])
+        for (unit_id,), unit_report in by_unit.items():
+            with self.subTest(unit_id=unit_id):
+                self.assertMatches(unit_report, bills.filter(unit_id=unit_id))
+        units = bills.values("unit_id", "unit__unit_name", "unit__building").distinct()
+        self.assertEqual(report.units(), list(units.order_by(F("unit_id").asc(nulls_last=True))))
+
+    def test_month_and_several_users(self):
+        bills = MonthlyBill.objects.filter(due_date__year=2025, due_date__month=2)
+        report = BillReport.for_users([self.resident.pk, self.neighbour.pk], 2025, month=2)
+        self.assertMatches(report, bills)
+        for user in (self.resident, self.neighbour):
+            with self.subTest(user=user.username):
+                self.assertMatches(report.filter(user_id=user.pk), bills.filter(user=user))
+
+    def test_empty_slices_behave_like_aggregate(self):
+        report = BillReport.for_user(self.resident.pk, 2023)
+        self.assertFalse(report.exists())
+        self.assertIsNone(report.total())
+        self.assertEqual((report.count(), report.overdue_count(), report.months()), (0, 0, []))
+        self.assertIsNone(BillReport.for_user(self.resident.pk, 2025).total(month=3))
+
+
+class GenerateDueBillsTests(APITestCase):
+    """Bills are generated a lead time ahead for the assignments whose billing day is due."""
+
+    def assign(self, name, move_in_day, **user_fields):
+        resident = CustomUser.objects.create(username=name, role="resident", **user_fields)
+        unit = Unit.objects.create(unit_name=name, building="A", rent_amount=1000)
+        AssignedUnit.objects.create(
+            unit_id=unit, assigned_by=resident, building="A", amenities=False, security=False, maintenance=False,
+            move_in_date=datetime(2024, 1, move_in_day, 9, tzinfo=dt_timezone.utc),
+        )
+        return resident
+
+    def generate(self, due_date):
+        return services.generate_due_bills(today=due_date - timedelta(days=services.BILL_LEAD_DAYS))
+
+    def billed(self, due_date):
+        return set(MonthlyBill.objects.filter(due_date=due_date).values_list("user__username", flat=True))
+
+    def test_month_end_move_ins_are_billed_on_the_last_day(self):
+        self.assign("day28", 28)
+        self.assign("day30", 30)
+        self.assign("day31", 31)
+
+        self.assertEqual(self.generate(date(2025, 2, 28))["created"], 3)
+        self.assertEqual(self.billed(date(2025, 2, 28)), {"day28", "day30", "day31"})
+
+        self.generate(date(2024, 2, 28))
+        self.generate(date(2024, 2, 29))
+        self.assertEqual(self.billed(date(2024, 2, 28)), {"day28"})
+        self.assertEqual(self.billed(date(2024, 2, 29)), {"day30", "day31"})
+
+        self.generate(date(2025, 4, 30))
+        self.assertEqual(self.billed(date(2025, 4, 30)), {"day30", "day31"})
+        self.assertEqual(self.generate(date(2025, 5, 31))["created"], 1)
+
+    def test_inactive_and_suspended_residents_are_skipped(self):
+        self.assign("active", 5)
+        self.assign("inactive", 5, is_active=False)
+        self.assign("suspended", 5, account_status=CustomUser.AccountStatus.INACTIVE)
+
+        report = self.generate(date(2025, 3, 5))
+        self.assertEqual((report["created"], report["skipped"]), (1, 0))
+        self.assertEqual(self.billed(date(2025, 3, 5)), {"active"})
+
+    def test_existing_bills_are_skipped(self):
+        resident = self.assign("with-unit", 5)
+        unitless = self.assign("unitless", 5)
+        self.assign("new", 5)
+        due_date = date(2025, 3, 5)
+        MonthlyBill.objects.create(user=resident, unit=resident.assigned_unit.get().unit_id, amount_due=1000, due_date=due_date)
+        # A bill without a unit (e.g. entered by hand) also counts for the resident
+        MonthlyBill.objects.create(user=unitless, amount_due=1000, due_date=due_date)
+
+        report = self.generate(due_date)
+        self.assertEqual(report, {"due_date": "2025-03-05", "created": 1, "skipped": 2, "conflicted": 0})
+        self.assertEqual(MonthlyBill.objects.filter(user=unitless).count(), 1)
+        self.assertEqual(self.generate(due_date)["skipped"], 3)
+
+    def test_bills_created_meanwhile_are_conflicted(self):
+        racer = self.assign("racer", 5)
+        self.assign("other", 5)
+        due_date = date(2025, 3, 5)
+
+        def insert_after_a_concurrent_worker(bills):
+            # Another worker inserts the same bill between selection and insert
+            unit = racer.assigned_unit.get().unit_id
+            MonthlyBill.objects.create(user=racer, unit=unit, amount_due=1000, due_date=due_date)
+            return insert_bills(bills)
+
+        with mock.patch.object(services, "insert_bills", insert_after_a_concurrent_worker):
+            report = self.generate(due_date)
+        self.assertEqual((report["created"], report["skipped"], report["conflicted"]), (1, 0, 1))
+        self.assertEqual(MonthlyBill.objects.filter(user=racer).count(), 1)
+
+
+class BillingRollupSignalTests(APITestCase):
+    """The per-bill signals keep the rollup equal to a full recompute."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.unit_a = Unit.objects.create(unit_name="Unit 1", building="A", rent_amount=1000)
+        self.unit_b = Unit.objects.create(unit_name="Unit 2", building="B", rent_amount=1000)
+
+    def add_bill(self, due_date, unit=None, amount="1000.00"):
+        return MonthlyBill.objects.create(user=self.resident, unit=unit, amount_due=Decimal(amount), due_date=due_date)
+
+    def assertRollupIsCurrent(self):
+        fields = ["year", "month", "building", "unit_id", "payment_status", "amount_total", "bill_count", "overdue_count"]
+        incremental = sorted(BillingRollup.objects.values_list(*fields))
+        refresh_billing_rollup()
+        self.assertEqual(incremental, sorted(BillingRollup.objects.values_list(*fields)))
+
+    def test_incremental_updates_match_refresh(self):
+        overdue = self.add_bill(date(2025, 1, 5), self.unit_a)
+        upcoming = self.add_bill(date.today() + timedelta(days=20), self.unit_a, "1500.00")
+        unitless = self.add_bill(date(2025, 1, 20), amount="250.00")
+        self.add_bill(date(2025, 1, 6), self.unit_b)
+        self.assertRollupIsCurrent()
+
+        overdue.payment_status = MonthlyBill.PaymentStatus.PAID
+        overdue.save()
+        upcoming.amount_due = Decimal("1750.00")
+        upcoming.save()
+        self.assertRollupIsCurrent()
+
+        # A stale instance moves what the database holds, not what it remembers
+        stale = MonthlyBill.objects.get(pk=overdue.pk)
+        fresh = MonthlyBill.objects.get(pk=overdue.pk)
+        fresh.payment_status = MonthlyBill.PaymentStatus.PENDING
+        fresh.save()
+        stale.unit = self.unit_b
+        stale.save()
+        unitless.unit = self.unit_a
+        unitless.save()
+        self.assertRollupIsCurrent()
+
+        upcoming.due_date = date(2025, 2, 5)
+        upcoming.save()
+        self.assertRollupIsCurrent()
+
+        overdue.delete()
+        upcoming.delete()
+        self.assertRollupIsCurrent()
+        MonthlyBill.objects.filter(unit=self.unit_b).delete()
+        self.assertRollupIsCurrent()
+
+    def test_unit_less_rows_are_unique(self):
+        def atomic_after_a_concurrent_save(*args, **kwargs):
+            # Another worker's first save of the same key commits between the
+            # rollup's update (which found no row) and its insert
+            BillingRollup.objects.create(
+                year=2025, month=1, unit=None, payment_status="pending", amount_total=Decimal("500.00"), bill_count=1,
+            )
+            return transaction.atomic(*args, **kwargs)
+
+        with mock.patch("bills.rollup.transaction") as rollup_transaction:
+            rollup_transaction.atomic.side_effect = atomic_after_a_concurrent_save
+            self.add_bill(date(2025, 1, 5))
+        self.assertEqual(
+            list(BillingRollup.objects.filter(unit=None).values_list("amount_total", "bill_count")),
+            [(Decimal("1500.00"), 2)],
+        )
+
+    def test_rows_follow_the_building_of_their_unit(self):
+        self.add_bill(date(2025, 1, 5), self.unit_a)
+        self.unit_a.building = "C"
+        self.unit_a.save()
+        self.assertEqual(list(BillingRollup.objects.values_list("building", flat=True)), ["C"])
+        self.assertRollupIsCurrent()
+        self.assertFalse(BillingRollup.objects.filter(bill_count__lte=0).exists())
+
+
+class TransitionDueStatusesTests(APITestCase):
+    """The daily job moves only the bills whose due status changes, and refreshes what they feed."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.unit = Unit.objects.create(unit_name="Unit 1", building="A", rent_amount=1000)
+        # Ahead of the real date, so save() marks every bill upcoming
+        self.today = date.today() + timedelta(days=60)
+        self.bills = {days: self.add_bill(self.today + timedelta(days=days)) for days in (-3, 0, 1, 10)}
+        self.paid = self.add_bill(self.today - timedelta(days=40))
+        MonthlyBill.objects.filter(pk=self.paid.pk).update(payment_status=MonthlyBill.PaymentStatus.PAID)
+
+    def add_bill(self, due_date):
+        return MonthlyBill.objects.create(user=self.resident, unit=self.unit, amount_due=Decimal("1000.00"), due_date=due_date)
+
+    def statuses(self):
+        return {days: MonthlyBill.objects.get(pk=bill.pk).due_status for days, bill in self.bills.items()}
+
+    def rollup(self):
+        return sorted(BillingRollup.objects.values_list("year", "month", "payment_status", "bill_count", "overdue_count"))
+
+    def test_each_transition(self):
+        report = transition_due_statuses(today=self.today)
+        self.assertEqual(report, {"due_today": 1, "overdue": 1, "done": 1})
+        self.assertEqual(self.statuses(), {-3: "overdue", 0: "due_today", 1: "upcoming", 10: "upcoming"})
+        self.assertEqual(MonthlyBill.objects.get(pk=self.paid.pk).due_status, "done")
+
+        # Nothing left to move on a second run of the day
+        self.assertEqual(transition_due_statuses(today=self.today), {"due_today": 0, "overdue": 0, "done": 0})
+
+    def test_missed_days_are_caught_up(self):
+        transition_due_statuses(today=self.today)
+        # No run for five days: the bill that was due today and the one due
+        # meanwhile both become overdue, without passing through due_today
+        report = transition_due_statuses(today=self.today + timedelta(days=5))
+        self.assertEqual(report, {"due_today": 0, "overdue": 2, "done": 0})
+        self.assertEqual(self.statuses(), {-3: "overdue", 0: "overdue", 1: "overdue", 10: "upcoming"})
+
+    def test_rollup_and_aging_of_touched_months_are_refreshed(self):
+        later = self.today + timedelta(days=5)
+        transition_due_statuses(today=later)
+        rollup = self.rollup()
+        refresh_billing_rollup()
+        self.assertEqual(rollup, self.rollup())
+        self.assertEqual(sum(row[4] for row in rollup), 3)
+
+        # Only the months of the moved bills are recomputed
+        untouched = (self.today + timedelta(days=10)).replace(day=1) + timedelta(days=62)
+        self.add_bill(untouched)
+        BillingRollup.objects.filter(year=untouched.year, month=untouched.month).update(overdue_count=99)
+        transition_due_statuses(today=self.today + timedelta(days=10))
+        self.assertEqual(
+            BillingRollup.objects.get(year=untouched.year, month=untouched.month).overdue_count, 99,
+        )
+
+        aging = ReceivableAging.objects.get(user=self.resident)
+        self.assertEqual(aging.as_of, self.today + timedelta(days=10))
+        self.assertEqual((aging.bill_count, aging.total), (4, Decimal("4000.00")))
+
+
+@override_settings(
+    CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}},
+    BILL_NOTIFICATION_DEBOUNCE_SECONDS=5,
+    BILL_NOTIFICATION_MAX_DELAY_SECONDS=60,
+)
+class FlushBillNotificationsTests(APITestCase):
+    """The notification outbox is flushed once changes settle, and keeps what it couldn't send."""
+
+    def setUp(self):
+        self.layer = get_channel_layer()
+        self.channels = {}
+
+    def queue(self, name, queued_ago, changed_ago):
+        user = CustomUser.objects.create(username=name, role="resident")
+        current = now()
+        BillNotification.objects.create(
+            user=user, queued_at=current - timedelta(seconds=queued_ago), changed_at=current - timedelta(seconds=changed_ago),
+        )
+        self.channels[user.pk] = async_to_sync(self.layer.new_channel)()
+        async_to_sync(self.layer.group_add)(f"user_{user.pk}", self.channels[user.pk])
+        return user
+
+    def received(self, user):
+        return async_to_sync(self.layer.receive)(self.channels[user.pk])
+
+    def queued(self):
+        return set(BillNotification.objects.values_list("user__username", flat=True))
+
+    def test_debounce_and_max_delay(self):
+        settled = self.queue("settled", queued_ago=10, changed_ago=10)
+        self.queue("busy", queued_ago=30, changed_ago=1)
+        overdue = self.queue("waited-too-long", queued_ago=90, changed_ago=1)
+        MonthlyBill.objects.create(user=settled, amount_due=Decimal("1000.00"), due_date=date(2025, 1, 5))
+        BillNotification.objects.filter(user=settled).update(changed_at=now() - timedelta(seconds=10))
+
+        self.assertEqual(flush_bill_notifications(), {"sent": 2})
+        self.assertEqual(self.queued(), {"busy"})
+        self.assertEqual(self.received(settled), {"type": "send_request_notification", "count": 1})
+        self.assertEqual(self.received(overdue)["count"], 0)
+
+    def test_rows_queued_again_during_the_flush_are_kept(self):
+        user = self.queue("resident", queued_ago=10, changed_ago=10)
+        send = self.layer.group_send
+
+        async def send_and_change(group, message):
+            await send(group, message)
+            # A bill changes while the flush is running
+            await BillNotification.objects.filter(user=user).aupdate(changed_at=now() + timedelta(seconds=1))
+
+        with mock.patch.object(self.layer, "group_send", send_and_change):
+            self.assertEqual(flush_bill_notifications(), {"sent": 1})
+        self.assertEqual(self.queued(), {"resident"})
+
+    def test_unsent_rows_are_kept_when_the_channel_layer_fails(self):
+        self.queue("first", queued_ago=10, changed_ago=10)
+        self.queue("second", queued_ago=10, changed_ago=10)
+        sent = []
+        send = self.layer.group_send
+
+        async def send_once(group, message):
+            if sent:
+                raise ConnectionError("Redis is down")
+            await send(group, message)
+            sent.append(int(group.removeprefix("user_")))
+
+        with mock.patch.object(self.layer, "group_send", send_once):
+            self.assertEqual(flush_bill_notifications(), {"sent": 1})
+        self.assertEqual(len(self.queued()), 1)
+        self.assertFalse(BillNotification.objects.filter(user_id__in=sent).exists())
+
+        self.assertEqual(flush_bill_notifications(), {"sent": 1})
+        self.assertEqual(self.queued(), set())
+
+
+class InsertBillsTests(APITestCase):
+    """The unique constraint, not a pre-check, keeps bills from being duplicated."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.unit = Unit.objects.create(unit_name="Unit 1", building="A", rent_amount=1000)
+
+    def bill(self, due_date):
+        return MonthlyBill(user=self.resident, unit=self.unit, amount_due=Decimal("1000.00"), due_date=due_date)
+
+    def test_conflicting_bills_are_skipped(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(insert_bills([self.bill(date(2025, 1, 5)), self.bill(date(2025, 2, 5))])), 2)
+        self.assertEqual(sum(query["sql"].startswith("INSERT") for query in queries), 1)
+
+        inserted = insert_bills([self.bill(date(2025, 2, 5)), self.bill(date(2025, 3, 5))])
+        self.assertEqual([bill.due_date for bill in inserted], [date(2025, 3, 5)])
+        self.assertIsNotNone(inserted[0].pk)
+        self.assertEqual(MonthlyBill.objects.count(), 3)
+
+
+class ExportJobTests(APITestCase):
+    """Background exports: per-requester dedup, polling, download states and purge."""
+
+    def setUp(self):
+        # The file field resolves its storage once at import, so swap it directly
+        storage_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(storage_dir.cleanup)
+        field = ExportJob._meta.get_field("file")
+        self.addCleanup(setattr, field, "storage", field.storage)
+        field.storage = FileSystemStorage(location=storage_dir.name)
+
+        self.admin = CustomUser.objects.create(username="admin", role="admin")
+        self.employee = CustomUser.objects.create(username="employee", role="employee")
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.neighbour = CustomUser.objects.create(username="neighbour", role="resident")
+        unit = Unit.objects.create(unit_name="Unit 1", building="A", rent_amount=1000)
+        MonthlyBill.objects.create(
+            user=self.resident, unit=unit, amount_due=Decimal("1000.00"), due_date=date(2025, 3, 5),
+            payment_status=MonthlyBill.PaymentStatus.PAID,
+        )
+
+    def request_export(self, user, params=None):
+        self.client.force_authenticate(user)
+        return self.client.post(reverse("export-job-create"), {
+            "kind": "financial_report", "params": params or {"period": "monthly", "year": 2025, "month": 3},
+        }, format="json")
+
+    def get(self, user, name, job_id):
+        self.client.force_authenticate(user)
+        return self.client.get(reverse(name, args=[job_id]))
+
+    def test_identical_requests_share_a_job_within_a_scope(self):
+        created = self.request_export(self.resident)
+        self.assertEqual(created.status_code, 201)
+        job_id = created.json()["id"]
+        self.assertEqual(self.request_export(self.resident).json()["id"], job_id)
+        self.assertEqual(self.request_export(self.resident).status_code, 200)
+
+        # Another resident gets their own job, which they can poll
+        other = self.request_export(self.neighbour)
+        self.assertEqual(other.status_code, 201)
+        self.assertNotEqual(other.json()["id"], job_id)
+        self.assertEqual(self.get(self.neighbour, "export-job-detail", other.json()["id"]).status_code, 200)
+        self.assertEqual(self.get(self.neighbour, "export-job-detail", job_id).status_code, 404)
+
+        # Staff share one scope
+        staff_job = self.request_export(self.admin).json()["id"]
+        self.assertEqual(self.request_export(self.employee).json()["id"], staff_job)
+        self.assertEqual(self.get(self.admin, "export-job-detail", job_id).status_code, 200)
+
+    def test_invalid_params(self):
+        response = self.request_export(self.resident, {"period": "weekly"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_poll_and_download(self):
+        job_id = self.request_export(self.resident).json()["id"]
+        self.assertEqual(self.get(self.resident, "export-job-detail", job_id).json()["status"], "queued")
+        self.assertEqual(self.get(self.resident, "export-job-download", job_id).status_code, 409)
+
+        exports.run_export_job(job_id)
+        job = self.get(self.resident, "export-job-detail", job_id).json()
+        self.assertEqual((job["status"], job["progress"]), ("done", 100))
+        self.assertIsNotNone(job["download_url"])
+
+        response = self.get(self.resident, "export-job-download", job_id)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content))
+        self.assertEqual(self.get(self.neighbour, "export-job-download", job_id).status_code, 404)
+
+        # A finished job no longer deduplicates
+        self.assertEqual(self.request_export(self.resident).status_code, 201)
+
+        ExportJob.objects.filter(pk=job_id).update(expires_at=now() - timedelta(seconds=1))
+        self.assertEqual(self.get(self.resident, "export-job-download", job_id).status_code, 410)
+
+    def test_user_financial_report(self):
+        job, _ = exports.create_export_job("user_financial_report", {"user_id": self.resident.pk, "year": 2025})
+        self.assertEqual(exports.run_export_job(job.pk), ExportJob.Status.DONE)
+        job.refresh_from_db()
+        with job.file.open("rb") as artifact:
+            content = artifact.read().decode()
+        self.assertIn(f"User ID: {self.resident.pk}", content)
+        self.assertIn("Unit 1", content)
+
+        missing, _ = exports.create_export_job("user_financial_report", {"user_id": 999, "year": 2025})
+        self.assertEqual(exports.run_export_job(missing.pk), ExportJob.Status.FAILED)
+        missing.refresh_from_db()
+        self.assertEqual(missing.error, "User not found")
+
+    def test_losing_the_create_race_to_a_finished_job(self):
+        params = {"period": "monthly", "year": 2025, "month": 3}
+        finished, _ = exports.create_export_job("financial_report", params, self.resident)
+        ExportJob.objects.filter(pk=finished.pk).update(status=ExportJob.Status.DONE)
+        create = ExportJob.objects.create
+        races = []
+
+        def lose_race(**kwargs):
+            # A competing request inserted the same export and finished it
+            # before this one could read it back
+            if len(races) < self.races:
+                races.append(kwargs)
+                raise IntegrityError("unique_active_export_job")
+            return create(**kwargs)
+
+        with mock.patch.object(ExportJob.objects, "create", side_effect=lose_race):
+            self.races = 1
+            job, created = exports.create_export_job("financial_report", params, self.resident)
+            self.assertTrue(created)
+            self.assertNotEqual(job.pk, finished.pk)
+
+            # Losing every attempt hands back the latest job of the export
+            ExportJob.objects.filter(pk=job.pk).update(status=ExportJob.Status.DONE)
+            self.races = len(races) + 2
+            self.assertEqual(exports.create_export_job("financial_report", params, self.resident), (job, False))
+
+    def test_purge_removes_expired_jobs_and_files(self):
+        job_id = self.request_export(self.resident).json()["id"]
+        exports.run_export_job(job_id)
+        job = ExportJob.objects.get(pk=job_id)
+        storage, name = job.file.storage, job.file.name
+        self.assertTrue(storage.exists(name))
+
+        stale = ExportJob.objects.create(kind="financial_report", params_hash="stale", scope="staff")
+        ExportJob.objects.filter(pk=stale.pk).update(created_at=now() - timedelta(days=2))
+        ExportJob.objects.filter(pk=job_id).update(expires_at=now() - timedelta(seconds=1))
+
+        self.assertEqual(exports.purge_expired_exports(), {"purged": 1, "timed_out": 1})
+        self.assertFalse(ExportJob.objects.filter(pk=job_id).exists())
+        self.assertFalse(storage.exists(name))
+        self.assertEqual(ExportJob.objects.get(pk=stale.pk).status, ExportJob.Status.FAILED)
@@ -7,6 +7,8 @@ from .views import (
     UnitStatusSummaryView, 
     MonthlyBillListView,
     OverdueUserSummaryView,
+    ReceivableAgingView,
+    ReceivableAgingBuildingView,
     UserYearlyBillSummaryView,
     UserYearlyPaymentBreakdownView,
     FinancialReportsView,
@@ -18,7 +20,10 @@ from .views import (
     PaidBillsFilterOptionsView,
     ExpenseReflectionAPIView,
     YearlyExpenseAPIView,
-    MonthlyExpenseAPIView
+    MonthlyExpenseAPIView,
+    ExportJobCreateView,
+    ExportJobDetailView,
+    ExportJobDownloadView
     )
 
 urlpatterns = [
@@ -30,6 +35,8 @@ urlpatterns = [
     path('bills/summary/', MonthlyBillSummaryView.as_view(), name='bill-summary'),
     path('unit-status-summary/', UnitStatusSummaryView.as_view(), name='unit-status-summary'),
     path('overdues/', OverdueUserSummaryView.as_view(), name='overdues-accounts'),
+    path('bills/aging/', ReceivableAgingView.as_view(), name='receivable-aging'),
+    path('bills/aging/buildings/', ReceivableAgingBuildingView.as_view(), name='receivable-aging-buildings'),
     path('bills/yearly-summary/<int:user_id>/', UserYearlyPaymentBreakdownView.as_view()),
     # path('bills/financial-reports/', FinancialReportsView.as_view(), name='financial-reports'),
     path('bills/financial-reports/export/', FinancialReportExportView.as_view(), name='financial-reports-export'),
@@ -42,6 +49,11 @@ urlpatterns = [
     path('bills/export/paid-bills/excel/', PaidBillsExcelExportView.as_view(), name='export-paid-bills-excel'),
     path('bills/export/paid-bills/options/', PaidBillsFilterOptionsView.as_view(), name='paid-bills-options'),
 
+    # Background report exports
+    path('bills/exports/', ExportJobCreateView.as_view(), name='export-job-create'),
+    path('bills/exports/<int:pk>/', ExportJobDetailView.as_view(), name='export-job-detail'),
+    path('bills/exports/<int:pk>/download/', ExportJobDownloadView.as_view(), name='export-job-download'),
+
     path('bills/expense-reflection/', ExpenseReflectionAPIView.as_view(), name='expense-reflection'),
     path('bills/expense-reflection/yearly/', YearlyExpenseAPIView.as_view(), name='yearly-expense'),
     path('bills/expense-reflection/monthly/<int:year>/', MonthlyExpenseAPIView.as_view(), name='monthly-expense'),
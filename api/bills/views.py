@@ -1,14 +1,24 @@
 from rest_framework import generics, filters, status
 from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.pagination import PageNumberPagination
 from datetime import datetime, date
-from .models import MonthlyBill
+from .models import MonthlyBill, BillingRollup, ExportJob, ReceivableAging
 from units.models import AssignedUnit, Unit
 from rest_framework.views import APIView
 from django.db.models import Sum, Count
-from django.db import models
-from django.http import HttpResponse
-from .serializers import MonthlyBillSerializer
-from decimal import Decimal
+from django.db import models, transaction
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse, FileResponse
+from .serializers import MonthlyBillSerializer, ExportJobSerializer, ReceivableAgingSerializer
+from .aging import AGING_BUCKETS
+from api.mixins import EagerLoadingViewMixin, SparseFieldsViewMixin
+from api.projection import RowProjectionMixin
+from api.streaming import StreamingListMixin
+from . import exports
+from .reports import BillReport, QUARTERS, user_monthly_report, user_yearly_report
+from payments.ledger import account_totals
+from decimal import Decimal, InvalidOperation
 from rest_framework.response import Response
 import calendar
 from django.db.models import Avg
@@ -18,9 +28,11 @@ from django_filters.rest_framework import DjangoFilterBackend
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl import Workbook
 import io
+import tempfile
 
 
-class MonthlyBillListCreateView(generics.ListCreateAPIView):
+class MonthlyBillListCreateView(SparseFieldsViewMixin, EagerLoadingViewMixin, generics.ListCreateAPIView):
+    queryset = MonthlyBill.objects.all().order_by("-due_date")  # ✅ show all bills, newest first
     serializer_class = MonthlyBillSerializer
     permission_classes = [AllowAny]   # ✅ anyone can access
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -37,10 +49,7 @@ class MonthlyBillListCreateView(generics.ListCreateAPIView):
         "due_status"]
     ordering_fields = ['due_date', 'amount_due', 'unit__building']
     ordering = ['-due_date']  # default order
-
-    def get_queryset(self):
-        # ✅ show all bills, newest first
-        return MonthlyBill.objects.all().order_by("-due_date")
+    keyset_ordering = ('-due_date', '-id')  # ?pagination=keyset (see api.pagination)
 
     def perform_create(self, serializer):
         user_id = self.request.data.get("user_id")
@@ -65,7 +74,7 @@ class MonthlyBillListCreateView(generics.ListCreateAPIView):
             raise ValueError("A user must be specified to create a bill.")
 
 
-class MonthlyBillListView(generics.ListAPIView):
+class MonthlyBillListView(StreamingListMixin, RowProjectionMixin, SparseFieldsViewMixin, EagerLoadingViewMixin, generics.ListAPIView):
     queryset = MonthlyBill.objects.all().order_by('-due_date')
     serializer_class = MonthlyBillSerializer
     permission_classes = [IsAuthenticated]  # ✅ only authenticated users
@@ -83,18 +92,16 @@ class MonthlyBillListView(generics.ListAPIView):
     ordering_fields = ['due_date', 'amount_due']
     ordering = ['-due_date']  # default order
     pagination_class = None  # ✅ no pagination
+    row_projection = True  # ✅ values()-based serialization (api.projection)
 
 
-class MonthlyBillDetailView(generics.RetrieveUpdateDestroyAPIView):
+class MonthlyBillDetailView(EagerLoadingViewMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = MonthlyBill.objects.all()  # ✅ show all bills
     serializer_class = MonthlyBillSerializer
     permission_classes = [AllowAny]   # ✅ anyone can access
     filter_backends = [filters.SearchFilter]
     search_fields = ["due_date", "payment_status", "due_status"]
 
-    def get_queryset(self):
-        # ✅ show all bills
-        return MonthlyBill.objects.all()
-
 
 # class MonthlyBillStatsView(APIView):
 #     permission_classes = [AllowAny]
@@ -153,18 +160,22 @@ class MonthlyBillSummaryView(APIView):
         current_month = today.month
         current_year = today.year
 
-        # ✅ Filter all bills for this month & year
-        bills_this_month = MonthlyBill.objects.filter(
-            due_date__year=current_year,
-            due_date__month=current_month
+        # ✅ Read this month's totals from the billing rollup
+        totals = BillingRollup.objects.filter(
+            year=current_year,
+            month=current_month
+        ).aggregate(
+            total_due=Sum('amount_total', filter=models.Q(payment_status='pending')),
+            total_collected=Sum('amount_total', filter=models.Q(payment_status='paid')),
+            total_overdue=Sum('overdue_count'),
         )
 
         # ✅ Calculate totals
-        total_due = bills_this_month.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or 0
-        total_collected = bills_this_month.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or 0
-        total_overdue = bills_this_month.filter(due_status='overdue').count()
-        all_overdue_bills = MonthlyBill.objects.filter(due_status='overdue').count()
-        total_pending = bills_this_month.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total']  or 0
+        total_due = totals['total_due'] or 0
+        total_collected = totals['total_collected'] or 0
+        total_overdue = totals['total_overdue'] or 0
+        all_overdue_bills = BillingRollup.objects.aggregate(total=Sum('overdue_count'))['total'] or 0
+        total_pending = total_due
 
         # ✅ Prepare response
         data = {
@@ -194,17 +205,16 @@ class MonthlyBillStatsView(APIView):
         ]
         """
 
-        # ✅ Annotate each bill with year and month
+        # ✅ Monthly totals from the billing rollup
         bills = (
-            MonthlyBill.objects
-            .annotate(year=ExtractYear('due_date'), month=ExtractMonth('due_date'))
+            BillingRollup.objects
             .values('year', 'month')
             .annotate(
-                paid_count=Count('id', filter=models.Q(payment_status='paid')),
-                pending_count=Count('id', filter=models.Q(payment_status='pending')),
-                overdue_count=Count('id', filter=models.Q(due_status='overdue')),
-                total_paid=Sum('amount_due', filter=models.Q(payment_status='paid')),
-                total_pending=Sum('amount_due', filter=models.Q(payment_status='pending')),
+                paid_count=Sum('bill_count', filter=models.Q(payment_status='paid')),
+                pending_count=Sum('bill_count', filter=models.Q(payment_status='pending')),
+                overdue_count=Sum('overdue_count'),
+                total_paid=Sum('amount_total', filter=models.Q(payment_status='paid')),
+                total_pending=Sum('amount_total', filter=models.Q(payment_status='pending')),
             )
             .order_by('year', 'month')
         )
@@ -214,9 +224,9 @@ class MonthlyBillStatsView(APIView):
             {
                 "year": item["year"],
                 "month": calendar.month_name[item["month"]],
-                "paid_count": item["paid_count"],
-                "pending_count": item["pending_count"],
-                "overdue_count": item["overdue_count"],
+                "paid_count": item["paid_count"] or 0,
+                "pending_count": item["pending_count"] or 0,
+                "overdue_count": item["overdue_count"] or 0,
                 "total_paid": item["total_paid"] or 0,
                 "total_pending": item["total_pending"] or 0,
             }
@@ -226,9 +236,20 @@ class MonthlyBillStatsView(APIView):
         return Response(formatted_data)
     
 
+class OverdueSummaryPagination(PageNumberPagination):
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
 class OverdueUserSummaryView(APIView):
     permission_classes = [IsAuthenticated]
 
+    # ?ordering= values and the columns they sort on
+    ORDERING_FIELDS = {
+        "totalAmountDue": ["total_amount_due"],
+        "user": ["user__first_name", "user__last_name", "user__username"],
+    }
+
     def get(self, request):
         """
         Returns a summary of all users with overdue bills:
@@ -237,15 +258,27 @@ class OverdueUserSummaryView(APIView):
             "user": "Eimann Calderon",
             "unit": ["Unit 201", "Unit 202"],
             "totalAmountDue": 4200.00,
-            "monthsDue": ["September", "October"]
+            "monthsDue": ["September", "October"],
+            "outstandingBalance": 4200.00,
+            "totalPaid": 36000.00
           },
           {
             "user": "Daniel Paddilla",
             "unit": ["Unit 101", "Unit 102"],
             "totalAmountDue": 60000.00,
-            "monthsDue": ["September", "October"]
+            "monthsDue": ["September", "October"],
+            "outstandingBalance": 72000.00,
+            "totalPaid": 120000.00
           }
         ]
+
+        totalAmountDue sums the overdue bills; outstandingBalance (everything
+        owed, net of advance credit) and totalPaid are read from the residents'
+        ledger accounts.
+
+        Query Parameters:
+        - ordering: 'totalAmountDue' or 'user', '-' prefix for descending (default: '-totalAmountDue')
+        - page / page_size: optional; when either is given, the response is paginated
         """
 
         # ✅ Restrict to admin/employee only
@@ -255,51 +288,138 @@ class OverdueUserSummaryView(APIView):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        # ✅ Get all overdue bills
+        # ✅ One row per delinquent resident: name and overdue total, grouped in the database
+        ordering = request.query_params.get("ordering", "-totalAmountDue")
+        if ordering.lstrip("-") not in self.ORDERING_FIELDS:
+            return Response(
+                {"error": f"Invalid ordering. Use one of: {', '.join(self.ORDERING_FIELDS)} (prefix with '-' for descending)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        descending = ordering.startswith("-")
+        order_fields = [
+            f"-{field}" if descending else field
+            for field in self.ORDERING_FIELDS[ordering.lstrip("-")]
+        ]
+
         overdue_bills = MonthlyBill.objects.filter(due_status="overdue")
+        user_totals = (
+            overdue_bills
+            .values("user_id", "user__first_name", "user__last_name", "user__username")
+            .annotate(total_amount_due=Sum("amount_due"))
+            .order_by(*order_fields, "user_id")
+        )
 
-        if not overdue_bills.exists():
-            return Response([], status=status.HTTP_200_OK)
+        # ✅ Paginate only when a page or page size is requested (?page=1&page_size=20)
+        paginator = None
+        if "page" in request.query_params or "page_size" in request.query_params:
+            paginator = OverdueSummaryPagination()
+            user_totals = paginator.paginate_queryset(user_totals, request, view=self)
+        else:
+            user_totals = list(user_totals)
+
+        # ✅ Units and months of every listed resident in a single query
+        details = (
+            overdue_bills
+            .filter(user_id__in=[row["user_id"] for row in user_totals])
+            .annotate(month=ExtractMonth("due_date"))
+            .values_list("user_id", "unit__unit_name", "month")
+            .distinct()
+            .order_by("user_id", "month")
+        )
+        units_by_user, months_by_user = {}, {}
+        for user_id, unit_name, month in details:
+            units = units_by_user.setdefault(user_id, [])
+            if unit_name not in units:
+                units.append(unit_name)
+            months = months_by_user.setdefault(user_id, [])
+            if month not in months:
+                months.append(month)
+
+        # ✅ Balances are single-row reads of the ledger accounts, not bill aggregates
+        ledger = account_totals(row["user_id"] for row in user_totals)
 
-        # ✅ Group by user
         user_summaries = []
-
-        # Get all unique users who have overdue bills
-        users = overdue_bills.values_list("user", flat=True).distinct()
-
-        for user_id in users:
-            user_bills = overdue_bills.filter(user_id=user_id)
-            user = user_bills.first().user
-
+        for row in user_totals:
             # ✅ Get user full name or fallback to username
-            user_name = f"{user.first_name} {user.last_name}".strip() or user.username
-
-            # ✅ Get all unique units for this user
-            units = list(user_bills.values_list("unit__unit_name", flat=True).distinct())
-
-            # ✅ Calculate total overdue amount
-            total_amount_due = (
-                user_bills.aggregate(total=Sum("amount_due"))["total"] or 0
-            )
-
-            # ✅ Get months of overdue bills
-            months = list(
-                user_bills.annotate(month=ExtractMonth("due_date"))
-                .values_list("month", flat=True)
-                .distinct()
-            )
-            months_due = [calendar.month_name[m] for m in months]
+            user_name = f"{row['user__first_name']} {row['user__last_name']}".strip() or row["user__username"]
 
             user_summaries.append({
                 "user": user_name,
-                "unit": units,
-                "totalAmountDue": round(total_amount_due, 2),
-                "monthsDue": months_due,
+                "unit": units_by_user.get(row["user_id"], []),
+                "totalAmountDue": round(row["total_amount_due"] or 0, 2),
+                "monthsDue": [calendar.month_name[m] for m in months_by_user.get(row["user_id"], [])],
+                "outstandingBalance": round(ledger.get(row["user_id"], {}).get("balance") or 0, 2),
+                "totalPaid": round(ledger.get(row["user_id"], {}).get("total_paid") or 0, 2),
             })
 
+        if paginator is not None:
+            return paginator.get_paginated_response(user_summaries)
         return Response(user_summaries, status=status.HTTP_200_OK)
     
 
+class ReceivableAgingMixin:
+    permission_classes = [IsAuthenticated]
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # ✅ Restrict to admin/employee only
+        if request.user.role not in ["admin", "employee"]:
+            raise PermissionDenied("You are not authorized to view this data.")
+
+    def filter_aging(self, rows):
+        """Apply ``?building=`` and ``?min_amount=`` (total owed) to the aging rows."""
+        building = self.request.query_params.get("building")
+        if building is not None:
+            rows = rows.filter(building=building)
+        min_amount = self.request.query_params.get("min_amount")
+        if min_amount:
+            try:
+                rows = rows.filter(total__gte=Decimal(min_amount))
+            except InvalidOperation:
+                raise ValidationError({"min_amount": "Must be a number."})
+        return rows
+
+
+class ReceivableAgingView(ReceivableAgingMixin, EagerLoadingViewMixin, generics.ListAPIView):
+    """
+    Receivables aging per resident and building, largest balances first:
+    unpaid bills in 0-30 / 31-60 / 61-90 / 90+ days past due.
+
+    Read from the precomputed ``ReceivableAging`` rows (see ``bills.aging``).
+    Query Parameters:
+    - building: only this building
+    - min_amount: only rows owing at least this much in total
+    """
+    queryset = ReceivableAging.objects.order_by('-total', '-id')
+    serializer_class = ReceivableAgingSerializer
+    filter_backends = []  # filtered by filter_aging
+    keyset_ordering = ('-total', '-id')  # ?pagination=keyset (see api.pagination)
+
+    def get_queryset(self):
+        return self.filter_aging(super().get_queryset())
+
+
+class ReceivableAgingBuildingView(ReceivableAgingMixin, APIView):
+    def get(self, request):
+        """
+        Receivables aging totals per building, summed from the precomputed
+        per-resident rows. Accepts the same ``building`` / ``min_amount``
+        filters (min_amount applies to each resident's total).
+        """
+        totals = (
+            self.filter_aging(ReceivableAging.objects.all())
+            .values("building")
+            .annotate(
+                **{field: Sum(field) for field in AGING_BUCKETS},
+                total=Sum("total"),
+                bill_count=Sum("bill_count"),
+                residents=Count("user_id"),
+            )
+            .order_by("-total", "building")
+        )
+        return Response(list(totals), status=status.HTTP_200_OK)
+
+
 class UserYearlyBillSummaryView(APIView):
     permission_classes = [AllowAny]
 
@@ -317,50 +437,50 @@ class UserYearlyBillSummaryView(APIView):
         current_year = today.year
 
         try:
-            # Filter bills for this year and user
-            bills_this_year = MonthlyBill.objects.filter(
-                due_date__year=current_year,
-                user_id=user_id
-            )
+            # ✅ All figures come from one grouped query over this year's bills
+            report = BillReport.for_user(user_id, current_year)
+
+            # ✅ Main totals
+            total_paid = report.total(payment_status='paid') or 0
+            total_unpaid = report.total(payment_status='pending') or 0
 
-            # ✅ Main totals - using Q objects for better filtering
-            paid_bills = bills_this_year.filter(payment_status='paid')
-            pending_bills = bills_this_year.filter(payment_status='pending')
-            
-            total_paid = paid_bills.aggregate(total=Sum('amount_due'))['total'] or 0
-            total_unpaid = pending_bills.aggregate(total=Sum('amount_due'))['total'] or 0
-            
             # ✅ Counts
-            paid_bills_count = paid_bills.count()
-            unpaid_bills_count = pending_bills.count()
+            paid_bills_count = report.count(payment_status='paid')
+            unpaid_bills_count = report.count(payment_status='pending')
             total_bills = paid_bills_count + unpaid_bills_count
-            
+
             # ✅ Success rate
             payment_success_rate = round((paid_bills_count / total_bills * 100), 2) if total_bills > 0 else 0
 
             # ✅ Monthly breakdown - improved to handle months with no data
             monthly_data = []
             for month in range(1, 13):
-                month_bills = bills_this_year.filter(due_date__month=month)
-                month_paid = month_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or 0
-                month_unpaid = month_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or 0
+                month_paid = report.total(month=month, payment_status='paid') or 0
+                month_unpaid = report.total(month=month, payment_status='pending') or 0
                 month_total = month_paid + month_unpaid
-                
+
                 monthly_data.append({
                     "month": calendar.month_name[month],
                     "month_number": month,
                     "paid": round((month_paid), 2),
                     "unpaid": round((month_unpaid), 2),
                     "total": round((month_total), 2),
-                    "bills_count": month_bills.count()
+                    "bills_count": report.count(month=month)
                 })
 
             # ✅ Additional insights
             # Get unique units for this user in the current year
-            unique_units = bills_this_year.values('unit__unit_name', 'unit__building').distinct()
-            
+            unique_units = [
+                {'unit__unit_name': unit_name, 'unit__building': building}
+                for unit_name, building in report.group_by('unit__unit_name', 'unit__building')
+            ]
+
             # Get overdue bills count for the current year
-            overdue_bills_count = bills_this_year.filter(due_status='overdue').count()
+            overdue_bills_count = report.overdue_count()
+
+            # ✅ All-time balance and payments from the ledger accounts (the
+            # year's figures above come from the bills of the year)
+            ledger = account_totals([user_id]).get(int(user_id), {})
 
             data = {
                 "year": current_year,
@@ -374,7 +494,9 @@ class UserYearlyBillSummaryView(APIView):
                     "total_bills_count": total_bills,
                     "overdue_bills_count": overdue_bills_count,
                     "unique_units_count": len(unique_units),
-                    "unique_units": list(unique_units)
+                    "unique_units": list(unique_units),
+                    "outstanding_balance": round(ledger.get("balance") or 0, 2),
+                    "lifetime_total_paid": round(ledger.get("total_paid") or 0, 2),
                 },
                 "monthly_breakdown": monthly_data
             }
@@ -417,25 +539,18 @@ class UserYearlyPaymentBreakdownView(APIView):
             current_year = date.today().year
 
         try:
-            # Get all bills for the specified year
-            bills_this_year = MonthlyBill.objects.filter(
-                due_date__year=current_year,
-                user_id=user_id
-            )
+            # Get all bills for the specified year, grouped in a single query
+            bills_this_year = BillReport.for_user(user_id, current_year)
 
             # Get assigned units for this user to calculate additional charges
-            assigned_units = AssignedUnit.objects.filter(
+            assigned_units = list(AssignedUnit.objects.filter(
                 assigned_by_id=user_id,
                 deleted_at__isnull=True
-            ).select_related('unit_id')
+            ).select_related('unit_id'))
 
             # ✅ Calculate total amounts from bills - Convert to float for calculations
-            total_paid_result = bills_this_year.filter(payment_status='paid').aggregate(
-                total=Sum('amount_due')
-            )['total'] or Decimal('0.00')
-            total_unpaid_result = bills_this_year.filter(payment_status='pending').aggregate(
-                total=Sum('amount_due')
-            )['total'] or Decimal('0.00')
+            total_paid_result = bills_this_year.total(payment_status='paid') or Decimal('0.00')
+            total_unpaid_result = bills_this_year.total(payment_status='pending') or Decimal('0.00')
             
             total_paid = float(total_paid_result)
             total_unpaid = float(total_unpaid_result)
@@ -529,13 +644,9 @@ class UserYearlyPaymentBreakdownView(APIView):
                                 base_rent_ratio = monthly_rent / monthly_total_expected
                                 
                                 # Apply this ratio to actual bill amounts
-                                unit_total_paid = float(unit_bills.filter(payment_status='paid').aggregate(
-                                    total=Sum('amount_due')
-                                )['total'] or Decimal('0.00'))
-                                
-                                unit_total_unpaid = float(unit_bills.filter(payment_status='pending').aggregate(
-                                    total=Sum('amount_due')
-                                )['total'] or Decimal('0.00'))
+                                unit_total_paid = float(unit_bills.total(payment_status='paid') or Decimal('0.00'))
+
+                                unit_total_unpaid = float(unit_bills.total(payment_status='pending') or Decimal('0.00'))
                                 
                                 unit_total = unit_total_paid + unit_total_unpaid
                                 
@@ -574,11 +685,11 @@ class UserYearlyPaymentBreakdownView(APIView):
             # ✅ Monthly breakdown with percentages - ADJUSTED FOR ONE-MONTH DELAY
             monthly_breakdown = []
             for month in range(1, 13):
-                month_bills = bills_this_year.filter(due_date__month=month)
-                
+                month_bills = bills_this_year.filter(month=month)
+
                 # Convert all amounts to float to avoid Decimal/float operations
-                month_paid_result = month_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or Decimal('0.00')
-                month_unpaid_result = month_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or Decimal('0.00')
+                month_paid_result = month_bills.total(payment_status='paid') or Decimal('0.00')
+                month_unpaid_result = month_bills.total(payment_status='pending') or Decimal('0.00')
                 
                 month_paid = float(month_paid_result)
                 month_unpaid = float(month_unpaid_result)
@@ -590,7 +701,7 @@ class UserYearlyPaymentBreakdownView(APIView):
                 # Method 1: Use actual bill amounts if bills exist for this month
                 if month_bills.exists():
                     # If bills exist, use the sum of their amount_due as expected
-                    month_expected_result = month_bills.aggregate(total=Sum('amount_due'))['total'] or Decimal('0.00')
+                    month_expected_result = month_bills.total() or Decimal('0.00')
                     monthly_expected = float(month_expected_result)
                 else:
                     # Method 2: Calculate based on assigned units with ONE-MONTH DELAY
@@ -647,27 +758,30 @@ class UserYearlyPaymentBreakdownView(APIView):
 
             # ✅ Unit-wise breakdown (considering move-in date with ONE-MONTH DELAY)
             unit_breakdown = []
-            unique_units = bills_this_year.values('unit_id', 'unit__unit_name', 'unit__building').distinct()
-            
+            unique_units = bills_this_year.units()
+
             for unit_data in unique_units:
                 unit_bills = bills_this_year.filter(unit_id=unit_data['unit_id'])
-                
+
                 # Convert all amounts to float
-                unit_paid_result = unit_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or Decimal('0.00')
-                unit_unpaid_result = unit_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or Decimal('0.00')
+                unit_paid_result = unit_bills.total(payment_status='paid') or Decimal('0.00')
+                unit_unpaid_result = unit_bills.total(payment_status='pending') or Decimal('0.00')
                 
                 unit_paid = float(unit_paid_result)
                 unit_unpaid = float(unit_unpaid_result)
                 unit_total = unit_paid + unit_unpaid
                 
                 # Find assigned unit to get additional charges and move-in date
-                assigned_unit = assigned_units.filter(unit_id=unit_data['unit_id']).first()
+                assigned_unit = next(
+                    (assigned for assigned in assigned_units if assigned.unit_id_id == unit_data['unit_id']),
+                    None
+                )
                 unit_expected_yearly = 0.0
                 
                 # Calculate expected amount based on ACTUAL bills for this unit
                 if unit_bills.exists():
                     # Use actual bill amounts if bills exist
-                    unit_expected_result = unit_bills.aggregate(total=Sum('amount_due'))['total'] or Decimal('0.00')
+                    unit_expected_result = unit_bills.total() or Decimal('0.00')
                     unit_expected_yearly = float(unit_expected_result)
                 elif assigned_unit and assigned_unit.unit_id:
                     # Fall back to calculation based on assigned unit WITH ONE-MONTH DELAY
@@ -764,7 +878,7 @@ class UserYearlyPaymentBreakdownView(APIView):
                 "unit_breakdown": unit_breakdown,
                 "debug_info": {
                     "charge_amounts_used": CHARGE_AMOUNTS,
-                    "assigned_units_count": assigned_units.count(),
+                    "assigned_units_count": len(assigned_units),
                     "bills_count": bills_this_year.count(),
                     "original_expected_total": round(expected_yearly_total, 2),
                     "recalculated_expected_total": round(recalculated_expected_yearly_total, 2),
@@ -868,12 +982,12 @@ class FinancialReportsView(APIView):
             assigned_by_id=user_id,
             deleted_at__isnull=True,  # Only active assignments
         ).select_related('unit_id')
-        
-        return assigned_units
+
+        return list(assigned_units)
 
     def _get_months_with_charges(self, assigned_units, year):
         """Determine which months of the year charges should apply based on move-in date"""
-        if not assigned_units.exists():
+        if not assigned_units:
             return set()
         
         # Find the earliest move-in date among assigned units
@@ -939,20 +1053,15 @@ class FinancialReportsView(APIView):
         from calendar import month_name
         from django.contrib.auth import get_user_model
         from units.models import AssignedUnit, Unit
-        from django.db.models import Sum, Count
-        
-        # Get ALL bills for the specified user and year (all months, all statuses)
-        all_bills = MonthlyBill.objects.filter(
-            user_id=user_id,
-            due_date__year=year
-        ).select_related('user', 'unit')
+
+        # Get ALL bills for the specified user and year (all months, all statuses),
+        # grouped in a single query
+        all_bills = BillReport.for_user(user_id, year)
 
         # Get user info
+        User = get_user_model()
         try:
-            user = all_bills.first().user if all_bills.exists() else None
-            if not user:
-                User = get_user_model()
-                user = User.objects.get(id=user_id)
+            user = User.objects.get(id=user_id)
         except User.DoesNotExist:
             return Response(
                 {"error": "User not found"},
@@ -966,6 +1075,10 @@ class FinancialReportsView(APIView):
 
         user_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username
 
+        # All-time balance and payments from the ledger accounts (the yearly
+        # figures below come from the bills of the year)
+        ledger = account_totals([user.pk]).get(user.pk, {})
+
         # Get assigned units and determine months with charges
         assigned_units = self._get_assigned_units_for_period(user_id, year)
         months_with_charges = self._get_months_with_charges(assigned_units, year)
@@ -974,23 +1087,18 @@ class FinancialReportsView(APIView):
         base_charge_data = self._calculate_assigned_unit_charges(assigned_units, CHARGE_AMOUNTS)
         
         # Calculate total rent amount for the year from all bills
-        total_rent_result = all_bills.aggregate(total=Sum('amount_due'))
-        total_rent = self._safe_float(total_rent_result['total'])
+        total_rent = self._safe_float(all_bills.total())
         
         # Calculate monthly totals with accurate charges
         monthly_totals = []
         
         for month_num in range(1, 13):
-            month_bills = all_bills.filter(due_date__month=month_num)
-            
+            month_bills = all_bills.filter(month=month_num)
+
             # Calculate bill amounts
-            month_paid_result = month_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))
-            month_unpaid_result = month_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))
-            month_total_result = month_bills.aggregate(total=Sum('amount_due'))
-            
-            month_paid = self._safe_float(month_paid_result['total'])
-            month_unpaid = self._safe_float(month_unpaid_result['total'])
-            month_expected = self._safe_float(month_total_result['total'])
+            month_paid = self._safe_float(month_bills.total(payment_status='paid'))
+            month_unpaid = self._safe_float(month_bills.total(payment_status='pending'))
+            month_expected = self._safe_float(month_bills.total())
             
             # Determine if charges apply for this month
             if month_num in months_with_charges:
@@ -1028,20 +1136,13 @@ class FinancialReportsView(APIView):
             })
 
         # Calculate yearly totals
-        paid_bills = all_bills.filter(payment_status='paid')
-        unpaid_bills = all_bills.filter(payment_status='pending')
-        
-        total_paid_result = paid_bills.aggregate(total=Sum('amount_due'))
-        total_unpaid_result = unpaid_bills.aggregate(total=Sum('amount_due'))
-        total_expected_result = all_bills.aggregate(total=Sum('amount_due'))
-        
-        total_paid = self._safe_float(total_paid_result['total'])
-        total_unpaid = self._safe_float(total_unpaid_result['total'])
-        total_expected = self._safe_float(total_expected_result['total'])
-        
+        total_paid = self._safe_float(all_bills.total(payment_status='paid'))
+        total_unpaid = self._safe_float(all_bills.total(payment_status='pending'))
+        total_expected = self._safe_float(all_bills.total())
+
         total_bills = all_bills.count()
-        paid_bills_count = paid_bills.count()
-        unpaid_bills_count = unpaid_bills.count()
+        paid_bills_count = all_bills.count(payment_status='paid')
+        unpaid_bills_count = all_bills.count(payment_status='pending')
         
         average_payment = total_paid / paid_bills_count if paid_bills_count > 0 else 0
         
@@ -1081,7 +1182,7 @@ class FinancialReportsView(APIView):
         
         # Get move-in date for display
         move_in_date = None
-        if assigned_units.exists():
+        if assigned_units:
             # Find the earliest move-in date
             earliest_date = None
             for unit in assigned_units:
@@ -1110,6 +1211,8 @@ class FinancialReportsView(APIView):
                 "average_payment": self._safe_round(average_payment),
                 "payment_completion": f"{payment_completion_percentage}%",
                 "average_monthly_payment": self._safe_round(average_monthly_payment),
+                "outstanding_balance": self._safe_round(ledger.get('balance')),
+                "lifetime_total_paid": self._safe_round(ledger.get('total_paid')),
                 
                 # Expense charges summary
                 "security_fee": self._safe_round(monthly_security_fee),
@@ -1159,6 +1262,8 @@ class FinancialReportExportView(APIView):
         - year: specific year
         - month: specific month (for monthly)
         - format: 'csv' or 'pdf' (default: 'csv')
+
+        For large periods prefer the background export job API (bills/exports/).
         """
         period = request.GET.get('period', 'monthly')
         year = int(request.GET.get('year', date.today().year))
@@ -1166,14 +1271,7 @@ class FinancialReportExportView(APIView):
         export_format = request.GET.get('format', 'csv')
 
         # Get the financial report data
-        report_view = FinancialReportsView()
-        
-        if period == 'monthly':
-            response = report_view._get_monthly_report(year, month)
-        else:
-            response = report_view._get_yearly_report(year)
-
-        report_data = response.data
+        report_data = exports.financial_report_data(period, year, month)
 
         if export_format == 'csv':
             return self._export_to_csv(report_data, period, year, month)
@@ -1185,47 +1283,10 @@ class FinancialReportExportView(APIView):
 
     def _export_to_csv(self, report_data, period, year, month):
         """Export financial report to CSV format"""
-        import csv
-        from django.http import HttpResponse
-        
-        response = HttpResponse(content_type='text/csv')
-        
-        if period == 'monthly':
-            filename = f"financial_report_{year}_{month:02d}.csv"
-        else:
-            filename = f"financial_report_{year}.csv"
-            
+        response = HttpResponse(content_type=exports.CSV_CONTENT_TYPE)
+        filename = exports.financial_report_filename(period, year, month)
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-        writer = csv.writer(response)
-        
-        # Write header
-        writer.writerow(['Financial Report - Paid Bills Only'])
-        if period == 'monthly':
-            writer.writerow([f'Period: {report_data["month"]} {report_data["year"]}'])
-        else:
-            writer.writerow([f'Period: Year {report_data["year"]}'])
-        writer.writerow([])
-        
-        # Write summary
-        writer.writerow(['SUMMARY'])
-        writer.writerow(['Total Collected', f"₱{report_data['summary']['total_collected']:,.2f}"])
-        writer.writerow(['Total Bills', report_data['summary']['total_bills']])
-        writer.writerow(['Average Payment', f"₱{report_data['summary']['average_payment']:,.2f}"])
-        writer.writerow([])
-        
-        # Write user breakdown
-        writer.writerow(['USER BREAKDOWN'])
-        writer.writerow(['User', 'Total Paid', 'Bill Count', 'Percentage'])
-        for user in report_data['breakdowns']['by_user']:
-            writer.writerow([
-                user['user_name'],
-                f"₱{user['total_paid']:,.2f}",
-                user['bill_count'],
-                f"{user['percentage_of_total']}%"
-            ])
-        writer.writerow([])
-        
+        exports.write_financial_report_csv(report_data, period, response)
         return response
     
 
@@ -1272,350 +1333,25 @@ class FinancialReportView(APIView):
 
     def _get_user_monthly_report(self, user_id, year, month, breakdown):
         """Generate monthly financial report for a specific user (ALL bills, not just paid)"""
-        # Get ALL bills for the specified user, month and year (not just paid)
-        all_bills = MonthlyBill.objects.filter(
-            user_id=user_id,
-            due_date__year=year,
-            due_date__month=month
-        ).select_related('user', 'unit')
-
-        # Get user info
         try:
-            user = all_bills.first().user if all_bills.exists() else None
-            if not user:
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                user = User.objects.get(id=user_id)
-        except:
+            report = user_monthly_report(user_id, year, month, breakdown)
+        except get_user_model().DoesNotExist:
             return Response(
                 {"error": "User not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
-
-        user_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username
-
-        if not all_bills.exists():
-            return Response({
-                "report_type": "user_monthly",
-                "user_id": user_id,
-                "user_name": user_name,
-                "year": year,
-                "month": calendar.month_name[month],
-                "message": "No bills found for this period",
-                "summary": {
-                    "total_paid": 0,
-                    "total_unpaid": 0,
-                    "total_bills": 0,
-                    "average_payment": 0,
-                    "payment_completion": "0%"
-                }
-            }, status=status.HTTP_200_OK)
-
-        # Calculate totals - ALL bills, not just paid
-        total_paid = all_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or 0
-        total_unpaid = all_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or 0
-        total_expected = all_bills.aggregate(total=Sum('amount_due'))['total'] or 0
-        total_bills = all_bills.count()
-        
-        paid_bills_count = all_bills.filter(payment_status='paid').count()
-        unpaid_bills_count = all_bills.filter(payment_status='pending').count()
-        
-        average_payment = total_paid / paid_bills_count if paid_bills_count > 0 else 0
-        
-        # Calculate ACTUAL payment completion
-        if total_expected > 0:
-            payment_completion_percentage = round((total_paid / total_expected) * 100, 2)
-        else:
-            payment_completion_percentage = 0
-
-        # Basic response structure
-        response_data = {
-            "report_type": "user_monthly",
-            "user_id": user_id,
-            "user_name": user_name,
-            "user_email": user.email,
-            "year": year,
-            "month": calendar.month_name[month],
-            "summary": {
-                "total_paid": round((total_paid), 2),
-                "total_unpaid": round((total_unpaid), 2),
-                "total_expected": round((total_expected), 2),
-                "total_bills": total_bills,
-                "paid_bills_count": paid_bills_count,
-                "unpaid_bills_count": unpaid_bills_count,
-                "average_payment": round((average_payment), 2),
-                "payment_completion": f"{payment_completion_percentage}%",  # ACTUAL completion rate
-            }
-        }
-
-        # Add detailed breakdown if requested
-        if breakdown == 'detailed':
-            # Breakdown by unit (ALL bills)
-            unit_breakdown = all_bills.values(
-                'unit__unit_name', 
-                'unit__building',
-                'unit__rent_amount'
-            ).annotate(
-                total_paid=Sum('amount_due', filter=models.Q(payment_status='paid')),
-                total_unpaid=Sum('amount_due', filter=models.Q(payment_status='pending')),
-                total_expected=Sum('amount_due'),
-                bill_count=Count('id'),
-                paid_count=Count('id', filter=models.Q(payment_status='paid')),
-                unpaid_count=Count('id', filter=models.Q(payment_status='pending'))
-            ).order_by('-total_expected')
-
-            unit_breakdown_data = []
-            for unit_data in unit_breakdown:
-                unit_completion = round((unit_data['total_paid'] / unit_data['total_expected']) * 100, 2) if unit_data['total_expected'] > 0 else 0
-                
-                unit_breakdown_data.append({
-                    "unit_name": unit_data['unit__unit_name'],
-                    "building": unit_data['unit__building'],
-                    "rent_amount": (unit_data['unit__rent_amount']) if unit_data['unit__rent_amount'] else 0,
-                    "total_paid": round((unit_data['total_paid']), 2),
-                    "total_unpaid": round((unit_data['total_unpaid']), 2),
-                    "total_expected": round((unit_data['total_expected']), 2),
-                    "bill_count": unit_data['bill_count'],
-                    "paid_bills": unit_data['paid_count'],
-                    "unpaid_bills": unit_data['unpaid_count'],
-                    "unit_completion": f"{unit_completion}%",
-                    "percentage_of_total": round((unit_data['total_expected'] / total_expected) * 100, 2) if total_expected > 0 else 0
-                })
-
-            # Daily payment trend (ALL bills)
-            daily_trend = all_bills.values('due_date').annotate(
-                daily_total=Sum('amount_due'),
-                daily_paid=Sum('amount_due', filter=models.Q(payment_status='paid')),
-                daily_unpaid=Sum('amount_due', filter=models.Q(payment_status='pending')),
-                daily_count=Count('id')
-            ).order_by('due_date')
-
-            daily_trend_data = []
-            for day_data in daily_trend:
-                day_completion = round((day_data['daily_paid'] / day_data['daily_total']) * 100, 2) if day_data['daily_total'] > 0 else 0
-                
-                daily_trend_data.append({
-                    "date": day_data['due_date'].strftime('%Y-%m-%d'),
-                    "amount_paid": round((day_data['daily_paid']), 2),
-                    "amount_unpaid": round((day_data['daily_unpaid']), 2),
-                    "amount_expected": round((day_data['daily_total']), 2),
-                    "bill_count": day_data['daily_count'],
-                    "daily_completion": f"{day_completion}%"
-                })
-
-            # Bill details (ALL bills)
-            bill_details = []
-            for bill in all_bills:
-                bill_details.append({
-                    "bill_id": bill.id,
-                    "due_date": bill.due_date.strftime('%Y-%m-%d'),
-                    "amount_due": (bill.amount_due),
-                    "amount_paid": (bill.amount_due) if bill.payment_status == 'paid' else 0,
-                    "unit_name": bill.unit.unit_name if bill.unit else "N/A",
-                    "building": bill.unit.building if bill.unit else "N/A",
-                    "payment_status": bill.payment_status,
-                    "created_at": bill.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                })
-
-            response_data["detailed_breakdown"] = {
-                "by_unit": unit_breakdown_data,
-                "daily_payments": daily_trend_data,
-                "bill_details": bill_details
-            }
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(report, status=status.HTTP_200_OK)
 
     def _get_user_yearly_report(self, user_id, year, breakdown):
         """Generate yearly financial report for a specific user (ALL bills)"""
-        # Get ALL bills for the specified user and year (not just paid)
-        all_bills = MonthlyBill.objects.filter(
-            user_id=user_id,
-            due_date__year=year
-        ).select_related('user', 'unit')
-
-        # Get user info
         try:
-            user = all_bills.first().user if all_bills.exists() else None
-            if not user:
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                user = User.objects.get(id=user_id)
-        except:
+            report = user_yearly_report(user_id, year, breakdown)
+        except get_user_model().DoesNotExist:
             return Response(
                 {"error": "User not found"},
                 status=status.HTTP_404_NOT_FOUND
             )
-
-        user_name = f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username
-
-        if not all_bills.exists():
-            return Response({
-                "report_type": "user_yearly",
-                "user_id": user_id,
-                "user_name": user_name,
-                "year": year,
-                "message": "No bills found for this year",
-                "summary": {
-                    "total_paid": 0,
-                    "total_unpaid": 0,
-                    "total_bills": 0,
-                    "average_payment": 0,
-                    "payment_completion": "0%"
-                }
-            }, status=status.HTTP_200_OK)
-
-        # Calculate totals - ALL bills
-        total_paid = all_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or 0
-        total_unpaid = all_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or 0
-        total_expected = all_bills.aggregate(total=Sum('amount_due'))['total'] or 0
-        total_bills = all_bills.count()
-        
-        paid_bills_count = all_bills.filter(payment_status='paid').count()
-        unpaid_bills_count = all_bills.filter(payment_status='pending').count()
-        
-        average_payment = total_paid / paid_bills_count if paid_bills_count > 0 else 0
-        
-        # Calculate ACTUAL payment completion
-        if total_expected > 0:
-            payment_completion_percentage = round((total_paid / total_expected) * 100, 2)
-        else:
-            payment_completion_percentage = 0
-
-        # Monthly breakdown (ALL bills)
-        monthly_breakdown = all_bills.annotate(
-            month=ExtractMonth('due_date')
-        ).values('month').annotate(
-            monthly_paid=Sum('amount_due', filter=models.Q(payment_status='paid')),
-            monthly_unpaid=Sum('amount_due', filter=models.Q(payment_status='pending')),
-            monthly_total=Sum('amount_due'),
-            monthly_count=Count('id')
-        ).order_by('month')
-
-        monthly_breakdown_data = []
-        for month_data in monthly_breakdown:
-            month_completion = round((month_data['monthly_paid'] / month_data['monthly_total']) * 100, 2) if month_data['monthly_total'] > 0 else 0
-            
-            monthly_breakdown_data.append({
-                "month": calendar.month_name[month_data['month']],
-                "month_number": month_data['month'],
-                "amount_paid": round((month_data['monthly_paid']), 2),
-                "amount_unpaid": round((month_data['monthly_unpaid']), 2),
-                "amount_expected": round((month_data['monthly_total']), 2),
-                "bill_count": month_data['monthly_count'],
-                "monthly_completion": f"{month_completion}%",
-                "percentage_of_year": round((month_data['monthly_total'] / total_expected) * 100, 2) if total_expected > 0 else 0
-            })
-
-        # Basic response structure
-        response_data = {
-            "report_type": "user_yearly",
-            "user_id": user_id,
-            "user_name": user_name,
-            "user_email": user.email,
-            "year": year,
-            "summary": {
-                "total_paid": round((total_paid), 2),
-                "total_unpaid": round((total_unpaid), 2),
-                "total_expected": round((total_expected), 2),
-                "total_bills": total_bills,
-                "paid_bills_count": paid_bills_count,
-                "unpaid_bills_count": unpaid_bills_count,
-                "average_payment": round((average_payment), 2),
-                "payment_completion": f"{payment_completion_percentage}%",  # ACTUAL completion rate
-                "average_monthly_payment": round((total_paid / 12), 2) if total_paid > 0 else 0,
-            },
-            "monthly_breakdown": monthly_breakdown_data
-        }
-
-        # Add detailed breakdown if requested
-        if breakdown == 'detailed':
-            # Breakdown by unit (ALL bills)
-            unit_breakdown = all_bills.values(
-                'unit__unit_name', 
-                'unit__building',
-                'unit__rent_amount'
-            ).annotate(
-                total_paid=Sum('amount_due', filter=models.Q(payment_status='paid')),
-                total_unpaid=Sum('amount_due', filter=models.Q(payment_status='pending')),
-                total_expected=Sum('amount_due'),
-                bill_count=Count('id'),
-                paid_count=Count('id', filter=models.Q(payment_status='paid')),
-                unpaid_count=Count('id', filter=models.Q(payment_status='pending')),
-                avg_payment=Avg('amount_due', filter=models.Q(payment_status='paid'))
-            ).order_by('-total_expected')
-
-            unit_breakdown_data = []
-            for unit_data in unit_breakdown:
-                unit_completion = round((unit_data['total_paid'] / unit_data['total_expected']) * 100, 2) if unit_data['total_expected'] > 0 else 0
-                unit_monthly_bills = all_bills.filter(
-                    unit__unit_name=unit_data['unit__unit_name']
-                ).values('due_date__month').distinct().count()
-                
-                unit_breakdown_data.append({
-                    "unit_name": unit_data['unit__unit_name'],
-                    "building": unit_data['unit__building'],
-                    "rent_amount": (unit_data['unit__rent_amount']) if unit_data['unit__rent_amount'] else 0,
-                    "total_paid": round((unit_data['total_paid']), 2),
-                    "total_unpaid": round((unit_data['total_unpaid']), 2),
-                    "total_expected": round((unit_data['total_expected']), 2),
-                    "bill_count": unit_data['bill_count'],
-                    "paid_bills": unit_data['paid_count'],
-                    "unpaid_bills": unit_data['unpaid_count'],
-                    "average_payment": round((unit_data['avg_payment']), 2),
-                    "unit_completion": f"{unit_completion}%",
-                    "months_with_payments": unit_monthly_bills,
-                    "percentage_of_total": round((unit_data['total_expected'] / total_expected) * 100, 2) if total_expected > 0 else 0
-                })
-
-            # Quarterly breakdown (ALL bills)
-            quarterly_breakdown = []
-            for quarter in range(1, 5):
-                if quarter == 1:
-                    months = [1, 2, 3]
-                elif quarter == 2:
-                    months = [4, 5, 6]
-                elif quarter == 3:
-                    months = [7, 8, 9]
-                else:
-                    months = [10, 11, 12]
-                
-                quarter_bills = all_bills.filter(due_date__month__in=months)
-                quarter_paid = quarter_bills.filter(payment_status='paid').aggregate(total=Sum('amount_due'))['total'] or 0
-                quarter_unpaid = quarter_bills.filter(payment_status='pending').aggregate(total=Sum('amount_due'))['total'] or 0
-                quarter_total = quarter_paid + quarter_unpaid
-                quarter_count = quarter_bills.count()
-                
-                quarter_completion = round((quarter_paid / quarter_total) * 100, 2) if quarter_total > 0 else 0
-                
-                quarterly_breakdown.append({
-                    "quarter": f"Q{quarter}",
-                    "months": [calendar.month_name[m] for m in months],
-                    "amount_paid": round((quarter_paid), 2),
-                    "amount_unpaid": round((quarter_unpaid), 2),
-                    "amount_expected": round((quarter_total), 2),
-                    "bill_count": quarter_count,
-                    "quarter_completion": f"{quarter_completion}%",
-                    "percentage_of_year": round((quarter_total / total_expected) * 100, 2) if total_expected > 0 else 0
-                })
-
-            # Payment consistency analysis
-            months_with_payments = len([m for m in monthly_breakdown_data if m['amount_expected'] > 0])
-            payment_consistency = {
-                "months_with_payments": months_with_payments,
-                "payment_consistency_rate": round((months_with_payments / 12) * 100, 2),
-                "most_active_month": max(monthly_breakdown_data, key=lambda x: x['amount_paid']) if monthly_breakdown_data else None,
-                "least_active_month": min(monthly_breakdown_data, key=lambda x: x['amount_paid']) if monthly_breakdown_data else None,
-                "best_completion_month": max(monthly_breakdown_data, key=lambda x: (x['monthly_completion'].rstrip('%'))) if monthly_breakdown_data else None,
-                "worst_completion_month": min(monthly_breakdown_data, key=lambda x: (x['monthly_completion'].rstrip('%'))) if monthly_breakdown_data else None
-            }
-
-            response_data["detailed_breakdown"] = {
-                "by_unit": unit_breakdown_data,
-                "quarterly": quarterly_breakdown,
-                "payment_analysis": payment_consistency
-            }
-
-        return Response(response_data, status=status.HTTP_200_OK)
+        return Response(report, status=status.HTTP_200_OK)
 
 
 class UserFinancialComparisonView(APIView):
@@ -1649,61 +1385,47 @@ class UserFinancialComparisonView(APIView):
         year = int(request.GET.get('year', date.today().year))
         month = int(request.GET.get('month', date.today().month))
 
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+
+        # Users, paid bill totals and assigned unit counts for every user at once
+        users = User.objects.in_bulk(user_ids)
+        paid_bills = BillReport.for_users(
+            user_ids, year, month if period == 'monthly' else None
+        ).filter(payment_status='paid')
+        assigned_units_counts = dict(
+            AssignedUnit.objects.filter(
+                assigned_by_id__in=user_ids,
+                deleted_at__isnull=True
+            ).values('assigned_by_id').annotate(count=Count('id')).values_list('assigned_by_id', 'count')
+        )
+
         comparison_data = []
-        
-        for user_id in user_ids:
-            try:
-                # Get user basic info
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                user = User.objects.get(id=user_id)
-                
-                # Get paid bills based on period
-                if period == 'monthly':
-                    paid_bills = MonthlyBill.objects.filter(
-                        user_id=user_id,
-                        payment_status='paid',
-                        due_date__year=year,
-                        due_date__month=month
-                    )
-                else:
-                    paid_bills = MonthlyBill.objects.filter(
-                        user_id=user_id,
-                        payment_status='paid',
-                        due_date__year=year
-                    )
-
-                total_paid = paid_bills.aggregate(total=Sum('amount_due'))['total'] or 0
-                bill_count = paid_bills.count()
-                
-                # Get assigned units count for context
-                assigned_units_count = AssignedUnit.objects.filter(
-                    assigned_by_id=user_id,
-                    deleted_at__isnull=True
-                ).count()
 
-                user_data = {
-                    "user_id": user_id,
-                    "user_name": f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username,
-                    "user_email": user.email,
-                    "total_paid": round((total_paid), 2),
-                    "bill_count": bill_count,
-                    "assigned_units_count": assigned_units_count,
-                    "average_payment": round((total_paid / bill_count), 2) if bill_count > 0 else 0
-                }
-                
-                comparison_data.append(user_data)
-                
-            except User.DoesNotExist:
+        for user_id in user_ids:
+            user = users.get(user_id)
+            if user is None:
                 comparison_data.append({
                     "user_id": user_id,
                     "error": "User not found"
                 })
-            except Exception as e:
-                comparison_data.append({
-                    "user_id": user_id,
-                    "error": str(e)
-                })
+                continue
+
+            user_bills = paid_bills.filter(user_id=user_id)
+            total_paid = user_bills.total() or 0
+            bill_count = user_bills.count()
+
+            user_data = {
+                "user_id": user_id,
+                "user_name": f"{user.first_name or ''} {user.last_name or ''}".strip() or user.username,
+                "user_email": user.email,
+                "total_paid": round((total_paid), 2),
+                "bill_count": bill_count,
+                "assigned_units_count": assigned_units_counts.get(user_id, 0),
+                "average_payment": round((total_paid / bill_count), 2) if bill_count > 0 else 0
+            }
+
+            comparison_data.append(user_data)
 
         # Sort by total paid (descending)
         comparison_data.sort(key=lambda x: x.get('total_paid', 0), reverse=True)
@@ -1751,71 +1473,15 @@ class UserFinancialReportExportView(APIView):
         year = int(request.GET.get('year', date.today().year))
         month = int(request.GET.get('month', date.today().month))
 
-        # Get the user financial report data
-        report_view = FinancialReportView()
-        
         try:
-            if period == 'monthly':
-                response = report_view._get_user_monthly_report(user_id, year, month, 'detailed')
-            else:
-                response = report_view._get_user_yearly_report(user_id, year, 'detailed')
-
-            report_data = response.data
+            # Get the user financial report data
+            report_data = exports.user_financial_report_data(user_id, period, year, month)
 
             # Export to CSV
-            import csv
-            from django.http import HttpResponse
-            
-            response = HttpResponse(content_type='text/csv')
-            
-            if period == 'monthly':
-                filename = f"user_financial_report_{user_id}_{year}_{month:02d}.csv"
-            else:
-                filename = f"user_financial_report_{user_id}_{year}.csv"
-                
+            response = HttpResponse(content_type=exports.CSV_CONTENT_TYPE)
+            filename = exports.user_financial_report_filename(user_id, period, year, month)
             response['Content-Disposition'] = f'attachment; filename="{filename}"'
-
-            writer = csv.writer(response)
-            
-            # Write header
-            writer.writerow(['User Financial Report - Paid Bills Only'])
-            writer.writerow([f'User: {report_data["user_name"]}'])
-            writer.writerow([f'User ID: {report_data["user_id"]}'])
-            if period == 'monthly':
-                writer.writerow([f'Period: {report_data["month"]} {report_data["year"]}'])
-            else:
-                writer.writerow([f'Period: Year {report_data["year"]}'])
-            writer.writerow([])
-            
-            # Write summary - handle potential None values
-            writer.writerow(['SUMMARY'])
-            total_paid = report_data['summary']['total_paid'] or 0
-            total_bills = report_data['summary']['total_bills'] or 0
-            avg_payment = report_data['summary']['average_payment'] or 0
-            
-            writer.writerow(['Total Paid', f"₱{total_paid:,.2f}"])
-            writer.writerow(['Total Bills', total_bills])
-            writer.writerow(['Average Payment', f"₱{avg_payment:,.2f}"])
-            writer.writerow([])
-            
-            # Write unit breakdown if available
-            if 'detailed_breakdown' in report_data and 'by_unit' in report_data['detailed_breakdown']:
-                writer.writerow(['UNIT BREAKDOWN'])
-                writer.writerow(['Unit Name', 'Building', 'Total Paid', 'Bill Count', 'Percentage'])
-                for unit in report_data['detailed_breakdown']['by_unit']:
-                    unit_paid = unit['total_paid'] or 0
-                    unit_bill_count = unit['bill_count'] or 0
-                    unit_percentage = unit['percentage_of_total'] or 0
-                    
-                    writer.writerow([
-                        unit['unit_name'],
-                        unit['building'],
-                        f"₱{unit_paid:,.2f}",
-                        unit_bill_count,
-                        f"{unit_percentage}%"
-                    ])
-                writer.writerow([])
-            
+            exports.write_user_financial_report_csv(report_data, period, response)
             return response
             
         except Exception as e:
@@ -1828,7 +1494,7 @@ class UserFinancialReportExportView(APIView):
 
 class PaidBillsExcelExportView(APIView):
     permission_classes = [AllowAny]
-    
+
     def get(self, request):
         """
         Export paid/done bills to Excel with monthly filtering
@@ -1836,6 +1502,9 @@ class PaidBillsExcelExportView(APIView):
         - month: month number (1-12) or 'all' for all months
         - year: specific year (default: current year)
         - status: 'paid', 'done', or 'all' (default: 'all')
+
+        The workbook is streamed in write-only mode (see bills.exports); for large
+        exports prefer the background export job API (bills/exports/).
         """
         try:
             # Get query parameters
@@ -1843,143 +1512,25 @@ class PaidBillsExcelExportView(APIView):
             year = int(request.GET.get('year', date.today().year))
             status_filter = request.GET.get('status', 'all')
             
-            # Build base query for paid/done bills
-            base_query = MonthlyBill.objects.filter(
-                Q(payment_status=MonthlyBill.PaymentStatus.PAID) | 
-                Q(due_status=MonthlyBill.DueStatus.DONE)
-            )
-            
-            # Apply month filter
-            if month_param != 'all':
-                month = int(month_param)
-                base_query = base_query.filter(
-                    due_date__year=year,
-                    due_date__month=month
-                )
-            else:
-                base_query = base_query.filter(due_date__year=year)
-            
-            # Apply specific status filter if provided
-            if status_filter == 'paid':
-                base_query = base_query.filter(payment_status=MonthlyBill.PaymentStatus.PAID)
-            elif status_filter == 'done':
-                base_query = base_query.filter(due_status=MonthlyBill.DueStatus.DONE)
-            
-            # Order by due date
-            bills = base_query.order_by('due_date')
-            
-            if not bills.exists():
+            bills = exports.paid_bills_queryset(year, month_param, status_filter)
+
+            # Save to a temporary file and stream it back
+            output = tempfile.TemporaryFile()
+            if not exports.write_paid_bills_xlsx(bills, output):
+                output.close()
                 return HttpResponse(
                     "No paid bills found for the selected criteria", 
                     status=404, 
                     content_type='text/plain'
                 )
-            
-            # Create Excel workbook
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Paid Bills Report"
-            
-            # Define styles
-            header_font = Font(bold=True, color="FFFFFF", size=12)
-            header_fill = PatternFill(start_color="344CB7", end_color="344CB7", fill_type="solid")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            center_align = Alignment(horizontal='center', vertical='center')
-            
-            # Headers
-            headers = [
-                'Bill ID', 'User', 'User Email', 'Unit', 'Building',
-                'Amount Due', 'Due Date', 'Payment Status', 'Due Status',
-                'SMS Sent', 'Created Date'
-            ]
-            
-            # Write headers
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = center_align
-                cell.border = border
-            
-            # Write data
-            for row, bill in enumerate(bills, 2):
-                # Get unit info safely
-                unit_name = bill.unit.unit_name if bill.unit else "N/A"
-                building_name = bill.unit.building if bill.unit and bill.unit.building else "N/A"
-                
-                data = [
-                    bill.id,
-                    bill.user.get_full_name() or bill.user.username,
-                    bill.user.email,
-                    unit_name,
-                    building_name,
-                    float(bill.amount_due),  # Convert Decimal to float for Excel
-                    bill.due_date.strftime('%Y-%m-%d'),
-                    bill.get_payment_status_display(),
-                    bill.get_due_status_display(),
-                    'Yes' if bill.sms_sent else 'No',
-                    bill.created_at.strftime('%Y-%m-%d %H:%M:%S')
-                ]
-                
-                for col, value in enumerate(data, 1):
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.border = border
-                    if col in [6, 7, 8]:  # Amount and date columns
-                        cell.alignment = center_align
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            # Add summary section
-            summary_row = len(bills) + 3
-            ws.cell(row=summary_row, column=1, value="SUMMARY").font = Font(bold=True, size=14)
-            
-            summary_data = [
-                ("Total Paid Bills", len(bills)),
-                ("Total Amount", f"₱{sum(bill.amount_due for bill in bills):,.2f}"),
-                ("Average Amount", f"₱{sum(bill.amount_due for bill in bills) / len(bills):,.2f}"),
-                ("Date Range", f"{bills.first().due_date} to {bills.last().due_date}"),
-                ("Generated On", datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-            ]
-            
-            for i, (label, value) in enumerate(summary_data, 1):
-                ws.cell(row=summary_row + i, column=1, value=label).font = Font(bold=True)
-                ws.cell(row=summary_row + i, column=2, value=value)
-            
-            # Prepare HTTP response
-            output = io.BytesIO()
-            wb.save(output)
             output.seek(0)
             
-            # Create filename
-            if month_param == 'all':
-                filename = f"paid_bills_report_{year}_all_months.xlsx"
-            else:
-                month_name = calendar.month_name[int(month_param)]
-                filename = f"paid_bills_report_{year}_{month_name}.xlsx"
-            
-            response = HttpResponse(
-                output.getvalue(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+            return FileResponse(
+                output,
+                as_attachment=True,
+                filename=exports.paid_bills_filename(year, month_param),
+                content_type=exports.XLSX_CONTENT_TYPE
             )
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            
-            return response
             
         except Exception as e:
             return HttpResponse(
@@ -2025,6 +1576,78 @@ class PaidBillsFilterOptionsView(APIView):
         
         return Response(options)
 
+class ExportJobMixin:
+    permission_classes = [IsAuthenticated]
+
+    def get_jobs(self):
+        """Admins and employees see every export; other users only their own."""
+        jobs = ExportJob.objects.all()
+        if self.request.user.role not in ["admin", "employee"]:
+            jobs = jobs.filter(created_by=self.request.user)
+        return jobs
+
+
+class ExportJobCreateView(ExportJobMixin, APIView):
+    def post(self, request):
+        """
+        Queue a report export and return the job to poll.
+        Body:
+        - kind: 'paid_bills', 'financial_report' or 'user_financial_report'
+        - params: the query parameters of the matching synchronous export
+          (paid_bills also accepts format 'xlsx' or 'csv')
+
+        An identical export that is still queued or running is returned as is
+        (200) instead of starting another one (201).
+        """
+        serializer = ExportJobSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+
+        job, created = exports.create_export_job(
+            serializer.validated_data["kind"],
+            serializer.validated_data["params"],
+            request.user,
+        )
+        if created:
+            from .tasks import run_export_job
+            transaction.on_commit(lambda: run_export_job.delay(job.pk))
+
+        return Response(
+            ExportJobSerializer(job, context={"request": request}).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
+
+class ExportJobDetailView(ExportJobMixin, APIView):
+    def get(self, request, pk):
+        """Status and progress of an export job."""
+        job = self.get_jobs().filter(pk=pk).first()
+        if job is None:
+            return Response({"error": "Export not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ExportJobSerializer(job, context={"request": request}).data)
+
+
+class ExportJobDownloadView(ExportJobMixin, APIView):
+    def get(self, request, pk):
+        """Download the artifact of a finished export job."""
+        job = self.get_jobs().filter(pk=pk).first()
+        if job is None:
+            return Response({"error": "Export not found"}, status=status.HTTP_404_NOT_FOUND)
+        if job.status != ExportJob.Status.DONE:
+            return Response(
+                {"error": f"Export is {job.status}", "status": job.status, "progress": job.progress},
+                status=status.HTTP_409_CONFLICT
+            )
+        if job.is_expired or not job.file:
+            return Response({"error": "Export has expired"}, status=status.HTTP_410_GONE)
+
+        return FileResponse(
+            job.file.open('rb'),
+            as_attachment=True,
+            filename=job.filename,
+            content_type=exports.XLSX_CONTENT_TYPE if job.filename.endswith('.xlsx') else exports.CSV_CONTENT_TYPE
+        )
+
+
 from django.db.models import Sum, Q, Count, FloatField, Min, Max
 from django.db.models.functions import Coalesce
 from .serializers import ExpenseReflectionSerializer
@@ -2038,6 +1661,7 @@ from rest_framework import status, permissions
 from decimal import Decimal
 import datetime
 from django.utils import timezone
+from collections import Counter
 from .serializers import ExpenseReflectionSerializer
 from units.models import Unit, AssignedUnit
 from .models import MonthlyBill
@@ -2071,19 +1695,27 @@ class ExpenseReflectionAPIView(APIView):
         chart_type = request.query_params.get('chart_type', 'pie')  # pie, bar, line, monthly_trend
         group_by = request.query_params.get('group_by')  # month, year, building
         
-        # Start with base queryset
-        bills_queryset = MonthlyBill.objects.all()
-        
-        # Apply date filters
-        if start_date:
-            bills_queryset = bills_queryset.filter(due_date__gte=start_date)
-        if end_date:
-            bills_queryset = bills_queryset.filter(due_date__lte=end_date)
+        # Monthly totals are read from the billing rollup; day-level date ranges
+        # can only be answered from the bills themselves
+        if start_date or end_date:
+            source = MonthlyBill.objects.annotate(
+                year=ExtractYear('due_date'),
+                month=ExtractMonth('due_date')
+            )
+            if start_date:
+                source = source.filter(due_date__gte=start_date)
+            if end_date:
+                source = source.filter(due_date__lte=end_date)
+            amount_field, count_field = 'amount_due', None
+        else:
+            source = BillingRollup.objects.all()
+            amount_field, count_field = 'amount_total', 'bill_count'
+
         if year:
-            bills_queryset = bills_queryset.filter(due_date__year=year)
+            source = source.filter(year=year)
         if month:
-            bills_queryset = bills_queryset.filter(due_date__month=month)
-        
+            source = source.filter(month=month)
+
         # Apply building filter if specified
         if building_name:
             # Get units in this building
@@ -2091,98 +1723,89 @@ class ExpenseReflectionAPIView(APIView):
             # Get unit IDs
             unit_ids = units_in_building.values_list('id', flat=True)
             # Filter bills for units in this building
-            bills_queryset = bills_queryset.filter(unit_id__in=unit_ids)
-        
+            source = source.filter(unit_id__in=unit_ids)
+
+        def bill_count(**filters):
+            if count_field is None:
+                return Count('id', filter=Q(**filters) if filters else None)
+            return Coalesce(Sum(count_field, filter=Q(**filters) if filters else None), 0)
+
         # Calculate basic totals from ALL bills
-        all_bills_aggregates = bills_queryset.aggregate(
-            total_all_bills=Coalesce(Sum('amount_due'), Decimal('0')),
+        all_bills_aggregates = source.aggregate(
+            total_all_bills=Coalesce(Sum(amount_field), Decimal('0')),
             total_paid=Coalesce(
-                Sum('amount_due', filter=Q(payment_status=MonthlyBill.PaymentStatus.PAID)),
+                Sum(amount_field, filter=Q(payment_status=MonthlyBill.PaymentStatus.PAID)),
                 Decimal('0')
             ),
             total_unpaid=Coalesce(
-                Sum('amount_due', filter=Q(payment_status=MonthlyBill.PaymentStatus.PENDING)),
+                Sum(amount_field, filter=Q(payment_status=MonthlyBill.PaymentStatus.PENDING)),
                 Decimal('0')
             ),
-            total_bills=Count('id'),
-            paid_bills=Count('id', filter=Q(payment_status=MonthlyBill.PaymentStatus.PAID)),
-            pending_bills=Count('id', filter=Q(payment_status=MonthlyBill.PaymentStatus.PENDING))
+            total_bills=bill_count(),
+            paid_bills=bill_count(payment_status=MonthlyBill.PaymentStatus.PAID),
+            pending_bills=bill_count(payment_status=MonthlyBill.PaymentStatus.PENDING)
         )
-        
+
         # Get the total from ALL bills
         total_all_bills = all_bills_aggregates['total_all_bills']
-        
+
+        # Get the (unit, month) combinations covered by the filtered bills
+        unit_periods = set(source.values_list('unit_id', 'year', 'month').distinct().order_by())
+
         # Get distinct units from the filtered bills
-        unit_ids_from_bills = bills_queryset.values_list('unit_id', flat=True).distinct()
-        
+        unit_ids_from_bills = {unit_id for unit_id, _, _ in unit_periods}
+
+        # Number of billed months per unit
+        unit_months = Counter(unit_id for unit_id, _, _ in unit_periods)
+
         # Get assigned units for these unit IDs
-        assigned_units = AssignedUnit.objects.filter(
-            unit_id__in=unit_ids_from_bills,
+        assigned_units = list(AssignedUnit.objects.filter(
+            unit_id__in=[unit_id for unit_id in unit_ids_from_bills if unit_id is not None],
             deleted_at__isnull=True
-        )
-        
+        ))
+
         # Calculate months covered by the filtered bills
-        if bills_queryset.exists():
-            # Get unique month-year combinations
-            months_data = bills_queryset.annotate(
-                month=ExtractMonth('due_date'),
-                year=ExtractYear('due_date')
-            ).values('month', 'year').distinct()
-            months_count = months_data.count()
-        else:
-            months_count = 0
-        
+        months_count = len({(bill_year, bill_month) for _, bill_year, bill_month in unit_periods})
+
         # Calculate expenses based on fixed rates
         # Fixed rates as per your requirement
         MAINTENANCE_RATE = Decimal('1500.00')
         SECURITY_RATE = Decimal('2000.00')
         AMENITIES_RATE = Decimal('2500.00')
-        
+
         # Initialize totals
         maintenance = Decimal('0.00')
         security = Decimal('0.00')
         amenities = Decimal('0.00')
-        
+
         # If no assigned units found, check if we should still calculate based on units in building
-        if not assigned_units.exists() and building_name:
+        if not assigned_units and building_name:
             # Get all units in the building
             units_in_building = Unit.objects.filter(building=building_name, deleted_at__isnull=True)
-            
+
             # Calculate based on all units (assuming default service values)
-            for unit in units_in_building:
-                # Get bills for this specific unit
-                unit_bills = bills_queryset.filter(unit_id=unit.id)
-                if unit_bills.exists():
-                    # Count unique months for this unit
-                    unit_months = unit_bills.annotate(
-                        month=ExtractMonth('due_date'),
-                        year=ExtractYear('due_date')
-                    ).values('month', 'year').distinct().count()
-                    
-                    # Add expenses (assuming all services are enabled by default)
-                    maintenance += MAINTENANCE_RATE * unit_months
-                    security += SECURITY_RATE * unit_months
-                    amenities += AMENITIES_RATE * unit_months
+            for unit_id in units_in_building.values_list('id', flat=True):
+                # Count unique months for this unit
+                months_for_unit = unit_months[unit_id]
+
+                # Add expenses (assuming all services are enabled by default)
+                maintenance += MAINTENANCE_RATE * months_for_unit
+                security += SECURITY_RATE * months_for_unit
+                amenities += AMENITIES_RATE * months_for_unit
         else:
             # Calculate based on assigned units with their service configurations
             for assigned_unit in assigned_units:
-                # Get bills for this specific unit
-                unit_bills = bills_queryset.filter(unit_id=assigned_unit.unit_id)
-                if unit_bills.exists():
-                    # Count unique months for this unit
-                    unit_months = unit_bills.annotate(
-                        month=ExtractMonth('due_date'),
-                        year=ExtractYear('due_date')
-                    ).values('month', 'year').distinct().count()
-                    
-                    # Add expenses based on enabled services
-                    if assigned_unit.maintenance:
-                        maintenance += MAINTENANCE_RATE * unit_months
-                    if assigned_unit.security:
-                        security += SECURITY_RATE * unit_months
-                    if assigned_unit.amenities:
-                        amenities += AMENITIES_RATE * unit_months
-        
+                # Count unique months for this unit
+                months_for_unit = unit_months[assigned_unit.unit_id_id]
+
+                # Add expenses based on enabled services
+                if assigned_unit.maintenance:
+                    maintenance += MAINTENANCE_RATE * months_for_unit
+                if assigned_unit.security:
+                    security += SECURITY_RATE * months_for_unit
+                if assigned_unit.amenities:
+                    amenities += AMENITIES_RATE * months_for_unit
+
         # Round to 2 decimal places
         maintenance = Decimal(round(maintenance, 2))
         security = Decimal(round(security, 2))
@@ -2234,11 +1857,11 @@ class ExpenseReflectionAPIView(APIView):
         
         # Generate chart data based on chart_type
         chart_data = self.generate_chart_data(
-            bills_queryset, 
-            chart_type, 
-            building_name,
-            year,
-            month
+            chart_type,
+            total_all_bills,
+            maintenance,
+            security,
+            amenities
         )
         data['chart_data'] = chart_data
         
@@ -2247,19 +1870,22 @@ class ExpenseReflectionAPIView(APIView):
             # Get assigned units service statistics
             if building_name:
                 # Try to get assigned units by building name
-                assigned_units_in_building = AssignedUnit.objects.filter(
+                service_stats = AssignedUnit.objects.filter(
                     building=building_name,
                     deleted_at__isnull=True
+                ).aggregate(
+                    total_assigned_units=Count('id'),
+                    maintenance_enabled=Count('id', filter=Q(maintenance=True)),
+                    security_enabled=Count('id', filter=Q(security=True)),
+                    amenities_enabled=Count('id', filter=Q(amenities=True)),
                 )
             else:
-                assigned_units_in_building = assigned_units
-            
-            service_stats = {
-                'total_assigned_units': assigned_units_in_building.count(),
-                'maintenance_enabled': assigned_units_in_building.filter(maintenance=True).count(),
-                'security_enabled': assigned_units_in_building.filter(security=True).count(),
-                'amenities_enabled': assigned_units_in_building.filter(amenities=True).count(),
-            }
+                service_stats = {
+                    'total_assigned_units': len(assigned_units),
+                    'maintenance_enabled': sum(1 for unit in assigned_units if unit.maintenance),
+                    'security_enabled': sum(1 for unit in assigned_units if unit.security),
+                    'amenities_enabled': sum(1 for unit in assigned_units if unit.amenities),
+                }
             
             data['detailed_breakdown'] = {
                 'categories': {
@@ -2310,15 +1936,10 @@ class ExpenseReflectionAPIView(APIView):
         serializer = ExpenseReflectionSerializer(data)
         return Response(serializer.data)
     
-    def generate_chart_data(self, bills_queryset, chart_type, building_name=None, year=None, month=None):
-        """Generate different types of chart data based on parameters"""
-        
+    def generate_chart_data(self, chart_type, total_all_bills, maintenance, security, amenities):
+        """Generate different types of chart data from the computed expense totals"""
+
         if chart_type == 'pie':
-            # Calculate totals
-            total_all_bills = bills_queryset.aggregate(
-                total=Coalesce(Sum('amount_due'), Decimal('0'))
-            )['total']
-            
             if total_all_bills == 0:
                 return {
                     'type': 'pie',
@@ -2331,61 +1952,12 @@ class ExpenseReflectionAPIView(APIView):
                     },
                     'empty': True
                 }
-            
-            # Get distinct units
-            unit_ids_from_bills = bills_queryset.values_list('unit_id', flat=True).distinct()
-            
-            # Get assigned units
-            assigned_units = AssignedUnit.objects.filter(
-                unit_id__in=unit_ids_from_bills,
-                deleted_at__isnull=True
-            )
-            
-            # Fixed rates
-            MAINTENANCE_RATE = Decimal('1500.00')
-            SECURITY_RATE = Decimal('2000.00')
-            AMENITIES_RATE = Decimal('2500.00')
-            
-            # Calculate expenses
-            maintenance = Decimal('0.00')
-            security = Decimal('0.00')
-            amenities = Decimal('0.00')
-            
-            # If no assigned units found but building is specified, calculate based on all units
-            if not assigned_units.exists() and building_name:
-                units_in_building = Unit.objects.filter(building=building_name, deleted_at__isnull=True)
-                for unit in units_in_building:
-                    unit_bills = bills_queryset.filter(unit_id=unit.id)
-                    if unit_bills.exists():
-                        unit_months = unit_bills.annotate(
-                            month=ExtractMonth('due_date'),
-                            year=ExtractYear('due_date')
-                        ).values('month', 'year').distinct().count()
-                        
-                        maintenance += MAINTENANCE_RATE * unit_months
-                        security += SECURITY_RATE * unit_months
-                        amenities += AMENITIES_RATE * unit_months
-            else:
-                for assigned_unit in assigned_units:
-                    unit_bills = bills_queryset.filter(unit_id=assigned_unit.unit_id)
-                    if unit_bills.exists():
-                        unit_months = unit_bills.annotate(
-                            month=ExtractMonth('due_date'),
-                            year=ExtractYear('due_date')
-                        ).values('month', 'year').distinct().count()
-                        
-                        if assigned_unit.maintenance:
-                            maintenance += MAINTENANCE_RATE * unit_months
-                        if assigned_unit.security:
-                            security += SECURITY_RATE * unit_months
-                        if assigned_unit.amenities:
-                            amenities += AMENITIES_RATE * unit_months
-            
+
             total_categorized = maintenance + security + amenities
             other_expenses = total_all_bills - total_categorized
             if other_expenses < Decimal('0'):
                 other_expenses = Decimal('0')
-            
+
             return {
                 'type': 'pie',
                 'data': {
@@ -2412,41 +1984,33 @@ class YearlyExpenseAPIView(APIView):
     def get(self, request, format=None):
         building_name = request.query_params.get('building')
         
-        # Base queryset
-        bills_queryset = MonthlyBill.objects.all()
-        
+        # Base queryset (monthly billing rollup)
+        rollup_queryset = BillingRollup.objects.all()
+
         # Apply building filter if specified
         if building_name:
             units_in_building = Unit.objects.filter(building=building_name, deleted_at__isnull=True)
             unit_ids = units_in_building.values_list('id', flat=True)
-            bills_queryset = bills_queryset.filter(unit_id__in=unit_ids)
-        
-        # Get distinct years
-        years_data = bills_queryset.annotate(
-            year=ExtractYear('due_date')
-        ).values('year').distinct().order_by('-year')
-        
-        yearly_expenses = []
-        
-        for year_item in years_data:
-            year = year_item['year']
-            
-            # Filter bills for this year
-            yearly_bills = bills_queryset.filter(due_date__year=year)
-            
-            # Calculate totals for this year
-            aggregates = yearly_bills.aggregate(
-                total_all_bills=Coalesce(Sum('amount_due'), Decimal('0')),
-                total_paid=Coalesce(
-                    Sum('amount_due', filter=Q(payment_status=MonthlyBill.PaymentStatus.PAID)),
-                    Decimal('0')
-                ),
-                total_unpaid=Coalesce(
-                    Sum('amount_due', filter=Q(payment_status=MonthlyBill.PaymentStatus.PENDING)),
-                    Decimal('0')
-                )
+            rollup_queryset = rollup_queryset.filter(unit_id__in=unit_ids)
+
+        # Calculate totals for every year in one grouped query
+        years_data = rollup_queryset.values('year').annotate(
+            total_all_bills=Coalesce(Sum('amount_total'), Decimal('0')),
+            total_paid=Coalesce(
+                Sum('amount_total', filter=Q(payment_status=MonthlyBill.PaymentStatus.PAID)),
+                Decimal('0')
+            ),
+            total_unpaid=Coalesce(
+                Sum('amount_total', filter=Q(payment_status=MonthlyBill.PaymentStatus.PENDING)),
+                Decimal('0')
             )
-            
+        ).order_by('-year')
+
+        yearly_expenses = []
+
+        for aggregates in years_data:
+            year = aggregates['year']
+
             total_all_bills = aggregates['total_all_bills']
             
             # Calculate categorized expenses
@@ -2492,29 +2056,27 @@ class MonthlyExpenseAPIView(APIView):
     def get(self, request, year, format=None):
         building_name = request.query_params.get('building')
         
-        # Base queryset for the specific year
-        bills_queryset = MonthlyBill.objects.filter(due_date__year=year)
-        
+        # Base queryset for the specific year (monthly billing rollup)
+        rollup_queryset = BillingRollup.objects.filter(year=year)
+
         # Apply building filter if specified
         if building_name:
             units_in_building = Unit.objects.filter(building=building_name, deleted_at__isnull=True)
             unit_ids = units_in_building.values_list('id', flat=True)
-            bills_queryset = bills_queryset.filter(unit_id__in=unit_ids)
-        
+            rollup_queryset = rollup_queryset.filter(unit_id__in=unit_ids)
+
         # Get monthly data
-        monthly_data = bills_queryset.annotate(
-            month=ExtractMonth('due_date')
-        ).values('month').annotate(
-            total_all_bills=Coalesce(Sum('amount_due'), Decimal('0')),
+        monthly_data = rollup_queryset.values('month').annotate(
+            total_all_bills=Coalesce(Sum('amount_total'), Decimal('0')),
             total_paid=Coalesce(
-                Sum('amount_due', filter=Q(payment_status=MonthlyBill.PaymentStatus.PAID)),
+                Sum('amount_total', filter=Q(payment_status=MonthlyBill.PaymentStatus.PAID)),
                 Decimal('0')
             ),
             total_unpaid=Coalesce(
-                Sum('amount_due', filter=Q(payment_status=MonthlyBill.PaymentStatus.PENDING)),
+                Sum('amount_total', filter=Q(payment_status=MonthlyBill.PaymentStatus.PENDING)),
                 Decimal('0')
             ),
-            bill_count=Count('id')
+            bill_count=Sum('bill_count')
         ).order_by('month')
         
         # Month names for display
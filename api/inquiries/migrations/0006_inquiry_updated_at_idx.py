@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inquiries', '0005_inquiry_photo'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='inquiry',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
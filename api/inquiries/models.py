@@ -38,7 +38,7 @@ class Inquiry(models.Model):
         default=Category.REQUEST
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     inquiry_type = models.ForeignKey(InquiryType, on_delete=models.CASCADE, related_name='inquiries', null=True, blank=True)
     resident = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='inquiries', null=True, blank=True)
     # Add this photo field
@@ -8,6 +8,7 @@ from django.contrib.auth import get_user_model
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.generics import ListAPIView
+from api.mixins import EagerLoadingViewMixin, SparseFieldsViewMixin
 
 
 # Create your views here.
@@ -158,7 +159,7 @@ def delete_inquiry_by_id(request, pk):
     inquiry.delete()
     return Response({'message': 'Successfully deleted inquiry'}, status=status.HTTP_200_OK)
 
-class PaginatedInquiries(ListAPIView):
+class PaginatedInquiries(SparseFieldsViewMixin, EagerLoadingViewMixin, ListAPIView):
     queryset = Inquiry.objects.all().order_by('-created_at')
     serializer_class = InquirySerializer
     permission_classes = [IsAuthenticated]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notices', '0005_alter_notice_target_audience'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='notice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -17,7 +17,7 @@ class Notice(models.Model):
     content = models.TextField()
     target_audience = models.ManyToManyField(AssignedUnit, blank=True, related_name='notices')
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     notice_type = models.ForeignKey(NoticeType, on_delete=models.CASCADE, related_name='notices')
 
     def __str__(self):
@@ -8,6 +8,7 @@ from .models import Notice, NoticeType
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
+from api.mixins import EagerLoadingViewMixin, SparseFieldsViewMixin, apply_eager_loading
 
 
 # Create your views here.
@@ -97,7 +98,7 @@ def get_notices(request):
 @api_view(['GET'])
 def get_notice_by_id(request, pk):
     try:
-        notice = Notice.objects.get(pk=pk)
+        notice = apply_eager_loading(Notice.objects.all(), NoticeSerializer()).get(pk=pk)
     except Notice.DoesNotExist:
         return Response({"error": "Notice not found."}, status=status.HTTP_404_NOT_FOUND)
     
@@ -132,7 +133,7 @@ def delete_notice(request, pk):
     return Response({'message': 'Successfully deleted notice'}, status=status.HTTP_200_OK)
 
 
-class PaginatedNotices(ListAPIView):
+class PaginatedNotices(SparseFieldsViewMixin, EagerLoadingViewMixin, ListAPIView):
     queryset = Notice.objects.all()
     serializer_class = NoticeSerializer
     permission_classes = [IsAuthenticated]
@@ -144,7 +145,7 @@ class PaginatedNotices(ListAPIView):
     ]
 
     def get_queryset(self):
-        qs = Notice.objects.all().order_by('-created_at')
+        qs = super().get_queryset().order_by('-created_at')
         unit_id = self.request.query_params.get("target_audience")  # 👈 get unit from URL
 
         if unit_id:
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from payments.ledger import rebuild_ledger
+
+
+class Command(BaseCommand):
+    help = "Rebuild the ledger accounts and entries from the bill and payment history"
+
+    def handle(self, *args, **options):
+        entries = rebuild_ledger()
+        self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt ledger: {entries} entries"))
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:59
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0008_keyset_pagination_idx'),
+        ('payments', '0009_paymentmethod_account_name_and_more'),
+        ('units', '0016_assignedunit_billing_day_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='paymentrecord',
+            index=models.Index(fields=['created_at', 'id'], name='paymentrecord_created_id_idx'),
+        ),
+    ]
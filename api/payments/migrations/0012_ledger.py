@@ -0,0 +1,67 @@
+# Generated by Django 5.2.3 on 2026-10-17 02:27
+
+import django.db.models.deletion
+import django.utils.timezone
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+
+
+def rebuild_ledger_forward(apps, schema_editor):
+    # The postings and running balances are worked out by payments.ledger from
+    # the bill and payment model methods, so the live code builds the ledger
+    from payments.ledger import rebuild_ledger
+    rebuild_ledger()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0009_monthlybill_updated_at'),
+        ('payments', '0011_paymentrecord_updated_at_idx'),
+        ('units', '0017_assignedunit_updated_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerAccount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('balance', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_charged', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_paid', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('total_credited', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=14)),
+                ('last_entry_at', models.DateTimeField(blank=True, null=True)),
+                ('unit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ledger_accounts', to='units.unit')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_accounts', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('charge', 'Charge'), ('payment', 'Payment'), ('advance_credit', 'Advance Credit')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('balance_after', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('description', models.CharField(blank=True, default='', max_length=255)),
+                ('posted_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='payments.ledgeraccount')),
+                ('bill', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='bills.monthlybill')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='payments.paymentrecord')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ledgeraccount',
+            constraint=models.UniqueConstraint(condition=models.Q(('unit__isnull', False)), fields=('user', 'unit'), name='unique_ledger_account_unit'),
+        ),
+        migrations.AddConstraint(
+            model_name='ledgeraccount',
+            constraint=models.UniqueConstraint(condition=models.Q(('unit__isnull', True)), fields=('user',), name='unique_ledger_account_no_unit'),
+        ),
+        migrations.AddIndex(
+            model_name='ledgerentry',
+            index=models.Index(fields=['account', 'id'], name='ledger_entry_account_idx'),
+        ),
+        migrations.RunPython(rebuild_ledger_forward, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:16
+
+from django.conf import settings
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count
+
+
+def check_duplicate_payments(apps, schema_editor):
+    """
+    Two payment records of one resident for the same bill are money records,
+    so they are reported rather than deleted.
+    """
+    PaymentRecord = apps.get_model('payments', 'PaymentRecord')
+    payments = PaymentRecord.objects.filter(bill__isnull=False)
+    duplicated = list(
+        payments.values('user_id', 'bill_id')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by('bill_id', 'user_id')
+    )
+    if not duplicated:
+        return
+    examples = [
+        f"user {row['user_id']}, bill {row['bill_id']} (payments "
+        + ", ".join(str(pk) for pk in payments.filter(
+            user_id=row['user_id'], bill_id=row['bill_id'],
+        ).order_by('id').values_list('id', flat=True))
+        + ")"
+        for row in duplicated[:10]
+    ]
+    raise IntegrityError(
+        f"Cannot add paymentrecord_unique_user_bill: {len(duplicated)} bills have several payment "
+        f"records of the same resident: {'; '.join(examples)}. Merge or delete the extra payments "
+        "and run migrate again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bills', '0012_unique_constraints'),
+        ('payments', '0012_ledger'),
+        ('units', '0019_unique_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_payments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='paymentrecord',
+            constraint=models.UniqueConstraint(fields=('user', 'bill'), name='paymentrecord_unique_user_bill'),
+        ),
+    ]
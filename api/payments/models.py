@@ -1,5 +1,7 @@
-from django.db import models
+from decimal import Decimal
+from django.db import models, transaction
 from django.conf import settings
+from django.utils.timezone import now
 from units.models import Unit
 from bills.models import MonthlyBill
 from units.models import AssignedUnit
@@ -41,7 +43,7 @@ class PaymentRecord(models.Model):
     unit = models.ForeignKey(Unit, on_delete=models.PROTECT, blank=True, null=True)
     payment_date = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     reference_number = models.CharField(max_length=100, blank=True, null=True)
     proof_of_payment = models.ImageField(upload_to='proofs/', blank=True, null=True)
     payment_method = models.ForeignKey(PaymentMethod, on_delete=models.PROTECT)
@@ -53,57 +55,73 @@ class PaymentRecord(models.Model):
     advance_months_paid = models.IntegerField(default=0)  # Number of months covered
     is_advance_allocated = models.BooleanField(default=False)  # Track if advance has been allocated to bills
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of payment listings (api.pagination)
+            models.Index(fields=['created_at', 'id'], name='paymentrecord_created_id_idx'),
+        ]
+        constraints = [
+            # One payment per resident and bill (see CreatePaymentSerializer)
+            models.UniqueConstraint(fields=['user', 'bill'], name='paymentrecord_unique_user_bill'),
+        ]
+
     def __str__(self):
         return f"PaymentRecord(user_id={self.user_id}, amount={self.amount}, status={self.status})"
 
     def allocate_advance_payment(self):
-        """Allocate advance payment to future bills"""
-        if (self.payment_type != self.PaymentType.ADVANCE or 
-            self.status != self.PaymentStatus.COMPLETED or 
+        """
+        Allocate a completed advance payment to the bills of its period.
+
+        One bill per month from ``advance_start_date`` through ``advance_end_date``
+        (see ``bills.services.monthly_due_dates``): missing bills are created
+        already paid with one insert (``bills.services.insert_bills``) and pending
+        ones are marked paid with one ``update()``, atomically and at most once
+        per payment. The billing rollup, receivables aging and ledger are
+        refreshed for the whole batch.
+
+        Returns the number of bills created.
+        """
+        if (self.payment_type != self.PaymentType.ADVANCE or
+            self.status != self.PaymentStatus.COMPLETED or
             self.is_advance_allocated or
-            not self.advance_start_date or 
+            not self.advance_start_date or
             not self.advance_end_date):
             return
 
-        from dateutil.relativedelta import relativedelta
-        from django.utils.timezone import now
-        
-        current_date = self.advance_start_date
-        monthly_rent = float(self.unit.rent_amount) if self.unit else 0
-        
-        # Calculate additional charges
-        additional_charges = 0
-        try:
-            assigned_unit = AssignedUnit.objects.get(
-                unit_id=self.unit, 
-                assigned_by=self.user, 
-                deleted_at__isnull=True
-            )
-            if assigned_unit.amenities:
-                additional_charges += 2500
-            if assigned_unit.security:
-                additional_charges += 2000
-            if assigned_unit.maintenance:
-                additional_charges += 1500
-        except AssignedUnit.DoesNotExist:
-            pass
-
-        total_monthly_amount = monthly_rent + additional_charges
-        
-        # Create bills for each month in the advance period
-        bills_created = 0
-        while current_date <= self.advance_end_date:
-            # Calculate due date (same day as advance start date)
-            due_date = current_date.replace(day=self.advance_start_date.day)
-            
-            # Check if bill already exists
-            if not MonthlyBill.objects.filter(
-                user=self.user, 
-                unit=self.unit,
-                due_date=due_date
-            ).exists():
-                
-                MonthlyBill.objects.create(
+        from bills.aging import refresh_receivable_aging
+        from bills.rollup import refresh_billing_rollup
+        from bills.services import insert_bills, monthly_amount_for, monthly_due_dates
+        from bills.signals import notify_users
+        from .ledger import record_advance_allocation
+
+        due_dates = monthly_due_dates(self.advance_start_date, self.advance_end_date)
+
+        # Base rent plus the add-on charges of the resident's assignment
+        assigned_unit = (
+            AssignedUnit.objects
+            .filter(unit_id=self.unit, assigned_by=self.user, deleted_at__isnull=True)
+            .select_related('unit_id')
+            .first()
+        )
+        if assigned_unit is not None:
+            total_monthly_amount = monthly_amount_for(assigned_unit)
+        else:
+            total_monthly_amount = Decimal(self.unit.rent_amount) if self.unit else Decimal('0.00')
+
+        with transaction.atomic():
+            # Lock the payment so concurrent saves can't allocate it twice
+            if PaymentRecord.objects.select_for_update().filter(pk=self.pk, is_advance_allocated=True).exists():
+                self.is_advance_allocated = True
+                return 0
+
+            existing = list(MonthlyBill.objects.filter(user=self.user, unit=self.unit, due_date__in=due_dates))
+            existing_dates = {bill.due_date for bill in existing}
+            settled = [bill for bill in existing if bill.payment_status == MonthlyBill.PaymentStatus.PENDING]
+
+            # A bill of the period created meanwhile (another payment, the
+            # monthly generation) is skipped by insert_bills
+            created = insert_bills(
+                MonthlyBill(
                     user=self.user,
                     unit=self.unit,
                     amount_due=total_monthly_amount,
@@ -111,15 +129,105 @@ class PaymentRecord(models.Model):
                     payment_status=MonthlyBill.PaymentStatus.PAID,  # Mark as paid in advance
                     due_status=MonthlyBill.DueStatus.DONE,
                 )
-                bills_created += 1
-            
-            # Move to next month
-            current_date = current_date + relativedelta(months=1)
-        
-        self.advance_months_paid = bills_created
-        self.is_advance_allocated = True
-        self.save()
-        
-        return bills_created
+                for due_date in due_dates
+                if due_date not in existing_dates
+            )
+            if settled:
+                MonthlyBill.objects.filter(pk__in=[bill.pk for bill in settled]).update(
+                    payment_status=MonthlyBill.PaymentStatus.PAID,
+                    due_status=MonthlyBill.DueStatus.DONE,
+                    updated_at=now(),
+                )
+                for bill in settled:
+                    bill.payment_status = MonthlyBill.PaymentStatus.PAID
+                    bill.due_status = MonthlyBill.DueStatus.DONE
+
+            # bulk_create() and update() skip the bill signals
+            bills = [*created, *settled]
+            if bills:
+                record_advance_allocation(self, created, settled)
+                refresh_billing_rollup({(bill.due_date.year, bill.due_date.month) for bill in bills})
+                refresh_receivable_aging({self.user_id})
+                notify_users({self.user_id})
+
+            self.advance_months_paid = len(bills)
+            self.is_advance_allocated = True
+            self.save()
 
+        return len(created)
 
+    def advance_state(self):
+        """The values of a completed advance payment that the ledger credits, else None."""
+        if self.payment_type != self.PaymentType.ADVANCE or self.status != self.PaymentStatus.COMPLETED:
+            return None
+        return (self.user_id, self.unit_id, Decimal(self.amount or 0))
+
+
+class LedgerAccount(models.Model):
+    """
+    Running balance of a resident's account for one unit (or for bills without
+    a unit), so balance lookups are single-row reads.
+
+    ``balance`` is what the resident owes: charges minus payments and unused
+    advance credit (negative when in credit). Maintained by ``payments.ledger``
+    as entries are appended; rebuild with ``manage.py rebuild_ledger``.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='ledger_accounts')
+    unit = models.ForeignKey(Unit, blank=True, null=True, on_delete=models.CASCADE, related_name='ledger_accounts')
+    balance = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total_charged = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total_paid = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    total_credited = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal('0.00'))
+    last_entry_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'unit'],
+                condition=models.Q(unit__isnull=False),
+                name='unique_ledger_account_unit',
+            ),
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(unit__isnull=True),
+                name='unique_ledger_account_no_unit',
+            ),
+        ]
+
+    def __str__(self):
+        return f"LedgerAccount(user={self.user_id}, unit={self.unit_id}, balance={self.balance})"
+
+
+class LedgerEntry(models.Model):
+    """
+    One append-only line of an account's statement. ``amount`` is signed:
+    positive raises what the resident owes, negative lowers it, and
+    ``balance_after`` is the account balance once this entry was posted.
+
+    - charge:         a bill was issued (+), changed (+/-) or removed (-)
+    - payment:        a bill was paid (-) or reopened (+)
+    - advance_credit: an advance payment was completed (-) or reverted (+),
+                      or its credit paid for a bill it created (+)
+    """
+    class Kind(models.TextChoices):
+        CHARGE = 'charge', 'Charge'
+        PAYMENT = 'payment', 'Payment'
+        ADVANCE_CREDIT = 'advance_credit', 'Advance Credit'
+
+    account = models.ForeignKey(LedgerAccount, on_delete=models.CASCADE, related_name='entries')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    balance_after = models.DecimalField(max_digits=14, decimal_places=2)
+    bill = models.ForeignKey(MonthlyBill, blank=True, null=True, on_delete=models.SET_NULL, related_name='ledger_entries')
+    payment = models.ForeignKey(PaymentRecord, blank=True, null=True, on_delete=models.SET_NULL, related_name='ledger_entries')
+    description = models.CharField(max_length=255, blank=True, default='')
+    posted_at = models.DateTimeField(default=now)
+
+    class Meta:
+        indexes = [
+            # Account statements, oldest to newest
+            models.Index(fields=['account', 'id'], name='ledger_entry_account_idx'),
+        ]
+
+    def __str__(self):
+        return f"LedgerEntry({self.kind} {self.amount} on account {self.account_id})"
@@ -0,0 +1,340 @@
+import csv
+import io
+import re
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from django.db import transaction
+from django.utils.timezone import now
+from bills.aging import refresh_receivable_aging
+from bills.models import MonthlyBill
+from bills.rollup import refresh_billing_rollup
+from bills.signals import notify_users
+from .ledger import record_bills_paid
+from .models import PaymentRecord
+
+# Bills due this many days before or after a statement line can match it
+RECONCILIATION_WINDOW_DAYS = 45
+
+# Accepted header names of each statement column (case and spacing are ignored)
+STATEMENT_COLUMNS = {
+    'date': ['date', 'transaction date', 'posting date', 'value date', 'payment date'],
+    'amount': ['amount', 'credit', 'amount paid', 'deposit'],
+    'reference': ['reference', 'reference number', 'reference no', 'ref', 'ref no', 'transaction id'],
+    'unit': ['unit', 'unit name', 'unit no'],
+    'building': ['building'],
+}
+
+STATEMENT_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%Y/%m/%d', '%b %d, %Y', '%d %b %Y', '%B %d, %Y']
+
+re_not_amount = re.compile(r'[^\d.\-]')
+
+
+class StatementError(Exception):
+    """The uploaded statement can't be read (e.g. required columns are missing)."""
+
+
+def normalize(value):
+    return ' '.join((value or '').split()).casefold()
+
+
+def parse_date(value):
+    value = (value or '').strip()
+    for date_format in STATEMENT_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            pass
+    return None
+
+
+def parse_amount(value):
+    try:
+        amount = Decimal(re_not_amount.sub('', value or ''))
+    except InvalidOperation:
+        return None
+    return amount.quantize(Decimal('0.01')) if amount > 0 else None
+
+
+def read_statement(text):
+    """
+    Statement lines of a bank / e-wallet CSV export: dicts with ``line``,
+    ``date``, ``amount``, ``reference``, ``unit`` and ``building`` (the last
+    three may be empty). Unparseable dates or amounts are left as None.
+    """
+    reader = csv.reader(io.StringIO(text.lstrip('\ufeff')))
+    header = [normalize(column) for column in next(reader, [])]
+    columns = {}
+    for name, aliases in STATEMENT_COLUMNS.items():
+        for alias in aliases:
+            if alias in header:
+                columns[name] = header.index(alias)
+                break
+    missing = {'date', 'amount'} - columns.keys()
+    if missing:
+        raise StatementError(f"Missing column(s): {', '.join(sorted(missing))}.")
+
+    def cell(row, name):
+        index = columns.get(name)
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    lines = []
+    for number, row in enumerate(reader, start=2):
+        if not any(value.strip() for value in row):
+            continue
+        lines.append({
+            'line': number,
+            'date': parse_date(cell(row, 'date')),
+            'amount': parse_amount(cell(row, 'amount')),
+            'reference': cell(row, 'reference'),
+            'unit': cell(row, 'unit'),
+            'building': cell(row, 'building'),
+        })
+    return lines
+
+
+class StatementMatcher:
+    """
+    Pairs statement lines with open (pending) bills.
+
+    The open bills of the statement's date range and their pending payments are
+    read once and indexed in memory, so matching costs a few queries whatever
+    the number of lines. Rules, in order:
+
+    - reference: a pending payment with the line's reference number and amount
+      (the resident's own submission awaiting verification)
+    - unit_amount: a bill of the line's unit (and building, when given) for the
+      line's amount, due within ``window_days`` of the line's date
+    - amount: only with ``allow_amount_only``, no unit on the line and exactly
+      one open bill for the amount
+
+    When the candidates all belong to one resident and unit, the oldest bill is
+    taken (payments settle the oldest month first); otherwise the line is
+    ambiguous. A bill is matched at most once, and a reference at most once per
+    statement: a repeated line is reported rather than paying a second bill.
+    """
+
+    def __init__(self, lines, window_days=RECONCILIATION_WINDOW_DAYS, allow_amount_only=False):
+        self.lines = lines
+        self.window = timedelta(days=window_days)
+        self.allow_amount_only = allow_amount_only
+        self.claimed = set()
+
+        dates = [line['date'] for line in lines if line['date']]
+        bills = MonthlyBill.objects.none()
+        if dates:
+            bills = MonthlyBill.objects.filter(
+                payment_status=MonthlyBill.PaymentStatus.PENDING,
+                due_date__gte=min(dates) - self.window,
+                due_date__lte=max(dates) + self.window,
+            ).select_related('unit').only(
+                'id', 'user_id', 'unit_id', 'amount_due', 'due_date', 'payment_status', 'due_status',
+                'unit__unit_name', 'unit__building',
+            ).order_by('due_date', 'id')
+        self.bills = {bill.pk: bill for bill in bills}
+
+        self.by_unit_amount = defaultdict(list)
+        self.by_amount = defaultdict(list)
+        for bill in self.bills.values():
+            amount = bill.amount_due.quantize(Decimal('0.01'))
+            if bill.unit is not None:
+                self.by_unit_amount[(normalize(bill.unit.unit_name), amount)].append(bill)
+            self.by_amount[amount].append(bill)
+
+        self.pending_by_reference = defaultdict(list)
+        self.pending_by_bill = {}
+        rejected_by_bill = {}
+        for payment in PaymentRecord.objects.filter(
+            bill_id__in=list(self.bills),
+            status__in=[PaymentRecord.PaymentStatus.PENDING, PaymentRecord.PaymentStatus.REJECTED],
+        ).only('id', 'user_id', 'bill_id', 'amount', 'reference_number', 'payment_date', 'status').order_by('id'):
+            if payment.status == PaymentRecord.PaymentStatus.REJECTED:
+                if payment.user_id == self.bills[payment.bill_id].user_id:
+                    rejected_by_bill.setdefault(payment.bill_id, payment)
+                continue
+            self.pending_by_bill.setdefault(payment.bill_id, payment)
+            if payment.reference_number:
+                self.pending_by_reference[normalize(payment.reference_number)].append(payment)
+        # A bill holds one payment per resident (paymentrecord_unique_user_bill),
+        # so a resident's rejected submission is completed rather than a new
+        # payment created when the statement shows the bill paid after all
+        for bill_id, payment in rejected_by_bill.items():
+            self.pending_by_bill.setdefault(bill_id, payment)
+
+        references = {line['reference'] for line in lines if line['reference']}
+        self.completed_references = {
+            normalize(reference) for reference in PaymentRecord.objects.filter(
+                reference_number__in=references, status=PaymentRecord.PaymentStatus.COMPLETED,
+            ).values_list('reference_number', flat=True)
+        }
+
+    def match(self):
+        """A dict of ``matched`` / ``ambiguous`` / ``unmatched`` lines (see ``reconcile``)."""
+        report = {'matched': [], 'ambiguous': [], 'unmatched': []}
+        # Reference matches are exact, so they claim their bills first
+        pending = []
+        references = set()
+        for line in self.lines:
+            reference = normalize(line['reference'])
+            if line['date'] is None or line['amount'] is None:
+                report['unmatched'].append({**line, 'reason': 'invalid date or amount'})
+            elif reference and reference in self.completed_references:
+                report['unmatched'].append({**line, 'reason': 'reference already recorded'})
+            elif reference and reference in references:
+                report['unmatched'].append({**line, 'reason': 'duplicate reference in statement'})
+            else:
+                if reference:
+                    references.add(reference)
+                if not self.match_reference(line, report):
+                    pending.append(line)
+
+        for line in pending:
+            if not line['unit'] and not self.allow_amount_only:
+                report['unmatched'].append({**line, 'reason': 'no unit'})
+                continue
+            if line['unit']:
+                candidates = [
+                    bill for bill in self.by_unit_amount[(normalize(line['unit']), line['amount'])]
+                    if not line['building'] or normalize(bill.unit.building) == normalize(line['building'])
+                ]
+                rule = 'unit_amount'
+            else:
+                candidates = self.by_amount[line['amount']]
+                rule = 'amount'
+            candidates = [
+                bill for bill in candidates
+                if bill.pk not in self.claimed and abs(bill.due_date - line['date']) <= self.window
+            ]
+
+            if not candidates:
+                report['unmatched'].append({**line, 'reason': 'no open bill'})
+            elif len({(bill.user_id, bill.unit_id) for bill in candidates}) > 1 or (rule == 'amount' and len(candidates) > 1):
+                report['ambiguous'].append({**line, 'candidates': [bill.pk for bill in candidates]})
+            else:
+                self.claim(line, candidates[0], rule, report)
+        return report
+
+    def match_reference(self, line, report):
+        for payment in self.pending_by_reference.get(normalize(line['reference']), []) if line['reference'] else []:
+            if payment.bill_id not in self.claimed and payment.amount == line['amount']:
+                self.claim(line, self.bills[payment.bill_id], 'reference', report)
+                return True
+        return False
+
+    def claim(self, line, bill, rule, report):
+        self.claimed.add(bill.pk)
+        report['matched'].append({
+            **line,
+            'rule': rule,
+            'bill': bill,
+            'payment': self.pending_by_bill.get(bill.pk),
+        })
+
+
+def reconcile(text, payment_method, window_days=RECONCILIATION_WINDOW_DAYS, dry_run=False, allow_amount_only=False):
+    """
+    Reconcile a statement CSV: match its lines to open bills and, unless
+    ``dry_run``, record the matches in one transaction. Lines without a unit
+    or a known reference are only matched on their amount with
+    ``allow_amount_only``.
+
+    A matched bill's pending payment (or its resident's rejected one) is
+    completed (dated with the statement line); bills without one get a new completed ``PaymentRecord`` with
+    ``payment_method``. Matched bills are marked paid with one ``update()``,
+    and the ledger, billing rollup, receivables aging and notifications are
+    brought up to date for the whole batch.
+
+    Returns the report: ``matched`` / ``ambiguous`` / ``unmatched`` lines and
+    their counts.
+    """
+    lines = read_statement(text)
+    report = StatementMatcher(lines, window_days, allow_amount_only).match()
+
+    if report['matched'] and not dry_run:
+        for match in apply_matches(report['matched'], payment_method):
+            report['matched'].remove(match)
+            report['unmatched'].append({**match, 'reason': 'bill paid meanwhile'})
+
+    return {
+        'dry_run': dry_run,
+        'lines': len(lines),
+        'counts': {key: len(value) for key, value in report.items()},
+        'matched': [
+            {**serialize_line(line), 'rule': line['rule'], 'bill': line['bill'].pk, 'user': line['bill'].user_id,
+             'payment': line['payment'].pk if line['payment'] else None}
+            for line in report['matched']
+        ],
+        'ambiguous': [{**serialize_line(line), 'candidates': line['candidates']} for line in report['ambiguous']],
+        'unmatched': [{**serialize_line(line), 'reason': line['reason']} for line in report['unmatched']],
+    }
+
+
+def serialize_line(line):
+    return {
+        'line': line['line'],
+        'date': line['date'],
+        'amount': line['amount'],
+        'reference': line['reference'],
+        'unit': line['unit'],
+    }
+
+
+def apply_matches(matches, payment_method):
+    """
+    Record matched statement lines (see ``reconcile``). Returns the matches
+    left out because their bill was paid since it was matched.
+    """
+    paid_at = now()
+    with transaction.atomic():
+        still_open = set(
+            MonthlyBill.objects.select_for_update()
+            .filter(pk__in=[match['bill'].pk for match in matches], payment_status=MonthlyBill.PaymentStatus.PENDING)
+            .values_list('pk', flat=True)
+        )
+        stale = [match for match in matches if match['bill'].pk not in still_open]
+        matches = [match for match in matches if match['bill'].pk in still_open]
+
+        completed, created = [], []
+        for match in matches:
+            bill = match['bill']
+            payment_date = datetime.combine(match['date'], datetime.min.time(), tzinfo=paid_at.tzinfo)
+            payment = match['payment']
+            if payment is not None:
+                payment.status = PaymentRecord.PaymentStatus.COMPLETED
+                payment.payment_date = payment_date
+                payment.reference_number = payment.reference_number or match['reference'] or None
+                payment.updated_at = paid_at
+                completed.append(payment)
+            else:
+                match['payment'] = PaymentRecord(
+                    user_id=bill.user_id,
+                    unit_id=bill.unit_id,
+                    bill_id=bill.pk,
+                    amount=match['amount'],
+                    status=PaymentRecord.PaymentStatus.COMPLETED,
+                    payment_type=PaymentRecord.PaymentType.REGULAR,
+                    payment_date=payment_date,
+                    reference_number=match['reference'] or None,
+                    payment_method=payment_method,
+                )
+                created.append(match['payment'])
+            bill.payment_status = MonthlyBill.PaymentStatus.PAID
+            bill.due_status = MonthlyBill.DueStatus.DONE
+
+        PaymentRecord.objects.bulk_update(
+            completed, ['status', 'payment_date', 'reference_number', 'updated_at'], batch_size=500
+        )
+        PaymentRecord.objects.bulk_create(created, batch_size=500)
+        MonthlyBill.objects.filter(pk__in=still_open).update(
+            payment_status=MonthlyBill.PaymentStatus.PAID,
+            due_status=MonthlyBill.DueStatus.DONE,
+            updated_at=paid_at,
+        )
+
+        # bulk_create(), bulk_update() and update() skip the model signals
+        bills = [match['bill'] for match in matches]
+        record_bills_paid(bills, {match['bill'].pk: match['payment'].pk for match in matches})
+        refresh_billing_rollup({(bill.due_date.year, bill.due_date.month) for bill in bills})
+        refresh_receivable_aging({bill.user_id for bill in bills})
+        notify_users({bill.user_id for bill in bills})
+    return stale
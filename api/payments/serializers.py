@@ -1,7 +1,9 @@
 from rest_framework import serializers
-from .models import PaymentRecord, PaymentMethod
+from rest_framework.settings import api_settings
+from .models import PaymentRecord, PaymentMethod, LedgerAccount, LedgerEntry
 from users.serializers import UserSerializer
 from bills.serializers import MonthlyBillSerializer
+from api.mixins import EagerLoadingMixin, UniqueConflictMixin
 from django.utils.timezone import now
 # Serializer for creating a payment method
 class CreatePaymentMethodSerializer(serializers.ModelSerializer):
@@ -13,7 +15,7 @@ class CreatePaymentMethodSerializer(serializers.ModelSerializer):
 
 
 # Serializer for creating a payment record
-class CreatePaymentSerializer(serializers.ModelSerializer):
+class CreatePaymentSerializer(UniqueConflictMixin, serializers.ModelSerializer):
     advance_start_date = serializers.DateField(required=False, allow_null=True)
     advance_end_date = serializers.DateField(required=False, allow_null=True)
 
@@ -32,6 +34,9 @@ class CreatePaymentSerializer(serializers.ModelSerializer):
                   'advance_start_date',
                   'advance_end_date'
                 ]
+        # A second payment for the same user and bill is rejected by the
+        # paymentrecord_unique_user_bill constraint on save
+        validators = []
 
     def validate_amount(self, value):
         if value <= 0:
@@ -42,21 +47,6 @@ class CreatePaymentSerializer(serializers.ModelSerializer):
         payment_type = data.get('payment_type', PaymentRecord.PaymentType.REGULAR)
         advance_start_date = data.get('advance_start_date')
         advance_end_date = data.get('advance_end_date')
-        user = data.get('user')
-        bill = data.get('bill')
-        
-        # Check for duplicate payment (user + bill combination)
-        if user and bill:
-            # Check if a payment already exists for this user and bill
-            existing_payment = PaymentRecord.objects.filter(
-                user=user,
-                bill=bill
-            ).exists()
-            
-            if existing_payment:
-                raise serializers.ValidationError(
-                    f"Your payment for bill of {bill.due_date.strftime("%B %d, %Y")} has already been processed..."
-                )
         
         if payment_type == PaymentRecord.PaymentType.ADVANCE:
             if not advance_start_date or not advance_end_date:
@@ -75,13 +65,30 @@ class CreatePaymentSerializer(serializers.ModelSerializer):
                 )
         
         return data
+
+    def unique_conflict_detail(self):
+        bill = self.validated_data.get('bill') or getattr(self.instance, 'bill', None)
+        return {api_settings.NON_FIELD_ERRORS_KEY: [
+            f"Your payment for bill of {bill.due_date.strftime("%B %d, %Y")} has already been processed..."
+        ]}
     
-class GetPaymentSerializer(serializers.ModelSerializer):
+def unit_label(unit_id, unit_name):
+    """``str(unit)`` from the column values (for row projections)."""
+    return None if unit_id is None else unit_name or "Unnamed Unit"
+
+
+class GetPaymentSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     unit = serializers.StringRelatedField()
     payment_method = serializers.StringRelatedField()
     bill = MonthlyBillSerializer(read_only=True)
 
+    # StringRelatedField values for api.projection.RowProjector (Unit / PaymentMethod __str__)
+    row_projections = {
+        "unit": (("unit", "unit__unit_name"), unit_label),
+        "payment_method": (("payment_method__name",), str),
+    }
+
     class Meta:
         model = PaymentRecord
         fields = ['id', 
@@ -100,4 +107,20 @@ class GetPaymentSerializer(serializers.ModelSerializer):
                   'advance_start_date',
                   'advance_end_date'
                 ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class LedgerAccountSerializer(serializers.ModelSerializer):
+    unit = serializers.StringRelatedField()
+
+    class Meta:
+        model = LedgerAccount
+        fields = ['id', 'user', 'unit', 'balance', 'total_charged', 'total_paid', 'total_credited', 'last_entry_at']
+        read_only_fields = fields
+
+
+class LedgerEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = LedgerEntry
+        fields = ['id', 'kind', 'amount', 'balance_after', 'bill', 'payment', 'description', 'posted_at']
+        read_only_fields = fields
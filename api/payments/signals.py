@@ -0,0 +1,54 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from bills.models import MonthlyBill
+from .ledger import record_advance_change, record_bill_change
+from .models import PaymentRecord
+
+
+def deleted_directly(origin, model):
+    """
+    Whether a delete started from ``model`` (an instance or queryset of it).
+    Rows removed by the cascade of a user or unit delete take their ledger
+    accounts with them, so nothing is posted for them.
+    """
+    return isinstance(origin, model) or getattr(origin, 'model', None) is model
+
+
+@receiver(post_save, sender=MonthlyBill)
+def post_bill_to_ledger(sender, instance, raw=False, **kwargs):
+    # The persisted state is read by bills.signals.remember_persisted_state
+    if raw:
+        return
+    record_bill_change(instance, getattr(instance, '_ledger_state', None), instance.ledger_state())
+
+
+@receiver(post_delete, sender=MonthlyBill)
+def remove_bill_from_ledger(sender, instance, origin=None, **kwargs):
+    if deleted_directly(origin, MonthlyBill):
+        record_bill_change(instance, instance.ledger_state(), None)
+
+
+@receiver(pre_save, sender=PaymentRecord)
+def remember_advance_state(sender, instance, raw=False, **kwargs):
+    instance._advance_state = None
+    if raw or instance.pk is None:
+        return
+    persisted = PaymentRecord.objects.filter(pk=instance.pk).only(
+        "user_id", "unit_id", "amount", "status", "payment_type"
+    ).first()
+    if persisted is not None:
+        instance._advance_state = persisted.advance_state()
+
+
+@receiver(post_save, sender=PaymentRecord)
+def post_advance_to_ledger(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    record_advance_change(instance, getattr(instance, '_advance_state', None), instance.advance_state())
+
+
+@receiver(pre_delete, sender=PaymentRecord)
+def remove_advance_from_ledger(sender, instance, origin=None, **kwargs):
+    # Posted before the delete, while the payment's entries still point at it
+    if deleted_directly(origin, PaymentRecord) or deleted_directly(origin, MonthlyBill):
+        record_advance_change(instance, instance.advance_state(), None)
@@ -1,3 +1,248 @@
-from django.test import TestCase
+from datetime import date
+from decimal import Decimal
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from rest_framework.test import APIRequestFactory, APITestCase
+from bills.models import MonthlyBill
+from bills.views import UserYearlyBillSummaryView
+from units.models import Unit
+from users.models import CustomUser
+from .ledger import rebuild_ledger
+from .models import LedgerAccount, PaymentMethod, PaymentRecord
 
-# Create your tests here.
+
+class LedgerTests(APITestCase):
+    """Running balances follow bill and advance-payment changes and match a rebuild."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.neighbour = CustomUser.objects.create(username="neighbour", role="resident")
+        self.method = PaymentMethod.objects.create(name="GCash")
+
+    def add_bill(self, user, amount):
+        return MonthlyBill.objects.create(user=user, amount_due=Decimal(amount), due_date=date(2025, 1, 5))
+
+    def balance(self, user):
+        return LedgerAccount.objects.get(user=user, unit=None).balance
+
+    def test_balance_follows_bills_and_advance_credit(self):
+        bill = self.add_bill(self.resident, "1000.00")
+        self.add_bill(self.resident, "500.00")
+        self.assertEqual(self.balance(self.resident), Decimal("1500.00"))
+
+        bill.payment_status = MonthlyBill.PaymentStatus.PAID
+        bill.save()
+        self.assertEqual(self.balance(self.resident), Decimal("500.00"))
+
+        advance = PaymentRecord.objects.create(
+            user=self.resident, amount=Decimal("2000.00"), payment_method=self.method,
+            payment_type=PaymentRecord.PaymentType.ADVANCE, status=PaymentRecord.PaymentStatus.COMPLETED,
+        )
+        self.assertEqual(self.balance(self.resident), Decimal("-1500.00"))
+
+        account = LedgerAccount.objects.get(user=self.resident)
+        self.assertEqual(account.entries.order_by("-id").first().balance_after, account.balance)
+
+        advance.delete()
+        bill.delete()
+        self.assertEqual(self.balance(self.resident), Decimal("500.00"))
+
+        rebuild_ledger()
+        self.assertEqual(self.balance(self.resident), Decimal("500.00"))
+
+    def test_residents_only_see_their_accounts(self):
+        self.add_bill(self.resident, "1000.00")
+        neighbour_account = LedgerAccount.objects.get(user=self.add_bill(self.neighbour, "700.00").user)
+        self.client.force_authenticate(self.resident)
+
+        response = self.client.get(reverse("ledger-accounts"))
+        self.assertEqual([row["balance"] for row in response.json()["results"]], ["1000.00"])
+
+        response = self.client.get(reverse("ledger-entries", args=[neighbour_account.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_report_views_read_the_ledger_balance(self):
+        self.add_bill(self.resident, "1000.00")
+        paid = self.add_bill(self.neighbour, "700.00")
+        paid.payment_status = MonthlyBill.PaymentStatus.PAID
+        paid.save()
+        self.add_bill(self.neighbour, "300.00")
+        # A balance that no bill aggregate gives: the ledger is the source
+        LedgerAccount.objects.filter(user=self.resident).update(balance=Decimal("1234.00"), total_paid=Decimal("99.00"))
+        self.client.force_authenticate(CustomUser.objects.create(username="admin", role="admin"))
+
+        rows = self.client.get(reverse("overdues-accounts")).json()
+        self.assertEqual(
+            {row["user"]: (row["outstandingBalance"], row["totalPaid"]) for row in rows},
+            {"resident": (1234.0, 99.0), "neighbour": (300.0, 700.0)},
+        )
+
+        response = self.client.get(
+            reverse("user-financial-reports", args=[self.resident.pk]), {"period": "yearly", "year": 2025}
+        )
+        summary = response.json()["summary"]
+        self.assertEqual((summary["outstanding_balance"], summary["lifetime_total_paid"]), (1234.0, 99.0))
+
+        request = APIRequestFactory().get("/")
+        response = UserYearlyBillSummaryView.as_view()(request, user_id=self.neighbour.pk)
+        summary = response.data["summary"]
+        self.assertEqual((summary["outstanding_balance"], summary["lifetime_total_paid"]), (300, 700))
+
+    def test_account_statement(self):
+        bill = self.add_bill(self.resident, "1000.00")
+        bill.payment_status = MonthlyBill.PaymentStatus.PAID
+        bill.save()
+        account = LedgerAccount.objects.get(user=self.resident)
+        self.client.force_authenticate(self.resident)
+
+        response = self.client.get(reverse("ledger-entries", args=[account.pk]), {"pagination": "keyset"})
+        self.assertEqual(
+            [(row["kind"], row["amount"], row["balance_after"]) for row in response.json()["results"]],
+            [("payment", "-1000.00", "0.00"), ("charge", "1000.00", "1000.00")],
+        )
+
+
+class AdvanceAllocationTests(APITestCase):
+    """Advance payments cover one bill per month of their period, in one batch."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.unit = Unit.objects.create(unit_name="Unit 1", building="A", rent_amount=Decimal("1000.00"))
+        self.method = PaymentMethod.objects.create(name="GCash")
+
+    def advance(self, start, end, amount="4000.00"):
+        return PaymentRecord.objects.create(
+            user=self.resident, unit=self.unit, amount=Decimal(amount), payment_method=self.method,
+            payment_type=PaymentRecord.PaymentType.ADVANCE, status=PaymentRecord.PaymentStatus.COMPLETED,
+            advance_start_date=start, advance_end_date=end,
+        )
+
+    def test_month_end_start_date(self):
+        payment = self.advance(date(2027, 1, 31), date(2027, 4, 30))
+        self.assertEqual(payment.allocate_advance_payment(), 4)
+        self.assertEqual(
+            list(MonthlyBill.objects.order_by("due_date").values_list("due_date", flat=True)),
+            [date(2027, 1, 31), date(2027, 2, 28), date(2027, 3, 31), date(2027, 4, 30)],
+        )
+
+    def test_pending_bills_are_settled_and_allocation_runs_once(self):
+        MonthlyBill.objects.create(user=self.resident, unit=self.unit, amount_due=Decimal("1000.00"), due_date=date(2027, 2, 5))
+        payment = self.advance(date(2027, 1, 5), date(2028, 12, 5), amount="24000.00")
+
+        self.assertEqual(payment.allocate_advance_payment(), 23)
+        self.assertEqual(payment.advance_months_paid, 24)
+        self.assertFalse(MonthlyBill.objects.filter(payment_status=MonthlyBill.PaymentStatus.PENDING).exists())
+        self.assertEqual(LedgerAccount.objects.get(user=self.resident, unit=self.unit).balance, Decimal("0.00"))
+
+        self.assertIsNone(payment.allocate_advance_payment())
+        self.assertEqual(MonthlyBill.objects.count(), 24)
+
+
+class DuplicatePaymentTests(APITestCase):
+    """A second payment for the same bill is rejected by the database constraint."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.method = PaymentMethod.objects.create(name="GCash")
+        self.bill = MonthlyBill.objects.create(user=self.resident, amount_due=Decimal("1000.00"), due_date=date(2025, 1, 5))
+        self.client.force_authenticate(self.resident)
+
+    def pay(self):
+        return self.client.post(reverse("create_payment"), {
+            "user": self.resident.pk, "amount": "1000.00", "payment_method": self.method.pk, "bill": self.bill.pk,
+        })
+
+    def test_second_payment_is_a_validation_error(self):
+        self.assertEqual(self.pay().status_code, 201)
+        response = self.pay()
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("already been processed", response.json()["non_field_errors"][0])
+        self.assertEqual(PaymentRecord.objects.count(), 1)
+
+
+class ReconciliationTests(APITestCase):
+    """Statement lines are matched to open bills and recorded in bulk."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create(username="admin", role="admin")
+        self.method = PaymentMethod.objects.create(name="Bank")
+        self.bills = {}
+        for name, building in [("101", "A"), ("102", "A"), ("101", "B")]:
+            unit = Unit.objects.create(unit_name=name, building=building, rent_amount=Decimal("1000.00"))
+            resident = CustomUser.objects.create(username=f"resident-{building}{name}", role="resident")
+            self.bills[building + name] = MonthlyBill.objects.create(
+                user=resident, unit=unit, amount_due=Decimal("1000.00"), due_date=date(2025, 3, 5)
+            )
+        self.pending = PaymentRecord.objects.create(
+            user=self.bills["A102"].user, unit=self.bills["A102"].unit, bill=self.bills["A102"],
+            amount=Decimal("1000.00"), payment_method=self.method, reference_number="GC-77",
+        )
+        self.client.force_authenticate(self.admin)
+
+    STATEMENT = [
+        "03/04/2025,GC-77,1000.00,,",
+        "03/06/2025,BK-2,1000.00,101,",
+        "03/06/2025,BK-1,\"PHP 1,000.00\",101,B",
+        "03/06/2025,BK-3,999.00,101,A",
+    ]
+
+    def reconcile(self, dry_run=False, lines=STATEMENT, **data):
+        statement = "\n".join(["Transaction Date,Reference No,Amount,Unit,Building", *lines])
+        response = self.client.post(reverse("reconcile-statement"), {
+            "statement": SimpleUploadedFile("statement.csv", statement.encode(), "text/csv"),
+            "payment_method": self.method.pk,
+            "dry_run": "true" if dry_run else "false",
+            **data,
+        }, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_dry_run_reports_without_recording(self):
+        report = self.reconcile(dry_run=True)
+        self.assertEqual(report["counts"], {"matched": 2, "ambiguous": 1, "unmatched": 1})
+        self.assertEqual(
+            [(line["rule"], line["bill"]) for line in report["matched"]],
+            [("reference", self.bills["A102"].pk), ("unit_amount", self.bills["B101"].pk)],
+        )
+        self.assertFalse(MonthlyBill.objects.filter(payment_status=MonthlyBill.PaymentStatus.PAID).exists())
+
+    def test_matches_are_recorded(self):
+        self.reconcile()
+        self.assertEqual(
+            set(MonthlyBill.objects.filter(payment_status=MonthlyBill.PaymentStatus.PAID).values_list("pk", flat=True)),
+            {self.bills["A102"].pk, self.bills["B101"].pk},
+        )
+        self.pending.refresh_from_db()
+        self.assertEqual(self.pending.status, PaymentRecord.PaymentStatus.COMPLETED)
+        self.assertTrue(PaymentRecord.objects.filter(bill=self.bills["B101"], reference_number="BK-1").exists())
+        self.assertEqual(LedgerAccount.objects.get(user=self.bills["B101"].user).balance, Decimal("0.00"))
+
+        # Recorded references aren't matched twice
+        report = self.reconcile()
+        self.assertEqual(
+            [line["reference"] for line in report["unmatched"] if line["reason"] == "reference already recorded"],
+            ["GC-77", "BK-1"],
+        )
+
+    def test_repeated_reference_is_not_matched_twice(self):
+        report = self.reconcile(dry_run=True, lines=[
+            "03/06/2025,BK-1,1000.00,101,B",
+            "03/06/2025,bk-1,1000.00,101,A",
+        ])
+        self.assertEqual([line["bill"] for line in report["matched"]], [self.bills["B101"].pk])
+        self.assertEqual(
+            [(line["line"], line["reason"]) for line in report["unmatched"]],
+            [(3, "duplicate reference in statement")],
+        )
+
+    def test_amount_only_matching_is_opt_in(self):
+        resident = CustomUser.objects.create(username="resident-C1", role="resident")
+        unit = Unit.objects.create(unit_name="1", building="C", rent_amount=Decimal("1234.50"))
+        bill = MonthlyBill.objects.create(user=resident, unit=unit, amount_due=Decimal("1234.50"), due_date=date(2025, 3, 5))
+        lines = ["03/06/2025,BK-9,1234.50,,"]
+
+        report = self.reconcile(dry_run=True, lines=lines)
+        self.assertEqual([line["reason"] for line in report["unmatched"]], ["no unit"])
+
+        report = self.reconcile(dry_run=True, lines=lines, allow_amount_only="true")
+        self.assertEqual([(line["rule"], line["bill"]) for line in report["matched"]], [("amount", bill.pk)])
@@ -1,6 +1,6 @@
 from django.urls import path
 from . import views
-from .views import PaginatedPayments
+from .views import PaginatedPayments, LedgerAccountList, LedgerEntryList
 
 urlpatterns = [
     path('payment-methods', views.get_payment_methods, name='get_payment_methods'),
@@ -17,6 +17,10 @@ urlpatterns = [
     path('payment/<int:pk>/delete/', views.delete_payment_by_id, name='delete_payment_by_id'),
 
     path('payment/pendings', views.get_total_pendings),
+    path('payments/reconcile', views.reconcile_statement, name='reconcile-statement'),
+
+    path('ledger/accounts', LedgerAccountList.as_view(), name='ledger-accounts'),
+    path('ledger/accounts/<int:pk>/entries', LedgerEntryList.as_view(), name='ledger-entries'),
 
     path('calculate-advance/', views.calculate_advance_payment, name='calculate-advance'),
     path('advance-payments/<int:user_id>/', views.get_advance_payments, name='get-advance-payments'),
@@ -1,13 +1,20 @@
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status, filters
 from django.contrib.auth import get_user_model
-from .serializers import CreatePaymentSerializer, CreatePaymentMethodSerializer, GetPaymentSerializer
-from .models import PaymentRecord, PaymentMethod
+from .serializers import (
+    CreatePaymentSerializer, CreatePaymentMethodSerializer, GetPaymentSerializer,
+    LedgerAccountSerializer, LedgerEntrySerializer,
+)
+from .models import PaymentRecord, PaymentMethod, LedgerAccount, LedgerEntry
+from .reconciliation import RECONCILIATION_WINDOW_DAYS, StatementError, reconcile
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.generics import ListAPIView
+from rest_framework.generics import ListAPIView, get_object_or_404
+from api.mixins import EagerLoadingViewMixin, SparseFieldsViewMixin, apply_eager_loading, apply_sparse_fields
+from api.projection import RowProjector
 from django_filters.rest_framework import DjangoFilterBackend
 from units.models import Unit, AssignedUnit
+from bills.services import monthly_due_dates
 User = get_user_model()
 
 # Create your views here.
@@ -111,15 +118,17 @@ def create_payment(request):
 @api_view(['GET'])
 def get_payments(request):
     payments = PaymentRecord.objects.all()
-    serializer = GetPaymentSerializer(payments, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    # values()-based serialization, same JSON as GetPaymentSerializer (api.projection)
+    serializer = apply_sparse_fields(GetPaymentSerializer(), request.query_params)
+    data = RowProjector(serializer).project(payments)
+    return Response(data, status=status.HTTP_200_OK)
 
 
 # Get payment record by ID
 @api_view(['GET'])
 def get_payment_by_id(request, pk):
     try:
-        payment = PaymentRecord.objects.get(pk=pk)
+        payment = GetPaymentSerializer.eager_load(PaymentRecord.objects.all()).get(pk=pk)
     except PaymentRecord.DoesNotExist:
         return Response({"error": "Payment record not found."}, status=status.HTTP_404_NOT_FOUND)
     
@@ -184,13 +193,8 @@ def calculate_advance_payment(request):
         if start >= end:
             return Response({"error": "Start date must be before end date."}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Calculate number of months
-        from dateutil.relativedelta import relativedelta
-        months = 0
-        current = start
-        while current <= end:
-            months += 1
-            current = current + relativedelta(months=1)
+        # Calculate number of months (the bills allocate_advance_payment covers)
+        months = len(monthly_due_dates(start, end))
         
         # Calculate monthly amount
         monthly_rent = float(unit.rent_amount)
@@ -249,7 +253,7 @@ def delete_payment_by_id(request, pk):
     return Response({'message': 'Successfull deleted payment'}, status=status.HTTP_200_OK)
 
 
-class PaginatedPayments(ListAPIView):
+class PaginatedPayments(SparseFieldsViewMixin, EagerLoadingViewMixin, ListAPIView):
     queryset = PaymentRecord.objects.all().order_by('-created_at')
     serializer_class = GetPaymentSerializer
     permission_classes = [IsAuthenticated]
@@ -270,6 +274,93 @@ class PaginatedPayments(ListAPIView):
     ]
     ordering_fields = ['amount', 'created_at', 'bill__due_date', 'advance_start_date'] # allow sorting by amount and date
     ordering = ['-advance_start_date', '-bill__due_date']  # default order
+    keyset_ordering = ('-created_at', '-id')  # ?pagination=keyset (see api.pagination)
+
+
+######################################################################
+######################## Ledger ######################################
+######################################################################
+
+
+def ledger_accounts_for(user):
+    """Every account for admins/employees, a resident's own accounts otherwise."""
+    accounts = LedgerAccount.objects.all()
+    if user.role not in ["admin", "employee"]:
+        accounts = accounts.filter(user=user)
+    return accounts
+
+
+class LedgerAccountList(ListAPIView):
+    """Outstanding balances, one row per resident and unit (read from the running totals)."""
+    serializer_class = LedgerAccountSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['user', 'unit']
+    ordering_fields = ['balance', 'last_entry_at']
+    ordering = ['-balance', 'id']
+
+    def get_queryset(self):
+        return apply_eager_loading(ledger_accounts_for(self.request.user), self.get_serializer())
+
+
+class LedgerEntryList(ListAPIView):
+    """Statement of one ledger account, newest entries first."""
+    serializer_class = LedgerEntrySerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = []
+    keyset_ordering = ('-id',)  # ?pagination=keyset (see api.pagination)
+
+    def get_queryset(self):
+        account = get_object_or_404(ledger_accounts_for(self.request.user), pk=self.kwargs['pk'])
+        return account.entries.order_by('-id')
+
+
+######################################################################
+######################## Reconciliation ##############################
+######################################################################
+
+
+# Reconcile a bank / e-wallet statement against the open bills
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def reconcile_statement(request):
+    """
+    Body (multipart):
+    - statement: CSV export with date and amount columns, and optionally
+      reference, unit and building (see payments.reconciliation)
+    - payment_method: id of the method recorded on new payments
+    - window_days: how far a bill's due date may be from the line's date (default 45)
+    - dry_run: 'true' to only report the matches
+    - allow_amount_only: 'true' to match lines without a unit on their amount alone
+    """
+    if request.user.role not in ["admin", "employee"]:
+        return Response({"detail": "You are not authorized to reconcile payments."}, status=status.HTTP_403_FORBIDDEN)
+
+    statement = request.FILES.get('statement')
+    if statement is None:
+        return Response({"error": "A statement CSV file is required."}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        payment_method = PaymentMethod.objects.get(pk=request.data.get('payment_method'))
+    except (PaymentMethod.DoesNotExist, ValueError, TypeError):
+        return Response({"error": "Payment method not found."}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        window_days = int(request.data.get('window_days', RECONCILIATION_WINDOW_DAYS))
+    except (TypeError, ValueError):
+        return Response({"error": "window_days must be a whole number."}, status=status.HTTP_400_BAD_REQUEST)
+    dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+    allow_amount_only = str(request.data.get('allow_amount_only', '')).lower() in ('1', 'true', 'yes')
+
+    try:
+        report = reconcile(
+            statement.read().decode('utf-8-sig', errors='replace'),
+            payment_method,
+            window_days=window_days,
+            dry_run=dry_run,
+            allow_amount_only=allow_amount_only,
+        )
+    except StatementError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report, status=status.HTTP_200_OK)
 
 
 ######################################################################
@@ -310,13 +401,8 @@ def calculate_advance_payment(request):
         if start >= end:
             return Response({"error": "Start date must be before end date."}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Calculate number of months
-        from dateutil.relativedelta import relativedelta
-        months = 0
-        current = start
-        while current <= end:
-            months += 1
-            current = current + relativedelta(months=1)
+        # Calculate number of months (the bills allocate_advance_payment covers)
+        months = len(monthly_due_dates(start, end))
         
         # Calculate monthly amount
         monthly_rent = float(unit.rent_amount)
@@ -363,17 +449,17 @@ def calculate_advance_payment(request):
         return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
 
-api_view(['GET'])
+@api_view(['GET'])
 def get_advance_payments(request, user_id):
     """
     Get all advance payments for a specific user
     """
     try:
         user = User.objects.get(pk=user_id)
-        advance_payments = PaymentRecord.objects.filter(
+        advance_payments = GetPaymentSerializer.eager_load(PaymentRecord.objects.filter(
             user=user,
             payment_type=PaymentRecord.PaymentType.ADVANCE
-        ).order_by('-created_at')
+        )).order_by('-created_at')
         
         serializer = GetPaymentSerializer(advance_payments, many=True)
         return Response(serializer.data)
@@ -0,0 +1,71 @@
+from django.db.models import Q
+from bills.models import MonthlyBill
+from bills.serializers import MonthlyBillSerializer
+from inquiries.models import Inquiry
+from inquiries.serializers import InquirySerializer
+from notices.models import Notice
+from notices.serializers import NoticeSerializer
+from payments.models import PaymentRecord
+from payments.serializers import GetPaymentSerializer
+from units.models import AssignedUnit
+from units.serializers import AssignedUnitSerializer
+
+
+def visible_notices(notices, user):
+    """Notices for everyone plus those targeted at one of the user's units."""
+    targeted = Notice.objects.filter(
+        Q(target_audience__isnull=True) | Q(target_audience__assigned_by=user)
+    )
+    return notices.filter(pk__in=targeted.values('pk'))
+
+
+# Collections served by /api/sync/:
+#   model       - rows are synced by their indexed ``updated_at``
+#   serializer  - the same representation as the collection's list endpoint
+#   owner       - field holding the resident a row belongs to, or a function
+#                 (queryset, user) -> the rows the resident may see
+#   soft_delete - rows with ``deleted_at`` set are sent as deletions
+SYNC_COLLECTIONS = {
+    'bills': {
+        'model': MonthlyBill,
+        'serializer': MonthlyBillSerializer,
+        'owner': 'user',
+    },
+    'payments': {
+        'model': PaymentRecord,
+        'serializer': GetPaymentSerializer,
+        'owner': 'user',
+    },
+    'notices': {
+        'model': Notice,
+        'serializer': NoticeSerializer,
+        'owner': visible_notices,
+    },
+    'inquiries': {
+        'model': Inquiry,
+        'serializer': InquirySerializer,
+        'owner': 'resident',
+    },
+    'assigned_units': {
+        'model': AssignedUnit,
+        'serializer': AssignedUnitSerializer,
+        'owner': 'assigned_by',
+        'soft_delete': True,
+    },
+}
+
+
+def collection_of(model):
+    """Name of the sync collection holding ``model`` rows, or None."""
+    for name, collection in SYNC_COLLECTIONS.items():
+        if collection['model'] is model:
+            return name
+    return None
+
+
+def owner_id_of(name, instance):
+    """Id of the resident ``instance`` belongs to, None if everyone sees it."""
+    owner = SYNC_COLLECTIONS[name]['owner']
+    if callable(owner):
+        return None
+    return getattr(instance, instance._meta.get_field(owner).attname)
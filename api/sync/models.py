@@ -0,0 +1,21 @@
+from django.db import models
+from django.utils.timezone import now
+
+
+class Tombstone(models.Model):
+    """
+    A deleted row of a synced collection, so delta sync clients (see
+    ``sync.views.SyncView``) can drop their local copy.
+
+    ``owner_id`` is the resident the row belonged to (None for rows everyone
+    sees, e.g. notices). It is a plain id, not a foreign key, because the
+    owner is often deleted in the same cascade. Tombstones are purged after
+    ``SYNC_TOMBSTONE_TTL_DAYS``.
+    """
+    collection = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    owner_id = models.BigIntegerField(blank=True, null=True)
+    deleted_at = models.DateTimeField(default=now, db_index=True)
+
+    def __str__(self):
+        return f"Tombstone({self.collection} #{self.object_id}, deleted={self.deleted_at})"
@@ -0,0 +1,44 @@
+from django.db.models.signals import m2m_changed, post_delete
+from django.utils.timezone import now
+from notices.models import Notice
+from .collections import SYNC_COLLECTIONS, collection_of, owner_id_of
+from .models import Tombstone
+
+
+def record_tombstone(sender, instance, **kwargs):
+    name = collection_of(sender)
+    Tombstone.objects.create(collection=name, object_id=instance.pk, owner_id=owner_id_of(name, instance))
+
+
+for collection in SYNC_COLLECTIONS.values():
+    post_delete.connect(record_tombstone, sender=collection['model'], dispatch_uid=f"sync_tombstone_{collection['model'].__name__}")
+
+
+def record_audience_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    A notice's target audience changed, so some residents may no longer see it
+    (see ``visible_notices``): the notice gets a tombstone for everyone and its
+    ``updated_at`` is bumped, so residents who still see it receive it as
+    updated in the same sync (which wins over the deletion) and the others
+    drop it.
+    """
+    if reverse and action == 'pre_clear':
+        instance._sync_cleared_notices = list(instance.notices.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        notice_ids = [instance.pk]
+    elif action == 'post_clear':
+        notice_ids = getattr(instance, '_sync_cleared_notices', [])
+    else:
+        notice_ids = list(pk_set or [])
+    if not notice_ids:
+        return
+
+    Notice.objects.filter(pk__in=notice_ids).update(updated_at=now())
+    name = collection_of(Notice)
+    Tombstone.objects.bulk_create([Tombstone(collection=name, object_id=pk) for pk in notice_ids])
+
+
+m2m_changed.connect(record_audience_change, sender=Notice.target_audience.through, dispatch_uid="sync_notice_audience")
@@ -0,0 +1,16 @@
+from datetime import timedelta
+from celery import shared_task
+from django.conf import settings
+from django.utils.timezone import now
+from .models import Tombstone
+
+
+@shared_task
+def purge_tombstones():
+    """
+    Delete tombstones older than SYNC_TOMBSTONE_TTL_DAYS; clients that last
+    synced before that get a full reset instead.
+    """
+    cutoff = now() - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS)
+    deleted, _ = Tombstone.objects.filter(deleted_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,91 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.dateparse import parse_datetime
+from rest_framework.test import APITestCase
+from bills.models import MonthlyBill
+from notices.models import Notice, NoticeType
+from units.models import AssignedUnit, Unit
+from users.models import CustomUser
+
+
+class SyncTests(APITestCase):
+    """Delta sync: changes after the watermark, tombstones for deletions, per-resident scope."""
+
+    def setUp(self):
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.neighbour = CustomUser.objects.create(username="neighbour", role="resident")
+        self.bill = self.add_bill(self.resident)
+        self.add_bill(self.neighbour)
+        self.client.force_authenticate(self.resident)
+
+    def add_bill(self, user):
+        return MonthlyBill.objects.create(user=user, amount_due=Decimal("1000.00"), due_date=date(2025, 1, 5))
+
+    def sync(self, since=None):
+        response = self.client.get(reverse("sync"), {"since": since} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_first_sync_returns_own_rows_and_resets(self):
+        data = self.sync()
+        self.assertTrue(data["reset"])
+        self.assertEqual([bill["id"] for bill in data["collections"]["bills"]["updated"]], [self.bill.id])
+
+    @override_settings(SYNC_OVERLAP_SECONDS=0)
+    def test_nothing_changed(self):
+        watermark = self.sync()["watermark"]
+        data = self.sync(watermark)
+        self.assertFalse(data["reset"])
+        for changes in data["collections"].values():
+            self.assertEqual(changes, {"updated": [], "deleted": []})
+
+    def test_updates_and_deletions_after_watermark(self):
+        watermark = self.sync()["watermark"]
+        self.bill.payment_status = MonthlyBill.PaymentStatus.PAID
+        self.bill.save()
+        notice_type = NoticeType.objects.create(name="Maintenance")
+        notice = Notice.objects.create(title="Water interruption", content="Tomorrow", notice_type=notice_type)
+        notice_id = notice.id
+        notice.delete()
+
+        data = self.sync(watermark)
+        bills = data["collections"]["bills"]["updated"]
+        self.assertEqual([(bill["id"], bill["payment_status"]) for bill in bills], [(self.bill.id, "paid")])
+        self.assertEqual(data["collections"]["notices"]["deleted"], [notice_id])
+        self.assertGreater(data["watermark"], watermark)
+
+    def test_invalid_watermark(self):
+        response = self.client.get(reverse("sync"), {"since": "yesterday"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_row_committed_after_the_watermark_is_delivered(self):
+        watermark = self.sync()["watermark"]
+        # Saved while the previous sync ran, committed after it
+        late = self.add_bill(self.resident)
+        MonthlyBill.objects.filter(pk=late.pk).update(updated_at=parse_datetime(watermark) - timedelta(seconds=1))
+
+        data = self.sync(watermark)
+        self.assertIn(late.id, [bill["id"] for bill in data["collections"]["bills"]["updated"]])
+
+    def test_resident_removed_from_audience_drops_the_notice(self):
+        unit = Unit.objects.create(unit_name="101", building="A")
+        own = AssignedUnit.objects.create(unit_id=unit, assigned_by=self.resident, building="A")
+        other = AssignedUnit.objects.create(
+            unit_id=Unit.objects.create(unit_name="102", building="A"), assigned_by=self.neighbour, building="A",
+        )
+        notice = Notice.objects.create(
+            title="Water interruption", content="Tomorrow", notice_type=NoticeType.objects.create(name="Maintenance"),
+        )
+        notice.target_audience.add(own, other)
+        watermark = self.sync()["watermark"]
+
+        notice.target_audience.remove(own)
+        notices = self.sync(watermark)["collections"]["notices"]
+        self.assertEqual((notices["updated"], notices["deleted"]), ([], [notice.id]))
+
+        # The neighbour still sees it: sent as updated, not deleted
+        self.client.force_authenticate(self.neighbour)
+        notices = self.sync(watermark)["collections"]["notices"]
+        self.assertEqual(([row["id"] for row in notices["updated"]], notices["deleted"]), ([notice.id], []))
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.timezone import is_naive, make_aware, now
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from api.mixins import apply_eager_loading
+from .collections import SYNC_COLLECTIONS
+from .models import Tombstone
+
+
+class SyncView(APIView):
+    """
+    Delta sync for the resident app.
+
+    GET /api/sync/?since=<watermark>
+    Returns, per collection (bills, payments, notices, inquiries,
+    assigned_units), the rows created or updated after ``since`` and the ids
+    of rows deleted after it, plus the ``watermark`` to send next time:
+
+        {
+            "watermark": "2025-10-01T08:00:00.123456Z",
+            "reset": false,
+            "collections": {
+                "bills": {"updated": [...], "deleted": [12, 15]},
+                ...
+            }
+        }
+
+    Without ``since``, or when it is older than the tombstone retention
+    (``SYNC_TOMBSTONE_TTL_DAYS``), every row is returned with ``reset: true``
+    and the client should replace its local copy. Residents only receive
+    their own rows; admins and employees receive everything.
+
+    A transaction can commit after the watermark of a sync that ran while it
+    was open, with ``updated_at`` values from before it. Changes are therefore
+    read from ``SYNC_OVERLAP_SECONDS`` before ``since``: rows of the overlap
+    are sent again, so clients must upsert updates by id (and ignore deletions
+    of ids they don't have). A row both updated and deleted in the window is
+    sent as updated only.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        watermark = now()
+        since = self.get_since(request)
+        reset = since is None or since < watermark - timedelta(days=settings.SYNC_TOMBSTONE_TTL_DAYS)
+        if reset:
+            since = None
+        else:
+            since -= timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+
+        user = request.user
+        scoped = user.role not in ["admin", "employee"]
+        deleted = {name: set() for name in SYNC_COLLECTIONS}
+
+        if since is not None:
+            tombstones = Tombstone.objects.filter(deleted_at__gt=since, deleted_at__lte=watermark)
+            if scoped:
+                tombstones = tombstones.filter(Q(owner_id=user.pk) | Q(owner_id__isnull=True))
+            for name, object_id in tombstones.values_list('collection', 'object_id'):
+                if name in deleted:
+                    deleted[name].add(object_id)
+
+        collections = {}
+        for name, collection in SYNC_COLLECTIONS.items():
+            rows = collection['model']._base_manager.filter(updated_at__lte=watermark)
+            if since is not None:
+                rows = rows.filter(updated_at__gt=since)
+            if scoped:
+                rows = self.owned(rows, collection['owner'], user)
+
+            if collection.get('soft_delete'):
+                deleted[name].update(rows.filter(deleted_at__isnull=False).values_list('pk', flat=True))
+                rows = rows.filter(deleted_at__isnull=True)
+
+            serializer_class = collection['serializer']
+            rows = apply_eager_loading(rows.order_by('updated_at', 'pk'), serializer_class())
+            updated = serializer_class(rows, many=True, context={"request": request}).data
+            collections[name] = {
+                "updated": updated,
+                "deleted": sorted(deleted[name] - {row['id'] for row in updated}),
+            }
+
+        return Response({
+            "watermark": watermark,
+            "reset": reset,
+            "collections": collections,
+        })
+
+    def get_since(self, request):
+        value = request.query_params.get('since')
+        if not value:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            raise ValidationError({"since": "Expected the watermark returned by a previous sync."})
+        return make_aware(since) if is_naive(since) else since
+
+    def owned(self, rows, owner, user):
+        if callable(owner):
+            return owner(rows, user)
+        return rows.filter(**{owner: user})
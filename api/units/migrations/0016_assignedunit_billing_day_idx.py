@@ -0,0 +1,20 @@
+# Generated by Django 5.2.3 on 2026-10-17 01:43
+
+import django.db.models.functions.datetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('units', '0015_unit_floor_area'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignedunit',
+            index=models.Index(django.db.models.functions.datetime.ExtractDay('move_in_date'), name='assignedunit_billing_day_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:01
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('units', '0017_assignedunit_updated_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='assignedunit',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['assigned_by'], name='assignedunit_active_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignedunit',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['unit_id'], name='assignedunit_active_unit_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assignedunit',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-move_in_date'], name='assignedunit_active_movein_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['building', 'unit_name'], name='unit_active_building_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='unit',
+            index=models.Index(django.db.models.functions.text.Lower('building'), django.db.models.functions.text.Lower('unit_name'), condition=models.Q(('deleted_at__isnull', True)), name='unit_active_name_ci_idx'),
+        ),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:16
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import IntegrityError, migrations, models
+from django.db.models import Count, Max
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+
+def retire_duplicate_assignments(apps, schema_editor):
+    """
+    Keep only the newest active assignment of each unit; the older ones are
+    soft deleted, as unassigning a unit does.
+    """
+    AssignedUnit = apps.get_model('units', 'AssignedUnit')
+    active = AssignedUnit.objects.filter(deleted_at__isnull=True, unit_id__isnull=False)
+    duplicated = (
+        active.values('unit_id')
+        .annotate(count=Count('id'), newest=Max('id'))
+        .filter(count__gt=1)
+        .order_by()
+    )
+    retired_at = timezone.now()
+    for row in duplicated:
+        retired = active.filter(unit_id=row['unit_id']).exclude(id=row['newest']).update(deleted_at=retired_at)
+        print(f"Unit {row['unit_id']}: soft deleted {retired} older active assignment(s)")
+
+
+def check_unit_names(apps, schema_editor):
+    """
+    Active units whose building and name only differ in case cannot be merged
+    automatically (bills and assignments point at each of them).
+    """
+    Unit = apps.get_model('units', 'Unit')
+    duplicated = list(
+        Unit.objects.filter(deleted_at__isnull=True)
+        .annotate(building_ci=Lower('building'), unit_name_ci=Lower('unit_name'))
+        .values('building_ci', 'unit_name_ci')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by('building_ci', 'unit_name_ci')
+    )
+    if not duplicated:
+        return
+    examples = [
+        ", ".join(
+            f"{unit.building}/{unit.unit_name} (unit {unit.pk})"
+            for unit in Unit.objects.filter(
+                deleted_at__isnull=True,
+                building__iexact=row['building_ci'],
+                unit_name__iexact=row['unit_name_ci'],
+            ).order_by('id')
+        )
+        for row in duplicated[:10]
+    ]
+    raise IntegrityError(
+        f"Cannot add unit_active_name_ci_uniq: {len(duplicated)} building/unit names are used by "
+        f"several active units: {'; '.join(examples)}. Rename or soft delete the extra units "
+        "and run migrate again."
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('units', '0018_hot_filter_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='assignedunit',
+            name='assignedunit_active_unit_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='unit',
+            name='unit_active_name_ci_idx',
+        ),
+        migrations.RunPython(retire_duplicate_assignments, migrations.RunPython.noop),
+        migrations.RunPython(check_unit_names, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='assignedunit',
+            constraint=models.UniqueConstraint(condition=models.Q(('deleted_at__isnull', True)), fields=('unit_id',), name='assignedunit_one_active_per_unit'),
+        ),
+        migrations.AddConstraint(
+            model_name='unit',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('building'), django.db.models.functions.text.Lower('unit_name'), condition=models.Q(('deleted_at__isnull', True)), name='unit_active_name_ci_uniq'),
+        ),
+    ]
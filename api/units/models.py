@@ -1,6 +1,7 @@
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
+from django.db.models.functions import ExtractDay, Lower
 # Create your models here.
 
 class ActiveManager(models.Manager):
@@ -24,6 +25,25 @@ class Unit(models.Model):
     objects = ActiveManager()
     all_objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Active units (see ActiveManager) by building, in list order
+            models.Index(
+                fields=['building', 'unit_name'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='unit_active_building_idx',
+            ),
+        ]
+        constraints = [
+            # Active unit names are unique per building, case-insensitively
+            # (see UnitSerializer)
+            models.UniqueConstraint(
+                Lower('building'), Lower('unit_name'),
+                condition=models.Q(deleted_at__isnull=True),
+                name='unit_active_name_ci_uniq',
+            ),
+        ]
+
 
     def soft_delete(self, by_user=None):
         self.deleted_at = timezone.now()
@@ -60,7 +80,7 @@ class AssignedUnit(models.Model):
     unit_status = models.CharField(max_length=20, choices=UnitStatus.choices, default=UnitStatus.OWNER_OCCUPIED)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True, on_delete=models.CASCADE, related_name='assigned_units_created')
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     updated_by = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True, on_delete=models.CASCADE, related_name='assigned_units_updated')
     deleted_at = models.DateTimeField(blank=True, null=True)
     deleted_by = models.ForeignKey(settings.AUTH_USER_MODEL, blank=True, null=True, on_delete=models.CASCADE, related_name='assigned_units_deleted')
@@ -68,6 +88,33 @@ class AssignedUnit(models.Model):
     objects = ActiveManager()
     all_objects = models.Manager()
 
+    class Meta:
+        indexes = [
+            # Billing day lookup used by bills.services.generate_due_bills
+            models.Index(ExtractDay('move_in_date'), name='assignedunit_billing_day_idx'),
+            # Active assignments (see ActiveManager) of a resident, and newest
+            # move-ins first for the assignment lists
+            models.Index(
+                fields=['assigned_by'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='assignedunit_active_user_idx',
+            ),
+            models.Index(
+                fields=['-move_in_date'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='assignedunit_active_movein_idx',
+            ),
+        ]
+        constraints = [
+            # A unit has at most one active assignment (see AssignedUnitSerializer);
+            # its index also serves the active assignments of a unit
+            models.UniqueConstraint(
+                fields=['unit_id'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='assignedunit_one_active_per_unit',
+            ),
+        ]
+
 
     def soft_delete(self, by_user=None):
         self.deleted_at = timezone.now()
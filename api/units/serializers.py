@@ -4,44 +4,26 @@ from users.serializers import UserSerializer
 from django.contrib.auth import get_user_model
 from users.models import CustomUser
 from units.models import Unit
+from api.mixins import EagerLoadingMixin, UniqueConflictMixin
 
 User = get_user_model()
 
-class UnitSerializer(serializers.ModelSerializer):
+def duplicate_unit_detail(serializer):
+    """Error for a unit name already taken in its building (unit_active_name_ci_uniq)."""
+    unit_name = serializer.validated_data.get('unit_name', getattr(serializer.instance, 'unit_name', ''))
+    building = serializer.validated_data.get('building', getattr(serializer.instance, 'building', ''))
+    return {'unit_name': [f'A unit with name "{unit_name}" already exists in building {building}.']}
+
+
+class UnitSerializer(UniqueConflictMixin, EagerLoadingMixin, serializers.ModelSerializer):
 
     class Meta:
         model=Unit
         fields=['id', 'unit_name','rent_amount', 'building', 'floor_area', 'bedrooms', 'isAvailable' , 'created_at', 'created_by', 'updated_at', 'updated_by', 'deleted_at', 'deleted_by']
-    
-    def validate(self, data):
-        """
-        ✅ Check if a unit with this name already exists in the same building
-        """
-        unit_name = data.get('unit_name', '').strip()
-        building = data.get('building', '')
-        
-        if not unit_name or not building:
-            return data
-            
-        # Get the instance if it exists (for updates)
-        instance = self.instance
-        
-        # Check for existing unit with same name in same building
-        query = Unit.objects.filter(
-            unit_name__iexact=unit_name,
-            building__iexact=building
-        )
-        
-        # If updating, exclude current instance from the check
-        if instance:
-            query = query.exclude(id=instance.id)
-        
-        if query.exists():
-            raise serializers.ValidationError({
-                'unit_name': f'A unit with name "{unit_name}" already exists in building {building}.'
-            })
-        
-        return data
+
+    # ✅ A unit name already used in the same building (case-insensitive) is
+    # rejected by the unit_active_name_ci_uniq constraint on save
+    unique_conflict_detail = duplicate_unit_detail
 
     def create(self, validated_data):
         created_by = self.context.get('created_by')
@@ -54,12 +36,14 @@ class UnitSerializer(serializers.ModelSerializer):
         return unit
     
 
-class UpdateUnitSerializer(serializers.ModelSerializer):
+class UpdateUnitSerializer(UniqueConflictMixin, serializers.ModelSerializer):
     
     class Meta:
         model=Unit
         fields=['unit_name','rent_amount', 'building', 'floor_area', 'bedrooms', 'isAvailable', 'created_at', 'created_by', 'updated_at', 'updated_by', 'deleted_at', 'deleted_by']
 
+    unique_conflict_detail = duplicate_unit_detail
+
     def update(self, instance, validated_data):
         updated_by = self.context.get('updated_by')
 
@@ -73,7 +57,7 @@ class UpdateUnitSerializer(serializers.ModelSerializer):
         return instance
 
 
-class PaginateAssignedUnitSerializer(serializers.ModelSerializer):
+class PaginateAssignedUnitSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     unit_id = UnitSerializer()
     assigned_by = UserSerializer()
     class Meta:
@@ -81,7 +65,7 @@ class PaginateAssignedUnitSerializer(serializers.ModelSerializer):
         fields = ['id', 'unit_id', 'assigned_by', 'building', 'unit_status', 'move_in_date', 'security', 'maintenance', 'amenities', 'created_at', 'created_by', 'updated_at', 'updated_by', 'deleted_at', 'deleted_by']
 
 
-class AssignedUnitSerializer(serializers.ModelSerializer):
+class AssignedUnitSerializer(UniqueConflictMixin, EagerLoadingMixin, serializers.ModelSerializer):
     assigned_by = UserSerializer(read_only=True)
     unit_id = UnitSerializer(read_only=True)
 
@@ -108,25 +92,10 @@ class AssignedUnitSerializer(serializers.ModelSerializer):
             'deleted_at', 'deleted_by'
         ]
 
-    def validate(self, data):
-        unit = data.get('unit_id') or self.initial_data.get('unit')
-        user = data.get('assigned_by') or self.initial_data.get('user_id')
-
-        instance = getattr(self, 'instance', None)
-
-        # 🧩 Check if this unit is already assigned to someone else
-        if AssignedUnit.objects.filter(unit_id=unit).exclude(id=getattr(instance, 'id', None)).exists():
-            raise serializers.ValidationError({
-                "unit_id": "This unit is already assigned to someone."
-            })
-
-        # 🧩 Check if this user is already assigned to this unit
-        if AssignedUnit.objects.filter(unit_id=unit, assigned_by=user).exclude(id=getattr(instance, 'id', None)).exists():
-            raise serializers.ValidationError({
-                "detail": "This user is already assigned to this unit."
-            })
-
-        return data
+    # 🧩 A unit that already has an active assignment (whoever it is assigned
+    # to) is rejected by the assignedunit_one_active_per_unit constraint on save
+    def unique_conflict_detail(self):
+        return {"unit_id": ["This unit is already assigned to someone."]}
 
     def create(self, validated_data):
         created_by = self.context.get('created_by')
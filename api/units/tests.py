@@ -1,3 +1,44 @@
-from django.test import TestCase
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from users.models import CustomUser
+from .models import AssignedUnit, Unit
 
-# Create your tests here.
+
+class UniqueUnitTests(APITestCase):
+    """Duplicate unit names and assignments are rejected by database constraints."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create(username="admin", role="admin")
+        self.resident = CustomUser.objects.create(username="resident", role="resident")
+        self.neighbour = CustomUser.objects.create(username="neighbour", role="resident")
+        self.unit = Unit.objects.create(unit_name="101", building="Tower A", rent_amount=Decimal("1000.00"))
+        self.client.force_authenticate(self.admin)
+
+    def test_unit_name_is_unique_per_building_case_insensitively(self):
+        response = self.client.post(reverse("create_unit"), {"unit_name": "101", "building": "tower a"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("unit_name", response.json())
+
+        response = self.client.post(reverse("create_unit"), {"unit_name": "101", "building": "Tower B"})
+        self.assertEqual(response.status_code, 201)
+
+        # A soft-deleted unit's name can be reused
+        self.unit.deleted_at = self.unit.created_at
+        self.unit.save()
+        response = self.client.post(reverse("create_unit"), {"unit_name": "101", "building": "Tower A"})
+        self.assertEqual(response.status_code, 201)
+
+    def test_unit_has_one_active_assignment(self):
+        def assign(user):
+            return self.client.post(reverse("create_assigned_unit"), {
+                "unit": self.unit.pk, "user_id": user.pk, "building": "Tower A",
+            })
+
+        self.assertEqual(assign(self.resident).status_code, 201)
+        response = assign(self.neighbour)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"unit_id": ["This unit is already assigned to someone."]})
+
+        AssignedUnit.objects.get().soft_delete(self.admin)
+        self.assertEqual(assign(self.neighbour).status_code, 201)
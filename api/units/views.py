@@ -8,6 +8,9 @@ from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.permissions import IsAuthenticated
 from .serializers import UnitSerializer, PaginateAssignedUnitSerializer, UpdateUnitSerializer, AssignedUnitSerializer, AssignedUnitDetailSerializer
 from .models import Unit, AssignedUnit
+from api.mixins import EagerLoadingViewMixin, SparseFieldsViewMixin
+from api.projection import RowProjectionMixin
+from api.streaming import StreamingListMixin
 
 # Create your views here.
 
@@ -33,7 +36,7 @@ def create_unit(request):
 #     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class get_units(ListAPIView):
+class get_units(StreamingListMixin, SparseFieldsViewMixin, ListAPIView):
     queryset = Unit.objects.all().order_by('building', 'unit_name')
     serializer_class = UnitSerializer
     permission_classes = [IsAuthenticated]
@@ -42,7 +45,7 @@ class get_units(ListAPIView):
     pagination_class = None
 
 
-class PaginatedUnit(ListAPIView):
+class PaginatedUnit(SparseFieldsViewMixin, ListAPIView):
     queryset = Unit.objects.all().order_by('building', 'unit_name')
     serializer_class = UnitSerializer
     permission_classes = [IsAuthenticated]
@@ -116,15 +119,16 @@ def restore_unit(request, pk):
 ######################## Assigned Unit Views #########################
 ######################################################################
 
-class get_assigned_units(ListAPIView):
+class get_assigned_units(StreamingListMixin, RowProjectionMixin, SparseFieldsViewMixin, EagerLoadingViewMixin, ListAPIView):
     queryset = AssignedUnit.objects.all()
     serializer_class = AssignedUnitSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['assigned_by']
     pagination_class = None
+    row_projection = True  # values()-based serialization (api.projection)
 
-class PaginatedAssignedUnit(ListAPIView):
+class PaginatedAssignedUnit(SparseFieldsViewMixin, EagerLoadingViewMixin, ListAPIView):
     queryset = AssignedUnit.objects.all().order_by('-move_in_date')
     serializer_class = PaginateAssignedUnitSerializer
     # permission_classes = [IsAuthenticated]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-17 03:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('units', '0018_hot_filter_indexes'),
+        ('users', '0002_customuser_unit'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['-date_joined', '-id'], name='user_active_joined_idx'),
+        ),
+    ]
@@ -66,6 +66,17 @@ class CustomUser(AbstractUser):
 
     objects = CustomUserManager()          # Default: excludes soft-deleted users
     all_objects = models.Manager()         # Includes soft-deleted users
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Active users (see CustomUserManager), newest first as the user lists
+            # and their keyset pagination read them
+            models.Index(
+                fields=['-date_joined', '-id'],
+                condition=models.Q(deleted_at__isnull=True),
+                name='user_active_joined_idx',
+            ),
+        ]
     
     def __str__(self):
         return self.username
@@ -5,6 +5,7 @@ from rest_framework_simplejwt.tokens import RefreshToken, AccessToken, TokenErro
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth.password_validation import validate_password
 from units.models import Unit  # adjust if your Unit model is in another app
+from api.mixins import EagerLoadingMixin
 
 User = get_user_model()
 
@@ -68,8 +69,9 @@ class UpdateUserSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     unit_name = serializers.CharField(source="unit.unit_name", read_only=True)
+
     class Meta:
         model = User
         fields = [
@@ -6,6 +6,8 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.views import TokenRefreshView
 from django_filters.rest_framework import DjangoFilterBackend
+from api.mixins import EagerLoadingViewMixin
+from api.streaming import StreamingListMixin
 from django.db.models.functions import ExtractMonth, ExtractYear
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
@@ -41,7 +43,7 @@ def register_user(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # Get All Users
-class UserListView(ListAPIView):
+class UserListView(StreamingListMixin, EagerLoadingViewMixin, ListAPIView):
     queryset = CustomUser.objects.all().order_by('-date_joined')
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -106,13 +108,14 @@ def restore_deleted_user(request, pk):
             return Response({'error': 'User not found.'}, status=status.HTTP_404_NOT_FOUND)
     
 
-class PaginatedUsers(ListAPIView):
+class PaginatedUsers(EagerLoadingViewMixin, ListAPIView):
     queryset = CustomUser.objects.all().order_by('-date_joined')
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['role', 'move_in_date', 'first_name', 'last_name', 'account_status']
     search_fields = ['first_name', 'last_name', 'email', 'username']
+    keyset_ordering = ('-date_joined', '-id')  # ?pagination=keyset (see api.pagination)
 
 
 